@@ -30,6 +30,8 @@ def run_migrations_online():
         with context.begin_transaction():
             context.run_migrations()
 
+    app.persist_db()
+
 
 if context.is_offline_mode():
     run_migrations_offline()
@@ -0,0 +1,31 @@
+"""Ingestion manifest
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:02:11.204519
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'ingestion_manifest',
+        sa.Column('id', sa.String(length=255), nullable=False),
+        sa.Column('season_id', sa.Integer(), nullable=True),
+        sa.Column('content_hash', sa.String(length=64), nullable=True),
+        sa.Column('franchise_seasons_hash', sa.String(length=64), nullable=True),
+        sa.Column('manual_scores_hash', sa.String(length=64), nullable=True),
+        sa.Column('ingested_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('ingestion_manifest')
@@ -0,0 +1,37 @@
+"""Indexes on foreign keys and sort columns
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 18:32:40.118302
+
+"""
+from alembic import op
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Relationships loaded through these indexes have an explicit order_by, e.g. Game.sides
+    # is ordered by id so that the home side, which is stored first, comes first.
+    op.create_index('ix_game_sides_team_id', 'game_sides', ['team_id'])
+    op.create_index('ix_game_sides_game_id', 'game_sides', ['game_id'])
+    op.create_index('ix_teams_franchise_id', 'teams', ['franchise_id'])
+    op.create_index('ix_teams_season_id', 'teams', ['season_id'])
+    op.create_index('ix_games_season_id_starts_at', 'games', ['season_id', 'starts_at'])
+    op.create_index('ix_games_starts_at', 'games', ['starts_at'])
+    op.create_index('ix_seasons_first_week_date', 'seasons', ['first_week_date'])
+    op.create_index('ix_franchises_name', 'franchises', ['name'])
+
+
+def downgrade():
+    op.drop_index('ix_franchises_name', table_name='franchises')
+    op.drop_index('ix_seasons_first_week_date', table_name='seasons')
+    op.drop_index('ix_games_starts_at', table_name='games')
+    op.drop_index('ix_games_season_id_starts_at', table_name='games')
+    op.drop_index('ix_teams_season_id', table_name='teams')
+    op.drop_index('ix_teams_franchise_id', table_name='teams')
+    op.drop_index('ix_game_sides_game_id', table_name='game_sides')
+    op.drop_index('ix_game_sides_team_id', table_name='game_sides')
@@ -0,0 +1,72 @@
+"""Materialized aggregate tables
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 20:14:52.301876
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def aggregate_columns():
+    return [
+        sa.Column(name, sa.Integer(), nullable=False)
+        for name in (
+            'num_games',
+            'num_games_decided',
+            'won',
+            'drawn',
+            'lost',
+            'score_for',
+            'score_against',
+            'true_won',
+            'true_drawn',
+            'true_lost',
+            'true_forfeits_for',
+            'true_forfeits_against',
+            'true_scored',
+            'true_score_for',
+            'true_score_against',
+        )
+    ]
+
+
+def upgrade():
+    # The tables are filled by unicorn.v2.go, run it after upgrading.
+    op.create_table(
+        'team_stage_aggregates',
+        sa.Column('team_id', sa.String(length=15), nullable=False),
+        sa.Column('season_stage', sa.String(length=20), nullable=False),
+        *aggregate_columns(),
+        sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ),
+        sa.PrimaryKeyConstraint('team_id', 'season_stage')
+    )
+    op.create_table(
+        'franchise_stage_aggregates',
+        sa.Column('franchise_id', sa.Integer(), nullable=False),
+        sa.Column('season_stage', sa.String(length=20), nullable=False),
+        *aggregate_columns(),
+        sa.ForeignKeyConstraint(['franchise_id'], ['franchises.id'], ),
+        sa.PrimaryKeyConstraint('franchise_id', 'season_stage')
+    )
+    op.create_table(
+        'franchise_season_aggregates',
+        sa.Column('franchise_id', sa.Integer(), nullable=False),
+        sa.Column('season_id', sa.Integer(), nullable=False),
+        *aggregate_columns(),
+        sa.ForeignKeyConstraint(['franchise_id'], ['franchises.id'], ),
+        sa.ForeignKeyConstraint(['season_id'], ['seasons.id'], ),
+        sa.PrimaryKeyConstraint('franchise_id', 'season_id')
+    )
+
+
+def downgrade():
+    op.drop_table('franchise_season_aggregates')
+    op.drop_table('franchise_stage_aggregates')
+    op.drop_table('team_stage_aggregates')
@@ -0,0 +1,65 @@
+"""Denormalized opponent, franchise and game columns on game_sides
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 21:03:17.540912
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+columns = (
+    ('opponent_team_id', sa.String(length=15)),
+    ('opponent_score', sa.Integer()),
+    ('franchise_id', sa.Integer()),
+    ('opponent_franchise_id', sa.Integer()),
+    ('season_id', sa.Integer()),
+    ('season_stage', sa.String(length=20)),
+    ('starts_at', sa.DateTime()),
+)
+
+
+def upgrade():
+    for name, type_ in columns:
+        op.add_column('game_sides', sa.Column(name, type_, nullable=True))
+
+    # Fill in existing rows, unicorn.v2.storage writes the columns of new rows.
+    op.execute('''
+        UPDATE game_sides SET
+            opponent_team_id = (
+                SELECT o.team_id FROM game_sides AS o
+                WHERE o.game_id = game_sides.game_id AND o.id != game_sides.id
+            ),
+            opponent_score = (
+                SELECT o.score FROM game_sides AS o
+                WHERE o.game_id = game_sides.game_id AND o.id != game_sides.id
+            ),
+            franchise_id = (
+                SELECT t.franchise_id FROM teams AS t
+                WHERE t.id = game_sides.team_id
+            ),
+            opponent_franchise_id = (
+                SELECT t.franchise_id FROM game_sides AS o JOIN teams AS t ON t.id = o.team_id
+                WHERE o.game_id = game_sides.game_id AND o.id != game_sides.id
+            ),
+            season_id = (SELECT g.season_id FROM games AS g WHERE g.id = game_sides.game_id),
+            season_stage = (SELECT g.season_stage FROM games AS g WHERE g.id = game_sides.game_id),
+            starts_at = (SELECT g.starts_at FROM games AS g WHERE g.id = game_sides.game_id)
+    ''')
+
+    op.create_index(
+        'ix_game_sides_franchise_id_opponent_franchise_id', 'game_sides', ['franchise_id', 'opponent_franchise_id'],
+    )
+
+
+def downgrade():
+    op.drop_index('ix_game_sides_franchise_id_opponent_franchise_id', table_name='game_sides')
+    with op.batch_alter_table('game_sides') as batch_op:
+        for name, _ in reversed(columns):
+            batch_op.drop_column(name)
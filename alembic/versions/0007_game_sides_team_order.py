@@ -0,0 +1,24 @@
+"""Index game sides of a team in chronological order
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 23:41:05.207113
+
+"""
+from alembic import op
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Team.games is ordered by starts_at and game_id, which this index returns without sorting.
+    op.drop_index('ix_game_sides_team_id', table_name='game_sides')
+    op.create_index('ix_game_sides_team_id_starts_at', 'game_sides', ['team_id', 'starts_at', 'game_id'])
+
+
+def downgrade():
+    op.drop_index('ix_game_sides_team_id_starts_at', table_name='game_sides')
+    op.create_index('ix_game_sides_team_id', 'game_sides', ['team_id'])
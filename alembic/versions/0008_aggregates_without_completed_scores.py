@@ -0,0 +1,35 @@
+"""Drop scores of completed games from the aggregate tables
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 00:12:38.604127
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+tables = ('team_stage_aggregates', 'franchise_stage_aggregates', 'franchise_season_aggregates')
+
+# Whether a game is completed depends on the time of the build, teams count these when rendering.
+columns = ('true_scored', 'true_score_for', 'true_score_against')
+
+
+def upgrade():
+    for table in tables:
+        with op.batch_alter_table(table) as batch_op:
+            for name in columns:
+                batch_op.drop_column(name)
+
+
+def downgrade():
+    # Filled with zeros, run unicorn.v2.go of the downgraded version to recompute them.
+    for table in tables:
+        with op.batch_alter_table(table) as batch_op:
+            for name in columns:
+                batch_op.add_column(sa.Column(name, sa.Integer(), nullable=False, server_default='0'))
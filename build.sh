@@ -6,7 +6,11 @@ set -e
 flake8
 isort
 
-rm -f ./unicorn.db
+# The database is rebuilt from input pages, no need for durability while building it.
+export UNICORN_SQLITE_PROFILE=${UNICORN_SQLITE_PROFILE:-fast}
+
+# Seasons whose input pages have not changed are not re-ingested,
+# delete unicorn.db to force a full rebuild.
 alembic upgrade head
 python -m unicorn.v2.go
 python -m unicorn.pages.standard
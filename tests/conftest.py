@@ -0,0 +1,33 @@
+import pytest
+
+from unicorn.app import app, clear_app_data
+from unicorn.models import metadata
+from unicorn.v2 import go
+from unicorn.v2.synthetic import Generator
+
+
+@pytest.fixture
+def synthetic_build(tmp_path):
+    """
+    Ingests a small synthetic data set with several seasons into a new database
+    and yields the directory of its input, data and database inside an app context using them.
+    """
+    Generator(num_seasons=4, num_franchises=10, seed=1).write(str(tmp_path))
+
+    with app(
+        input_dir=str(tmp_path / 'input'),
+        data_dir=str(tmp_path / 'data'),
+        db_name=str(tmp_path / 'unicorn.db'),
+        season_parse_cache_dir='',
+        rating_checkpoint_dir='',
+    ):
+        clear_app_data()
+        metadata.create_all(app.db_engine)
+        go.main()
+        app.db_session.remove()
+        clear_app_data()
+
+        yield tmp_path
+
+        app.db_session.remove()
+        clear_app_data()
@@ -0,0 +1,53 @@
+import datetime as dt
+import os
+
+from unicorn.app import app
+from unicorn.core import pages
+from unicorn.models import Game, GameSide, Season
+from unicorn.pages import standard
+from unicorn.values import SeasonStages
+
+
+def test_historical_build_shows_no_later_games(synthetic_build, monkeypatch):
+    seasons = app.db_session.query(Season).order_by(Season.first_week_date).all()
+    season = seasons[2]
+    # A few weeks into the regular season of the third season.
+    cutoff = dt.datetime.combine(season.first_week_date + dt.timedelta(days=15), dt.time())
+    later_season_ids = [s.id for s in seasons[3:]]
+    games = app.db_session.query(Game).all()
+    earlier_game_ids = [g.id for g in games if g.starts_at <= cutoff]
+    later_game_ids = [g.id for g in games if g.starts_at > cutoff]
+    num_regular_sides = app.db_session.query(GameSide).filter(
+        GameSide.season_id == season.id, GameSide.season_stage == SeasonStages.regular, GameSide.starts_at <= cutoff,
+        GameSide.score.isnot(None),
+    ).count()
+    app.db_session.remove()
+    assert earlier_game_ids and later_game_ids and num_regular_sides
+
+    build_dir = synthetic_build / 'build'
+    build_dir.mkdir()
+    monkeypatch.setattr(pages, 'unicorn_build_dir', str(build_dir))
+    monkeypatch.setattr(standard, 'unicorn_build_dir', str(build_dir))
+
+    with app(history_cutoff=cutoff):
+        standard.main(assert_no_queries=True)
+
+        assert app.as_of == cutoff
+        assert app.current_season.id == season.id
+
+        season_teams = [t for t in app.teams.values() if t.season_id == season.id]
+        assert sum(t.regular_played for t in season_teams) == num_regular_sides
+        assert sorted(t.regular_rank for t in season_teams) == list(range(1, len(season_teams) + 1))
+        assert all(t.finals_rank is None for t in season_teams)
+
+        rated_games = [g for change_log in app.team_ratings.change_log.values() for g, _ in change_log]
+        assert rated_games
+        assert all(g.starts_at <= cutoff for g in rated_games)
+
+    written = set(os.listdir(str(build_dir)))
+    assert all('game_{}.html'.format(game_id) in written for game_id in earlier_game_ids)
+    assert not any('game_{}.html'.format(game_id) in written for game_id in later_game_ids)
+    assert not any('season_{}.html'.format(season_id) in written for season_id in later_season_ids)
+    with open(str(build_dir / 'games_all.html')) as f:
+        games_all = f.read()
+    assert not any('game_{}.html'.format(game_id) in games_all for game_id in later_game_ids)
@@ -0,0 +1,39 @@
+import os
+
+from unicorn.snapshot import take_snapshot
+from unicorn.v2 import rating_checkpoints
+from unicorn.v2.team_ratings_fast import FastTeamRatings
+
+
+def get_state(ratings):
+    return (
+        {f_id: rating.value for f_id, rating in ratings.current.items()},
+        {f_id: rating.value for f_id, rating in ratings.best_rating.items()},
+        ratings.change_log,
+        ratings.weekly_leaders,
+    )
+
+
+def test_resumed_ratings_match_and_outdated_checkpoints_are_deleted(synthetic_build):
+    take_snapshot()
+    checkpoint_dir = str(synthetic_build / 'checkpoints')
+
+    expected = FastTeamRatings()
+    expected.calculate()
+
+    cold = FastTeamRatings()
+    cold.calculate(checkpoint_dir=checkpoint_dir)
+    keys = [key for _, key in rating_checkpoints.get_boundaries(cold)]
+    assert sorted(os.listdir(checkpoint_dir)) == sorted('{}.json'.format(key) for key in keys)
+
+    outdated_filename = '{}-{}.json'.format(rating_checkpoints.format_version, '0' * 64)
+    for filename in (outdated_filename, 'notes.txt'):
+        with open(os.path.join(checkpoint_dir, filename), 'w') as f:
+            f.write('{}')
+
+    warm = FastTeamRatings()
+    warm.calculate(checkpoint_dir=checkpoint_dir)
+
+    assert get_state(cold) == get_state(expected)
+    assert get_state(warm) == get_state(expected)
+    assert sorted(os.listdir(checkpoint_dir)) == sorted(['notes.txt'] + ['{}.json'.format(key) for key in keys])
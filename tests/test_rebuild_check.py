@@ -0,0 +1,19 @@
+import os
+
+from unicorn.app import app
+from unicorn.v2.query_audit import copy_database
+from unicorn.v2.rebuild_check import compare_builds, get_build
+
+
+def test_incremental_build_equals_full_rebuild(synthetic_build):
+    # Re-ingesting the first season gives its rows new ids after those of all later seasons.
+    season_pages_dir = synthetic_build / 'input' / 'season-pages'
+    with open(str(season_pages_dir / sorted(os.listdir(str(season_pages_dir)))[0]), 'a') as f:
+        f.write('<!-- changed -->\n')
+
+    copy_database(app.db_name, str(synthetic_build / 'incremental.db'))
+    copy_database(app.db_name, str(synthetic_build / 'full.db'))
+    incremental = get_build(str(synthetic_build / 'incremental.db'))
+    full = get_build(str(synthetic_build / 'full.db'), full_rebuild=True)
+
+    assert compare_builds(incremental, full) == []
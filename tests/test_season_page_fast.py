@@ -0,0 +1,54 @@
+import glob
+import os.path
+
+import pytest
+
+from unicorn import unicorn_root_dir
+from unicorn.app import app
+from unicorn.v2 import season_page_fast
+from unicorn.v2.season_page import SeasonParse
+from unicorn.v2.season_page_fast import FastSeasonParse
+
+data_dir = os.path.join(os.path.dirname(__file__), 'data')
+
+season_pages = sorted(glob.glob(os.path.join(unicorn_root_dir, 'input/season-pages/*.htm')))
+
+
+def read_page(filename):
+    with open(filename) as f:
+        return f.read()
+
+
+def test_season_pages_are_committed():
+    assert season_pages
+
+
+@pytest.mark.parametrize('standings_file, fixtures_file', [
+    *(pytest.param(filename, None, id=os.path.basename(filename)) for filename in season_pages),
+    pytest.param(
+        os.path.join(data_dir, 'current-season/standings.htm'), os.path.join(data_dir, 'current-season/fixtures.htm'),
+        id='current-season',
+    ),
+])
+def test_fast_season_parse_matches_season_parse(standings_file, fixtures_file):
+    standard = SeasonParse()
+    fast = FastSeasonParse()
+
+    standard.parse_standings_page(read_page(standings_file))
+    fast.parse_standings_page(read_page(standings_file))
+    assert standard.teams and standard.game_days
+    assert vars(fast) == vars(standard)
+
+    if fixtures_file:
+        num_game_days = len(standard.game_days)
+        standard.parse_fixtures_page(read_page(fixtures_file))
+        fast.parse_fixtures_page(read_page(fixtures_file))
+        assert len(standard.game_days) > num_game_days
+        assert vars(fast) == vars(standard)
+
+
+def test_main_fails_without_season_pages(tmp_path):
+    with app(input_dir=str(tmp_path)):
+        with pytest.raises(SystemExit) as exc_info:
+            season_page_fast.main()
+    assert exc_info.value.code == 1
@@ -0,0 +1,60 @@
+import os
+import sqlite3
+import stat
+
+from sqlalchemy import text
+
+from unicorn.db.sqlite import create_sqlite_engine, persist
+
+
+def get_mode(filename):
+    return stat.S_IMODE(os.stat(filename).st_mode)
+
+
+def get_table_names(db_name):
+    connection = sqlite3.connect(db_name)
+    try:
+        return sorted(name for name, in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'"))
+    finally:
+        connection.close()
+
+
+def test_persist_keeps_mode_and_deletes_old_journals(tmp_path):
+    db_name = str(tmp_path / 'unicorn.db')
+    connection = sqlite3.connect(db_name)
+    connection.execute('CREATE TABLE old (x)')
+    connection.close()
+    os.chmod(db_name, 0o644)
+
+    engine = create_sqlite_engine(db_name, in_memory=True)
+    with engine.begin() as connection:
+        connection.execute(text('CREATE TABLE new (x)'))
+
+    for suffix in ('-wal', '-shm'):
+        with open(db_name + suffix, 'wb') as f:
+            f.write(b'left over by an earlier build')
+
+    persist(engine, db_name)
+    engine.dispose()
+
+    assert get_mode(db_name) == 0o644
+    assert not os.path.exists(db_name + '-wal')
+    assert not os.path.exists(db_name + '-shm')
+    assert get_table_names(db_name) == ['new', 'old']
+
+
+def test_persist_creates_file_with_umask_mode(tmp_path):
+    db_name = str(tmp_path / 'unicorn.db')
+    engine = create_sqlite_engine(db_name, in_memory=True)
+    with engine.begin() as connection:
+        connection.execute(text('CREATE TABLE new (x)'))
+
+    umask = os.umask(0o022)
+    try:
+        persist(engine, db_name)
+    finally:
+        os.umask(umask)
+    engine.dispose()
+
+    assert get_mode(db_name) == 0o644
+    assert get_table_names(db_name) == ['new']
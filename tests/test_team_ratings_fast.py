@@ -0,0 +1,13 @@
+from unicorn.app import app
+from unicorn.snapshot import take_snapshot
+from unicorn.v2.team_ratings import TeamRatings
+from unicorn.v2.team_ratings_fast import check_parity
+
+
+def test_fast_team_ratings_match_team_ratings(synthetic_build):
+    take_snapshot()
+    franchises = list(app.franchises.values())
+    games = list(TeamRatings._get_all_games())
+    assert len(set(g.season for g in games if g.completed)) > 1
+
+    assert check_parity(franchises, games) == []
@@ -0,0 +1,142 @@
+"""
+Game achievements of a franchise -- streaks, counts of high and low scoring games
+and top lists of games -- compiled in a single pass over its game sides.
+"""
+
+import heapq
+
+from unicorn.values import GameOutcomes
+
+achievement_names = frozenset((
+    'longest_winning_streak',
+    'longest_losing_streak',
+    'num_50plus_scored_games',
+    'num_50plus_conceded_games',
+    'num_20minus_scored_games',
+    'num_20minus_conceded_games',
+    'largest_wins',
+    'largest_defeats',
+    'best_offensive_games',
+    'worst_offensive_games',
+    'best_defensive_games',
+    'worst_defensive_games',
+))
+
+
+class TopGames:
+    """
+    Keeps the k game sides with the largest (or smallest) key seen so far in a heap.
+
+    Ties are broken by the order in which game sides are added, the later ones ranking higher
+    among the largest and lower among the smallest -- the same game sides, in the same order,
+    as the tail (reversed) or the head of a stable ascending sort by the key.
+    """
+
+    def __init__(self, k, key, largest=True):
+        self.k = k
+        self.key = key
+        self.sign = 1 if largest else -1
+        self.heap = []
+
+    def add(self, index, gs):
+        item = (self.sign * self.key(gs), self.sign * index, gs)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, item)
+        elif item[:2] > self.heap[0][:2]:
+            heapq.heapreplace(self.heap, item)
+
+    def games(self):
+        """
+        Returns the game sides from the highest ranked down, i.e. in descending order of the key
+        if the largest are kept, ascending otherwise.
+        """
+        return [gs for _, _, gs in sorted(self.heap, key=lambda item: item[:2], reverse=True)]
+
+
+def compile_game_achievements(game_sides, k=5):
+    """
+    Returns a dictionary of all achievements of the game sides which must be in chronological order.
+    Top lists contain up to k game sides.
+    """
+    achievements = {
+        'longest_winning_streak': 0,
+        'longest_losing_streak': 0,
+        'num_50plus_scored_games': 0,
+        'num_50plus_conceded_games': 0,
+        'num_20minus_scored_games': 0,
+        'num_20minus_conceded_games': 0,
+    }
+
+    by_points_difference_top = TopGames(k, key=lambda gs: gs.plus_minus)
+    by_points_difference_bottom = TopGames(k, key=lambda gs: gs.plus_minus, largest=False)
+    by_points_scored_top = TopGames(k, key=lambda gs: gs.score)
+    by_points_scored_bottom = TopGames(k, key=lambda gs: gs.score, largest=False)
+    by_points_conceded_top = TopGames(k, key=lambda gs: gs.opponent_score)
+    by_points_conceded_bottom = TopGames(k, key=lambda gs: gs.opponent_score, largest=False)
+    top_lists = (
+        by_points_difference_top, by_points_difference_bottom,
+        by_points_scored_top, by_points_scored_bottom,
+        by_points_conceded_top, by_points_conceded_bottom,
+    )
+
+    # The current streak is represented by its last game side and its length.
+    # A draw breaks a streak and, like a loss, starts a new one.
+    streak_last = None
+    streak_length = 0
+
+    def complete_streak():
+        if not streak_length:
+            return
+        if streak_last.is_won:
+            key = 'longest_winning_streak'
+        else:
+            key = 'longest_losing_streak'
+        achievements[key] = max(achievements[key], streak_length)
+
+    for index, gs in enumerate(game_sides):
+        if gs.was_played:
+            for top_list in top_lists:
+                top_list.add(index, gs)
+
+        # Offensive and Defensive achievements
+
+        if gs.score is None or gs.opponent_score is None:
+            # Exclude games with no score.
+            continue
+
+        is_forfeit = gs.outcome in (GameOutcomes.forfeit_against, GameOutcomes.forfeit_for)
+
+        if gs.score >= 50:
+            achievements['num_50plus_scored_games'] += 1
+        elif gs.score <= 20 and not is_forfeit:
+            achievements['num_20minus_scored_games'] += 1
+
+        if gs.opponent_score >= 50:
+            achievements['num_50plus_conceded_games'] += 1
+        elif gs.opponent_score <= 20 and not is_forfeit:
+            achievements['num_20minus_conceded_games'] += 1
+
+        # Streaks
+
+        if not streak_length:
+            if gs.is_won or gs.is_lost:
+                streak_last, streak_length = gs, 1
+            else:
+                # Ignore draws
+                pass
+        elif (gs.is_won and streak_last.is_won) or (gs.is_lost and streak_last.is_lost):
+            streak_last, streak_length = gs, streak_length + 1
+        else:
+            complete_streak()
+            streak_last, streak_length = gs, 1
+
+    complete_streak()
+
+    achievements['largest_wins'] = [gs for gs in by_points_difference_top.games() if gs.is_won]
+    achievements['largest_defeats'] = [gs for gs in by_points_difference_bottom.games() if gs.is_lost]
+    achievements['best_offensive_games'] = by_points_scored_top.games()
+    achievements['worst_offensive_games'] = by_points_scored_bottom.games()
+    achievements['best_defensive_games'] = by_points_conceded_bottom.games()
+    achievements['worst_defensive_games'] = by_points_conceded_top.games()
+
+    return achievements
@@ -0,0 +1,82 @@
+"""
+Activity of franchises over time.
+
+A franchise is active on a date if one of its seasons spans the date, and long-term active
+on a date between the first week of its first season and the last week of its last season.
+FranchiseActivity keeps the interval and the merged season spans of one franchise, so both
+checks take a comparison or a bisect instead of a scan over the seasons of the franchise.
+
+ActivityIndex answers which franchises join, leave or remain at a season boundary,
+which TeamRatings needs at every change of season, and remembers the answer per boundary.
+"""
+
+import bisect
+
+
+class FranchiseActivity:
+    """
+    Active interval and season spans of a franchise with the given seasons.
+    """
+    __slots__ = ('first_date', 'last_date', '_span_starts', '_span_ends')
+
+    def __init__(self, seasons):
+        spans = sorted((s.first_week_date, s.last_week_date) for s in seasons)
+
+        self.first_date = spans[0][0] if spans else None
+        self.last_date = max(end for _, end in spans) if spans else None
+
+        # Overlapping season spans are merged so that the span starting last on or before a date
+        # is the only one which can contain it.
+        self._span_starts = []
+        self._span_ends = []
+        for start, end in spans:
+            if self._span_ends and start <= self._span_ends[-1]:
+                self._span_ends[-1] = max(self._span_ends[-1], end)
+            else:
+                self._span_starts.append(start)
+                self._span_ends.append(end)
+
+    def is_active_on(self, date):
+        i = bisect.bisect_right(self._span_starts, date) - 1
+        return i >= 0 and date <= self._span_ends[i]
+
+    def is_long_term_active_on(self, date):
+        return self.first_date is not None and self.first_date <= date <= self.last_date
+
+
+class SeasonTransition:
+    """
+    Franchises, in the order of the index, which join, leave or remain long-term active
+    when the season starting on last_date is followed by the season starting on next_date.
+    """
+    __slots__ = ('joining', 'leaving', 'remaining')
+
+    def __init__(self, joining, leaving, remaining):
+        self.joining = joining
+        self.leaving = leaving
+        self.remaining = remaining
+
+
+class ActivityIndex:
+
+    def __init__(self, franchises):
+        self.franchises = list(franchises)
+        self._transitions = {}
+
+    def get_transition(self, last_date, next_date):
+        key = (last_date, next_date)
+        if key not in self._transitions:
+            joining = []
+            leaving = []
+            remaining = []
+            for f in self.franchises:
+                was_active = f.activity.is_long_term_active_on(last_date)
+                is_active = f.activity.is_long_term_active_on(next_date)
+                if was_active and is_active:
+                    remaining.append(f)
+                elif was_active:
+                    leaving.append(f)
+                elif is_active:
+                    joining.append(f)
+            self._transitions[key] = SeasonTransition(joining=joining, leaving=leaving, remaining=remaining)
+        return self._transitions[key]
@@ -3,11 +3,11 @@ import datetime as dt
 import os
 
 from cached_property import cached_property
-from sqlalchemy import create_engine
 
 from unicorn import unicorn_root_dir
 from unicorn.configuration import logging
 from unicorn.core.utils import AttrDict
+from unicorn.db.sqlite import get_engine, persist
 from unicorn.runtime_context import RuntimeContext
 
 log = logging.getLogger(__name__)
@@ -19,14 +19,46 @@ app_data = AttrDict({
     'seasons': None,
     'manual_scores': None,
     'teams': None,
+    'game_side_columns': None,
+    'head_to_head': None,
 })
 
 
+def parse_as_of(value):
+    """
+    Parses an ISO 8601 date or date and time in UTC, e.g. 2019-06-01 or 2019-06-01T18:30.
+    A date means midnight at the start of that day.
+    """
+    return dt.datetime.fromisoformat(value)
+
+
+def clear_app_data():
+    """
+    Forget all data cached in app_data and the current season and team ratings cached on app
+    so that they are reloaded from the database on next access.
+    """
+    for k in app_data:
+        app_data[k] = None
+    for name in ('current_season', 'team_ratings'):
+        app.__dict__.pop(name, None)
+
+
 class App(RuntimeContext):
     _allowed_vars = (
         'dry_run',
         'db_name',
         'db_session',
+        'ingest_workers',
+        'season_parser',
+        'season_parse_cache_dir',
+        'input_dir',
+        'data_dir',
+        'gm_base_url',
+        'sqlite_profile',
+        'db_in_memory',
+        'as_of',
+        'history_cutoff',
+        'rating_checkpoint_dir',
     )
 
     @property
@@ -40,12 +72,186 @@ class App(RuntimeContext):
     def db_name(self, value):
         self.set('db_name', value)
 
+    @property
+    def input_dir(self):
+        """
+        Directory with season-pages/ and current-season/ GoMammoth pages.
+        """
+        if 'input_dir' in self:
+            return self.get('input_dir')
+        else:
+            return os.environ.get('UNICORN_INPUT_DIR', os.path.join(unicorn_root_dir, 'input'))
+
+    @input_dir.setter
+    def input_dir(self, value):
+        self.set('input_dir', value)
+
+    @property
+    def data_dir(self):
+        """
+        Directory with franchises.csv, franchise_seasons.csv and manual_scores.csv.
+        """
+        if 'data_dir' in self:
+            return self.get('data_dir')
+        else:
+            return os.environ.get('UNICORN_DATA_DIR', os.path.join(unicorn_root_dir, 'unicorn/data'))
+
+    @data_dir.setter
+    def data_dir(self, value):
+        self.set('data_dir', value)
+
+    @property
+    def gm_base_url(self):
+        """
+        URL of the GoMammoth fixtures site from which unicorn.v2.fetcher downloads season pages.
+        """
+        if 'gm_base_url' in self:
+            return self.get('gm_base_url')
+        else:
+            return os.environ.get('UNICORN_GM_BASE_URL', 'https://gomammoth.spawtz.com/External/Fixtures/')
+
+    @gm_base_url.setter
+    def gm_base_url(self, value):
+        self.set('gm_base_url', value)
+
+    @property
+    def ingest_workers(self):
+        """
+        Number of worker processes used to parse season pages, 1 means parse serially.
+        """
+        if 'ingest_workers' in self:
+            return self.get('ingest_workers')
+        else:
+            return int(os.environ.get('UNICORN_INGEST_WORKERS', 1))
+
+    @ingest_workers.setter
+    def ingest_workers(self, value):
+        self.set('ingest_workers', value)
+
+    @property
+    def season_parser(self):
+        """
+        Name of the season page parser backend, see unicorn.v2.season_parsers.
+        """
+        if 'season_parser' in self:
+            return self.get('season_parser')
+        else:
+            return os.environ.get('UNICORN_SEASON_PARSER', 'standard')
+
+    @season_parser.setter
+    def season_parser(self, value):
+        self.set('season_parser', value)
+
+    @property
+    def season_parse_cache_dir(self):
+        """
+        Directory of the on-disk cache of parsed season pages, empty to disable the cache.
+        """
+        if 'season_parse_cache_dir' in self:
+            return self.get('season_parse_cache_dir')
+        else:
+            return os.environ.get('UNICORN_SEASON_PARSE_CACHE_DIR', os.path.join(unicorn_root_dir, 'cache/season-parses'))
+
+    @season_parse_cache_dir.setter
+    def season_parse_cache_dir(self, value):
+        self.set('season_parse_cache_dir', value)
+
+    @property
+    def rating_checkpoint_dir(self):
+        """
+        Directory of the on-disk checkpoints of team ratings, empty to disable checkpoints.
+        """
+        if 'rating_checkpoint_dir' in self:
+            return self.get('rating_checkpoint_dir')
+        else:
+            return os.environ.get(
+                'UNICORN_RATING_CHECKPOINT_DIR', os.path.join(unicorn_root_dir, 'cache/rating-checkpoints'),
+            )
+
+    @rating_checkpoint_dir.setter
+    def rating_checkpoint_dir(self, value):
+        self.set('rating_checkpoint_dir', value)
+
+    @property
+    def sqlite_profile(self):
+        """
+        Name of the PRAGMA profile applied to database connections, see unicorn.db.sqlite.sqlite_profiles.
+        """
+        if 'sqlite_profile' in self:
+            return self.get('sqlite_profile')
+        else:
+            return os.environ.get('UNICORN_SQLITE_PROFILE', 'default')
+
+    @sqlite_profile.setter
+    def sqlite_profile(self, value):
+        self.set('sqlite_profile', value)
+
+    @property
+    def db_in_memory(self):
+        """
+        If true, the database is loaded into memory and only written to db_name by persist_db().
+        """
+        if 'db_in_memory' in self:
+            return self.get('db_in_memory')
+        else:
+            return os.environ.get('UNICORN_DB_IN_MEMORY', '').lower() in ('1', 'true', 'yes')
+
+    @db_in_memory.setter
+    def db_in_memory(self, value):
+        self.set('db_in_memory', value)
+
+    @property
+    def history_cutoff(self):
+        """
+        Time in UTC as of which the site is rebuilt as it looked then, or None to show everything.
+
+        Set by UNICORN_AS_OF. take_snapshot() then leaves out seasons and games which start later,
+        counts aggregates and standings of the games until then only and team ratings rate only them.
+        A build without it lists upcoming fixtures too.
+        """
+        if 'history_cutoff' in self:
+            return self.get('history_cutoff')
+        else:
+            value = os.environ.get('UNICORN_AS_OF')
+            return parse_as_of(value) if value else None
+
+    @history_cutoff.setter
+    def history_cutoff(self, value):
+        self.set('history_cutoff', value)
+
+    @property
+    def as_of(self):
+        """
+        Clock of the build in UTC: games which start later are not completed yet and seasons
+        whose last week is not over yet are not finished.
+
+        The history_cutoff if there is one, otherwise the clock on first access. Frozen in the outermost context
+        so that all pages and ratings of a build use the same time.
+        """
+        if 'as_of' not in self:
+            as_of = self.history_cutoff or dt.datetime.utcnow()
+            if not self._stack:
+                return as_of
+            self._stack[0]['as_of'] = as_of
+        return self.get('as_of')
+
+    @as_of.setter
+    def as_of(self, value):
+        self.set('as_of', value)
+
     def get_db_url(self):
         return 'sqlite:///{}'.format(self.db_name)
 
-    @cached_property
+    @property
     def db_engine(self):
-        return create_engine(self.get_db_url())
+        return get_engine(self.db_name, profile=self.sqlite_profile, in_memory=self.db_in_memory)
+
+    def persist_db(self):
+        """
+        Write the in-memory database to db_name, does nothing if the database is not in memory.
+        """
+        if self.db_in_memory:
+            persist(self.db_engine, self.db_name)
 
     @property
     def db_session(self):
@@ -80,21 +286,49 @@ class App(RuntimeContext):
             app_data.seasons = {s.id: s for s in Season.get_all()}
         return app_data.seasons
 
+    @property
+    def game_side_columns(self):
+        """
+        Columnar store of the game sides of all teams of all franchises in chronological order,
+        see unicorn.columnar.
+        """
+        from unicorn.columnar import GameSideColumns
+        if app_data.game_side_columns is None:
+            app_data.game_side_columns = GameSideColumns(sorted(
+                (gs for f in self.franchises.values() for t in f.teams for gs in t.games),
+                key=lambda gs: (gs.starts_at, gs.game_id),
+            ))
+        return app_data.game_side_columns
+
+    @property
+    def head_to_head(self):
+        """
+        Head-to-head statistics of all pairs of franchises, see unicorn.stats.Head2HeadMatrix.
+        """
+        from unicorn.stats import Head2HeadMatrix
+        if app_data.head_to_head is None:
+            app_data.head_to_head = Head2HeadMatrix(self.franchises.values(), self.game_side_columns)
+        return app_data.head_to_head
+
     @cached_property
     def current_season(self):
-        from unicorn.models import Season
-        return sorted((s for s in Season.get_all()), key=lambda s: s.first_week_date, reverse=True)[0]
+        """
+        The latest season which started by as_of, or the earliest season if none did.
+        """
+        seasons = sorted(self.seasons.values(), key=lambda s: s.first_week_date, reverse=True)
+        as_of_date = self.as_of.date()
+        return next((s for s in seasons if s.first_week_date <= as_of_date), seasons[-1])
 
     @property
     def generation_time_str(self):
-        return dt.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        return self.as_of.strftime('%Y-%m-%d %H:%M:%S')
 
     @property
     def franchise_seasons(self):
         from unicorn.models import Franchise
         if app_data.franchise_seasons is None:
             app_data.franchise_seasons = []
-            with open(os.path.join(unicorn_root_dir, 'unicorn/data/franchise_seasons.csv')) as f:
+            with open(os.path.join(self.data_dir, 'franchise_seasons.csv')) as f:
                 for row in csv.DictReader(f):
                     franchise_id = int(row['franchise_id'])
                     if franchise_id not in self.franchises:
@@ -111,7 +345,7 @@ class App(RuntimeContext):
     def manual_scores(self):
         if app_data.manual_scores is None:
             app_data.manual_scores = {}
-            with open(os.path.join(unicorn_root_dir, 'unicorn/data/manual_scores.csv')) as f:
+            with open(os.path.join(self.data_dir, 'manual_scores.csv')) as f:
                 for row in csv.DictReader(f):
                     game_id = int(row['game_id'])
                     self.manual_scores[game_id] = {
@@ -135,9 +369,10 @@ class App(RuntimeContext):
 
     @cached_property
     def team_ratings(self):
-        from unicorn.v2.team_ratings import TeamRatings
-        team_ratings = TeamRatings()
-        team_ratings.calculate()
+        from unicorn.v2.team_ratings_fast import FastTeamRatings
+        team_ratings = FastTeamRatings()
+        # Checkpoints of a historical build would replace those of the full game stream.
+        team_ratings.calculate(checkpoint_dir=self.rating_checkpoint_dir if self.history_cutoff is None else None)
         return team_ratings
 
 
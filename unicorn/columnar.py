@@ -0,0 +1,130 @@
+"""
+Columnar store of game sides for vectorized statistics.
+
+GameSideColumns copies the attributes of all game sides which statistics group and sum by
+into NumPy arrays once per build, after which records, score sums and averages of any grouping,
+e.g. per franchise and opponent franchise and stage for head-to-head statistics, are computed
+with a handful of array operations instead of Python loops over game side objects.
+
+Missing ids are stored as -1 and missing scores as 0 with a separate has_* mask.
+"""
+
+import numpy as np
+
+from unicorn.values import GameOutcomes, SeasonStages
+
+stage_regular = 0
+stage_finals = 1
+
+stage_names = {
+    stage_regular: 'regular',
+    stage_finals: 'finals',
+}
+
+# Outcome codes are indexes into this tuple, a missing outcome has the code len(outcomes).
+outcomes = (
+    GameOutcomes.won,
+    GameOutcomes.lost,
+    GameOutcomes.drawn,
+    GameOutcomes.forfeit_for,
+    GameOutcomes.forfeit_against,
+    GameOutcomes.missing,
+)
+
+_outcome_codes = {outcome: code for code, outcome in enumerate(outcomes)}
+
+_won_codes = [_outcome_codes[o] for o in (GameOutcomes.won, GameOutcomes.forfeit_for)]
+_drawn_codes = [_outcome_codes[GameOutcomes.drawn]]
+_lost_codes = [_outcome_codes[o] for o in (GameOutcomes.lost, GameOutcomes.forfeit_against)]
+
+# Metrics computed by GameSideColumns.aggregate(), each as a (sum, count) pair where count
+# is the number of game sides with a value -- all for played, won, drawn and lost,
+# those with the score(s) for score metrics.
+aggregate_metrics = ('played', 'won', 'drawn', 'lost', 'score_for', 'score_against', 'score_difference')
+
+
+def _id_or_missing(value):
+    return -1 if value is None else value
+
+
+class GameSideColumns:
+    """
+    All game sides of a build as NumPy arrays, position i of every array describes game_sides[i].
+    """
+
+    def __init__(self, game_sides):
+        self.game_sides = list(game_sides)
+
+        self.franchise_id = self._int_column('franchise_id')
+        self.opponent_franchise_id = self._int_column('opponent_franchise_id')
+        self.stage = np.array([
+            stage_regular if SeasonStages.is_regular(gs.season_stage) else stage_finals for gs in self.game_sides
+        ], dtype=np.int8)
+        self.outcome = np.array([
+            _outcome_codes.get(gs.outcome, len(outcomes)) for gs in self.game_sides
+        ], dtype=np.int8)
+
+        self.has_score = np.array([gs.score is not None for gs in self.game_sides], dtype=bool)
+        self.score = np.array([gs.score or 0 for gs in self.game_sides], dtype=np.int64)
+        self.has_opponent_score = np.array([gs.opponent_score is not None for gs in self.game_sides], dtype=bool)
+        self.opponent_score = np.array([gs.opponent_score or 0 for gs in self.game_sides], dtype=np.int64)
+
+        # Results of aggregate() by its keys, the columns never change.
+        self._aggregates = {}
+
+    def _int_column(self, attr):
+        return np.array([_id_or_missing(getattr(gs, attr)) for gs in self.game_sides], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.game_sides)
+
+    def _group(self, keys):
+        """
+        Returns (unique key rows, inverse) of the grouping by the named columns.
+        """
+        key_columns = np.stack([getattr(self, key).astype(np.int64) for key in keys], axis=1)
+        groups, inverse = np.unique(key_columns.reshape(len(self), len(keys)), axis=0, return_inverse=True)
+        return groups, inverse.reshape(-1)
+
+    def aggregate(self, *keys):
+        """
+        Group game sides by the named columns, e.g. aggregate('franchise_id', 'stage'), and
+        return a dictionary mapping tuples of key values to dictionaries of (sum, count) of all aggregate_metrics.
+        """
+        if keys not in self._aggregates:
+            self._aggregates[keys] = self._aggregate(keys)
+        return self._aggregates[keys]
+
+    def _aggregate(self, keys):
+        if not len(self):
+            return {}
+
+        groups, inverse = self._group(keys)
+        num_groups = len(groups)
+
+        def count(mask):
+            return np.bincount(inverse, weights=mask, minlength=num_groups)
+
+        def total(values, mask):
+            return np.bincount(inverse, weights=np.where(mask, values, 0), minlength=num_groups)
+
+        has_both_scores = self.has_score & self.has_opponent_score
+        ones = np.ones(len(self), dtype=bool)
+        played = count(ones)
+        sums = {
+            'played': (played, played),
+            'won': (count(np.isin(self.outcome, _won_codes)), played),
+            'drawn': (count(np.isin(self.outcome, _drawn_codes)), played),
+            'lost': (count(np.isin(self.outcome, _lost_codes)), played),
+            'score_for': (total(self.score, self.has_score), count(self.has_score)),
+            'score_against': (total(self.opponent_score, self.has_opponent_score), count(self.has_opponent_score)),
+            'score_difference': (total(self.score - self.opponent_score, has_both_scores), count(has_both_scores)),
+        }
+
+        result = {}
+        for i, group in enumerate(groups.tolist()):
+            result[tuple(group)] = {
+                metric: (int(metric_sums[i]), int(metric_counts[i]))
+                for metric, (metric_sums, metric_counts) in sums.items()
+            }
+        return result
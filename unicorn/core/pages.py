@@ -1,10 +1,11 @@
 import os.path
 
-from jinja2 import Environment, PackageLoader, select_autoescape
+from jinja2 import Environment, PackageLoader, nodes, select_autoescape
 
 from unicorn import unicorn_root_dir
 from unicorn.app import app
 from unicorn.core import markup
+from unicorn.team_metrics import stages, team_metrics
 
 env = Environment(
     loader=PackageLoader('unicorn', 'templates'),
@@ -105,6 +106,26 @@ def generate_page_inside_container(template, **context_extras):
     )
 
 
+def find_unknown_team_metrics(team_cls, variable_names=('team',)):
+    """
+    Returns a list of (template name, attribute name) of all <stage>_* attributes of template variables
+    named like variable_names that are neither attributes of team_cls nor registered team metrics,
+    so that a misspelled metric fails before rendering instead of while rendering a page.
+    """
+    unknown = []
+    for template_name in env.list_templates(extensions=('html', 'jinja')):
+        source = env.loader.get_source(env, template_name)[0]
+        for node in env.parse(source).find_all(nodes.Getattr):
+            if not isinstance(node.node, nodes.Name) or node.node.name not in variable_names:
+                continue
+            if node.attr.split('_', 1)[0] not in stages:
+                continue
+            if hasattr(team_cls, node.attr) or node.attr in team_metrics:
+                continue
+            unknown.append((template_name, node.attr))
+    return unknown
+
+
 def write_page(path, content):
     full_path = os.path.join(unicorn_build_dir, path)
     with open(full_path, 'w') as f:
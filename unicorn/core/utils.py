@@ -1,3 +1,6 @@
+import hashlib
+import os.path
+
 _missing = object()
 
 
@@ -18,6 +21,19 @@ def init_instance_dict_safely(instance, kwargs):
             raise ValueError('Unexpected kwarg {!r} passed to {} initialiser'.format(k, cls.__name__))
 
 
+def get_file_hash(*filenames):
+    """
+    Returns a hex digest of the contents of all files, missing or empty filenames are skipped.
+    """
+    h = hashlib.sha256()
+    for filename in filenames:
+        if filename and os.path.isfile(filename):
+            with open(filename, 'rb') as f:
+                h.update(f.read())
+        h.update(b'\0')
+    return h.hexdigest()
+
+
 class AttrDict(dict):
     def __getattr__(self, item):
         return self[item]
@@ -0,0 +1,141 @@
+"""
+SQLite engines with performance profiles.
+
+The database is rebuilt from the input pages by every build, so there is no point in paying
+for durability while building it. A profile is a set of PRAGMAs applied to every new connection:
+
+    * default -- SQLite defaults.
+    * fast -- WAL journal, no fsync, 64 MiB page cache, 256 MiB memory map, temporary tables in memory.
+      A crash during a build can lose the last transactions, but not corrupt the database.
+    * unsafe -- like fast, but with no journal at all. A crash during a build can corrupt the database.
+
+The database can also be built entirely in memory: the database file, if it exists, is copied
+into an in-memory database when the engine connects and persist() copies it back with
+the SQLite backup API.
+"""
+
+import collections
+import os
+import os.path
+import sqlite3
+import stat
+import tempfile
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+
+from unicorn.configuration import logging
+
+log = logging.getLogger(__name__)
+
+
+_fast_pragmas = collections.OrderedDict((
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'OFF'),
+    ('cache_size', -64 * 1024),
+    ('mmap_size', 256 * 1024 * 1024),
+    ('temp_store', 'MEMORY'),
+))
+
+sqlite_profiles = {
+    'default': collections.OrderedDict(),
+    'fast': _fast_pragmas,
+    'unsafe': collections.OrderedDict(_fast_pragmas, journal_mode='OFF'),
+}
+
+
+# Engines are shared by all contexts with the same database, profile and storage
+# so that, in particular, all of them see the same in-memory database.
+_engines = {}
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute('PRAGMA {} = {}'.format(name, value))
+    finally:
+        cursor.close()
+
+
+def create_sqlite_engine(db_name, profile='default', in_memory=False):
+    if profile not in sqlite_profiles:
+        raise ValueError('Unknown SQLite profile {!r}, expected one of {}'.format(profile, ', '.join(sorted(sqlite_profiles))))
+    pragmas = sqlite_profiles[profile]
+
+    if in_memory:
+        # One connection which holds the in-memory database for the lifetime of the engine.
+        engine = create_engine('sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False})
+    else:
+        engine = create_engine('sqlite:///{}'.format(db_name))
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        if in_memory and os.path.isfile(db_name):
+            log.info('Loading {} into memory'.format(db_name))
+            source = sqlite3.connect(db_name)
+            try:
+                source.backup(dbapi_connection)
+            finally:
+                source.close()
+        apply_pragmas(dbapi_connection, pragmas)
+
+    return engine
+
+
+def get_engine(db_name, profile='default', in_memory=False):
+    key = (os.path.abspath(db_name), profile, in_memory)
+    if key not in _engines:
+        _engines[key] = create_sqlite_engine(db_name, profile=profile, in_memory=in_memory)
+    return _engines[key]
+
+
+# Files which SQLite keeps next to a database and applies to it when it is opened.
+_journal_suffixes = ('-wal', '-shm', '-journal')
+
+
+def _get_file_mode(filename):
+    """
+    Returns the permission bits of filename or, if it does not exist, those of a new file under the current umask.
+    """
+    try:
+        return stat.S_IMODE(os.stat(filename).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def persist(engine, db_name):
+    """
+    Copy the database of engine to db_name with the SQLite backup API.
+    The file is replaced atomically so that readers never see a partially written database.
+    It keeps the permissions of the old file, and journals of the old file are deleted
+    so that SQLite does not apply them to the new one.
+    """
+    directory = os.path.dirname(os.path.abspath(db_name))
+    mode = _get_file_mode(db_name)
+    fd, tmp_filename = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(fd)
+    try:
+        raw_connection = engine.raw_connection()
+        try:
+            target = sqlite3.connect(tmp_filename)
+            try:
+                raw_connection.driver_connection.backup(target)
+            finally:
+                target.close()
+        finally:
+            raw_connection.close()
+        # mkstemp() creates files only the owner can read.
+        os.chmod(tmp_filename, mode)
+        for suffix in _journal_suffixes:
+            try:
+                os.remove(db_name + suffix)
+            except FileNotFoundError:
+                pass
+        os.replace(tmp_filename, db_name)
+    except Exception:
+        os.remove(tmp_filename)
+        raise
+    log.info('Persisted in-memory database to {}'.format(db_name))
@@ -0,0 +1,146 @@
+"""
+Form of a franchise over the last N decided games or over a time window.
+
+FranchiseForm sorts the game sides of a franchise once, latest first, and keeps prefix sums
+of wins, draws, losses and scores, so that the record and the average points difference
+of any last N games, calendar year, range of seasons or games since a date take
+a bisect and a couple of subtractions:
+
+    franchise.form.last(5).record
+    franchise.form.year(2019).points_difference_avg
+    franchise.form.since(dt.date(2019, 6, 1)).games
+
+Franchises also expose last<N>_* and year<YYYY>_* attributes for any N and year,
+e.g. franchise.last05_record or franchise.year2019_points_difference_avg, see get_form_attribute().
+"""
+
+import bisect
+import datetime as dt
+import itertools
+import re
+
+_epoch = dt.datetime(1970, 1, 1)
+
+form_attribute_re = re.compile(
+    r'^(?:last(?P<last>\d+)|year(?P<year>\d{4}))_(?P<metric>games|record|points_difference_avg)$'
+)
+
+
+def _to_datetime(value):
+    if isinstance(value, dt.datetime):
+        return value
+    return dt.datetime.combine(value, dt.time())
+
+
+def _sort_key(value):
+    # Microseconds since the epoch, negated so that keys of the latest first games ascend.
+    return -((_to_datetime(value) - _epoch) // dt.timedelta(microseconds=1))
+
+
+class FormWindow:
+    """
+    Game sides of a window, latest first, with their record and average points difference.
+    """
+    __slots__ = ('games', 'record', 'points_difference_avg')
+
+    def __init__(self, games, record, points_difference_avg):
+        self.games = games
+        self.record = record
+        self.points_difference_avg = points_difference_avg
+
+
+class _PrefixSums:
+    """
+    Prefix sums over a list of game sides, the value at i covers games[:i].
+    """
+
+    def __init__(self, games):
+        self.games = games
+        self.won = self._accumulate(1 if gs.is_won else 0 for gs in games)
+        self.drawn = self._accumulate(1 if gs.is_drawn else 0 for gs in games)
+        self.lost = self._accumulate(1 if gs.is_lost else 0 for gs in games)
+        # Scores of all game sides but opponent scores of played games only, like Franchise
+        # has always computed the average points difference.
+        self.score = self._accumulate(gs.score if gs.score is not None else 0 for gs in games)
+        self.played = self._accumulate(1 if gs.was_played else 0 for gs in games)
+        self.played_opponent_score = self._accumulate(gs.opponent_score if gs.was_played else 0 for gs in games)
+
+    @staticmethod
+    def _accumulate(values):
+        return list(itertools.accumulate(values, initial=0))
+
+    def window(self, start, stop):
+        num_played = self.played[stop] - self.played[start]
+        if num_played:
+            points_difference_avg = (
+                (self.score[stop] - self.score[start]) -
+                (self.played_opponent_score[stop] - self.played_opponent_score[start])
+            ) / num_played
+        else:
+            points_difference_avg = 0
+        return FormWindow(
+            games=self.games[start:stop],
+            record=(
+                self.won[stop] - self.won[start],
+                self.drawn[stop] - self.drawn[start],
+                self.lost[stop] - self.lost[start],
+            ),
+            points_difference_avg=points_difference_avg,
+        )
+
+
+class FranchiseForm:
+    """
+    Index of the game sides of a franchise, latest first, answering form queries in O(log n).
+    Game sides which start at the same time keep their order in game_sides.
+    """
+
+    def __init__(self, game_sides):
+        games = sorted(game_sides, key=lambda gs: gs.starts_at, reverse=True)
+        self.games = games
+        self._keys = [_sort_key(gs.starts_at) for gs in games]
+        self._all = _PrefixSums(games)
+        self._decided = _PrefixSums([gs for gs in games if gs.is_decided])
+
+    def last(self, n):
+        """
+        The last n decided games.
+        """
+        return self._decided.window(0, min(n, len(self._decided.games)))
+
+    def between(self, start=None, end=None):
+        """
+        All games which start at or after start and before end, either of which may be a date or a datetime.
+        """
+        stop = len(self.games) if start is None else bisect.bisect_right(self._keys, _sort_key(start))
+        first = 0 if end is None else bisect.bisect_right(self._keys, _sort_key(end))
+        return self._all.window(first, max(first, stop))
+
+    def since(self, start):
+        return self.between(start=start)
+
+    def year(self, year):
+        return self.between(dt.date(year, 1, 1), dt.date(year + 1, 1, 1))
+
+    def seasons(self, first_season, last_season=None):
+        """
+        All games in the weeks from the first week of first_season to the last week of last_season,
+        which defaults to first_season.
+        """
+        last_season = last_season or first_season
+        return self.between(first_season.first_week_date, last_season.last_week_date + dt.timedelta(days=1))
+
+
+def get_form_attribute(form, name):
+    """
+    Returns the value of a last<N>_<metric> or year<YYYY>_<metric> attribute,
+    metric being games, record or points_difference_avg. Raises AttributeError for any other name.
+    """
+    match = form_attribute_re.match(name)
+    if not match:
+        raise AttributeError(name)
+    if match.group('last'):
+        window = form.last(int(match.group('last')))
+    else:
+        window = form.year(int(match.group('year')))
+    return getattr(window, match.group('metric'))
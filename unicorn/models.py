@@ -1,16 +1,18 @@
 import collections
-import datetime as dt
-import itertools
 import re
 
 from cached_property import cached_property
-from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
+from unicorn.achievements import achievement_names, compile_game_achievements
+from unicorn.activity import FranchiseActivity
 from unicorn.app import app
 from unicorn.configuration import logging
+from unicorn.form import FranchiseForm, form_attribute_re, get_form_attribute
 from unicorn.models_base import metadata as base_metadata
-from unicorn.models_base import Base
+from unicorn.models_base import Base, Model
+from unicorn.team_metrics import compile_team_metrics, team_metrics
 from unicorn.values import GameOutcomes, SeasonStages
 
 log = logging.getLogger(__name__)
@@ -19,48 +21,52 @@ log = logging.getLogger(__name__)
 metadata = base_metadata
 
 
-def compile_game_sides_record(game_sides):
-    return (
-        sum(1 for gs in game_sides if gs.is_won),
-        sum(1 for gs in game_sides if gs.is_drawn),
-        sum(1 for gs in game_sides if gs.is_lost),
-    )
+# Metrics of the materialized aggregate tables, see unicorn.v2.aggregates.
+aggregate_metrics = (
+    'num_games',
+    'num_games_decided',
+    'won',
+    'drawn',
+    'lost',
+    'score_for',
+    'score_against',
+    'true_won',
+    'true_drawn',
+    'true_lost',
+    'true_forfeits_for',
+    'true_forfeits_against',
+)
+
+
+def compile_stage_aggregates(stage_aggregates):
+    """
+    Returns a dictionary of the regular, finals and total aggregate of the given per stage aggregates.
+    A stage without an aggregate, e.g. of a team which played no finals, has all metrics zero.
+    """
+    by_stage = {a.season_stage: a for a in stage_aggregates}
+    return {
+        'regular': by_stage.get('regular') or AggregateSum(),
+        'finals': by_stage.get('finals') or AggregateSum(),
+        'total': AggregateSum(by_stage.values()),
+    }
 
 
-def compile_points_difference_avg(game_sides):
-    games = [gs for gs in game_sides if gs.was_played]
-    if games:
-        return (
-            (
-                sum(gs.score for gs in game_sides if gs.score is not None) -
-                sum(gs.opponent.score for gs in games if gs.score is not None)
-            ) / len(games)
-        )
-    else:
-        return 0
+# Behaviour of the models is defined in mixins so that it is shared with
+# the read-only snapshot classes in unicorn.snapshot.
 
 
-class Franchise(Base):
-    __tablename__ = 'franchises'
+class FranchiseMixin(Model):
+    __slots__ = ()
 
-    id = Column(Integer, primary_key=True)
-    name = Column(String(50))
-    status = Column(String(20))
-
-    colors = Column(String(255))
-
-    teams = relationship('Team', back_populates='franchise')
+    @cached_property
+    def activity(self):
+        return FranchiseActivity(self.seasons)
 
     def is_active_on(self, date):
-        d1 = dt.timedelta(days=1)
-        return any(s.first_week_date - d1 < date < s.last_week_date + d1 for s in self.seasons)
+        return self.activity.is_active_on(date)
 
     def is_long_term_active_on(self, date):
-        d1 = dt.timedelta(days=1)
-        return (
-            any(date > s.first_week_date - d1 for s in self.seasons) and
-            any(date < s.last_week_date + d1 for s in self.seasons)
-        )
+        return self.activity.is_long_term_active_on(date)
 
     @cached_property
     def seasons(self):
@@ -70,33 +76,29 @@ class Franchise(Base):
     def num_seasons(self):
         return len(self.teams)
 
+    @cached_property
+    def aggregates(self):
+        return compile_stage_aggregates(self.stage_aggregates)
+
+    @cached_property
+    def aggregates_by_season(self):
+        return {a.season_id: a for a in self.season_aggregates}
+
     @cached_property
     def num_games(self):
-        return sum(sum(1 for gs in t.games if gs.is_decided) for t in self.teams)
+        return self.aggregates['total'].num_games_decided
 
     @cached_property
     def regular_record(self):
-        return (
-            sum(t.regular_record[0] for t in self.teams),
-            sum(t.regular_record[1] for t in self.teams),
-            sum(t.regular_record[2] for t in self.teams),
-        )
+        return self.aggregates['regular'].record
 
     @cached_property
     def finals_record(self):
-        return (
-            sum(t.finals_record[0] for t in self.teams),
-            sum(t.finals_record[1] for t in self.teams),
-            sum(t.finals_record[2] for t in self.teams),
-        )
+        return self.aggregates['finals'].record
 
     @cached_property
     def total_record(self):
-        return (
-            self.regular_record[0] + self.finals_record[0],
-            self.regular_record[1] + self.finals_record[1],
-            self.regular_record[2] + self.finals_record[2],
-        )
+        return self.aggregates['total'].record
 
     @property
     def games(self):
@@ -105,57 +107,11 @@ class Franchise(Base):
 
     @property
     def games_reversed(self):
-        yield from sorted(self.games, key=lambda gs: gs.game.starts_at, reverse=True)
-
-    @cached_property
-    def last05_games(self):
-        games = list(itertools.islice((gs for gs in self.games_reversed if gs.is_decided), 5))
-        return games
-
-    @cached_property
-    def last05_record(self):
-        return compile_game_sides_record(self.last05_games)
-
-    @cached_property
-    def last05_points_difference_avg(self):
-        return compile_points_difference_avg(self.last05_games)
-
-    @cached_property
-    def last15_games(self):
-        games = list(itertools.islice((gs for gs in self.games_reversed if gs.is_decided), 15))
-        return games
+        yield from self.form.games
 
     @cached_property
-    def last15_record(self):
-        return compile_game_sides_record(self.last15_games)
-
-    @cached_property
-    def last15_points_difference_avg(self):
-        return compile_points_difference_avg(self.last15_games)
-
-    @cached_property
-    def year2017_games(self):
-        return [gs for gs in self.games_reversed if gs.game.starts_at.year == 2017]
-
-    @cached_property
-    def year2017_record(self):
-        return compile_game_sides_record(self.year2017_games)
-
-    @cached_property
-    def year2017_points_difference_avg(self):
-        return compile_points_difference_avg(self.year2017_games)
-
-    @cached_property
-    def year2019_games(self):
-        return [gs for gs in self.games_reversed if gs.game.starts_at.year == 2019]
-
-    @cached_property
-    def year2019_record(self):
-        return compile_game_sides_record(self.year2019_games)
-
-    @cached_property
-    def year2019_points_difference_avg(self):
-        return compile_points_difference_avg(self.year2019_games)
+    def form(self):
+        return FranchiseForm(self.games)
 
     @cached_property
     def finals_winners_teams(self):
@@ -177,7 +133,7 @@ class Franchise(Base):
 
     @cached_property
     def teams_sorted(self):
-        return sorted(self.teams, key=lambda t: t.season.first_week_date)
+        return sorted(self.teams, key=lambda t: (t.season.first_week_date, t.id))
 
     @cached_property
     def teams_by_all_seasons(self):
@@ -186,7 +142,7 @@ class Franchise(Base):
         for season in app.seasons.values():
             teams[season] = None
 
-        for team in self.teams:
+        for team in self.teams_sorted:
             teams[team.season] = team
 
         return teams
@@ -223,14 +179,7 @@ class Franchise(Base):
 
     @cached_property
     def h2h_stats(self):
-        from unicorn.stats import FranchiseHead2HeadStats
-
-        stats = []
-        for franchise in Franchise.get_all():
-            if franchise is self:
-                continue
-            stats.append(FranchiseHead2HeadStats(us=self, them=franchise))
-        return stats
+        return app.head_to_head.get_row(self)
 
     @property
     def sparkline_labels(self):
@@ -252,219 +201,70 @@ class Franchise(Base):
                 data.append(0)
         return ', '.join(str(d) for d in data)
 
-    @property
+    @cached_property
     def game_achievements(self):
-        achievements = {
-            'longest_winning_streak': 0,
-            'longest_losing_streak': 0,
-            'num_50plus_scored_games': 0,
-            'num_50plus_conceded_games': 0,
-            'num_20minus_scored_games': 0,
-            'num_20minus_conceded_games': 0,
-            'largest_wins': [],
-            'largest_defeats': [],
-            'best_offensive_games': [],
-            'worst_offensive_games': [],
-            'best_defensive_games': [],
-            'worst_defensive_games': [],
-        }
-        longest_winning_streak = []
-        longest_losing_streak = []
-        current_streak = []
-
-        def complete_current_streak():
-            if not current_streak:
-                return
-
-            if current_streak[-1].is_won:
-                if len(current_streak) > len(longest_winning_streak):
-                    longest_winning_streak[:] = list(current_streak)
-            else:
-                if len(current_streak) > len(longest_losing_streak):
-                    longest_losing_streak[:] = list(current_streak)
-            achievements['longest_winning_streak'] = len(longest_winning_streak)
-            achievements['longest_losing_streak'] = len(longest_losing_streak)
-            current_streak[:] = []
-
-        for gs in self.games:
-            # Offensive and Defensive achievements
-
-            if gs.score is None or gs.opponent.score is None:
-                # Exclude games with no score.
-                continue
-
-            if gs.score >= 50:
-                achievements['num_50plus_scored_games'] += 1
-            elif gs.score <= 20 and gs.outcome not in (GameOutcomes.forfeit_against, GameOutcomes.forfeit_for):
-                achievements['num_20minus_scored_games'] += 1
-
-            if gs.opponent.score >= 50:
-                achievements['num_50plus_conceded_games'] += 1
-            elif gs.opponent.score <= 20 and gs.outcome not in (GameOutcomes.forfeit_against, GameOutcomes.forfeit_for):
-                achievements['num_20minus_conceded_games'] += 1
-
-            # Streaks
-
-            if not current_streak:
-                if gs.is_won or gs.is_lost:
-                    current_streak.append(gs)
-                else:
-                    # Ignore draws
-                    pass
-            else:
-                if (gs.is_won and current_streak[-1].is_won) or (gs.is_lost and current_streak[-1].is_lost):
-                    current_streak.append(gs)
-                else:
-                    complete_current_streak()
-                    current_streak.append(gs)
-
-        complete_current_streak()
-
-        by_points_difference = sorted(
-            (gs for gs in self.games if gs.was_played),
-            key=lambda gs: gs.plus_minus
-        )
-        n = min(5, len(by_points_difference))
-        achievements['largest_wins'] = list(gs for gs in reversed(by_points_difference[-n:]) if gs.is_won)
-        achievements['largest_defeats'] = list(gs for gs in by_points_difference[:n] if gs.is_lost)
-
-        by_points_scored = sorted(
-            (gs for gs in self.games if gs.was_played),
-            key=lambda gs: gs.score,
-        )
-        n = min(5, len(by_points_scored))
-        achievements['best_offensive_games'] = list(reversed(by_points_scored[-n:]))
-        achievements['worst_offensive_games'] = by_points_scored[:n]
-
-        by_points_conceded = sorted(
-            (gs for gs in self.games if gs.was_played),
-            key=lambda gs: gs.opponent.score,
-        )
-        achievements['best_defensive_games'] = by_points_conceded[:n]
-        achievements['worst_defensive_games'] = list(reversed(by_points_conceded[-n:]))
-
-        return achievements
+        # Teams of overlapping seasons would interleave their games, so don't rely on the order of self.games.
+        return compile_game_achievements(sorted(self.games, key=lambda gs: (gs.starts_at, gs.game_id)))
 
     def __getattr__(self, item):
-        if not item.startswith('_'):
+        # Only achievements and last<N>_* and year<YYYY>_* form attributes are looked up
+        # dynamically so that probing any other missing attribute does not compile them.
+        if item in achievement_names:
             return self.game_achievements[item]
-        else:
-            return super().__getattribute__(item)
+        if form_attribute_re.match(item):
+            return get_form_attribute(self.form, item)
+        raise AttributeError(item)
 
 
-Franchise.default_order_by = [Franchise.name.asc(), ]
+class Franchise(FranchiseMixin, Base):
+    __tablename__ = 'franchises'
+    __table_args__ = (
+        Index('ix_franchises_name', 'name'),
+    )
 
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+    status = Column(String(20))
 
-class Team(Base):
-    """
-    Team represents a collective of players playing under one name for for one specific season.
+    colors = Column(String(255))
 
-    Team is identified by GoMammoth's <SeasonId>.<TeamId>
-    because GoMammoth reuse TeamIds for somewhat unrelated teams across seasons
-    and sometimes a franchise has used more than one GoMammoth's TeamId.
-    """
-    __tablename__ = 'teams'
+    teams = relationship('Team', back_populates='franchise')
 
-    id = Column(String(15), primary_key=True)
-    season_id = Column(Integer, ForeignKey('seasons.id'))
-    season = relationship('Season', back_populates='teams')
-    franchise_id = Column(Integer, ForeignKey('franchises.id'))
-    franchise = relationship('Franchise', back_populates='teams')
-    name = Column(String(50))
+    stage_aggregates = relationship('FranchiseStageAggregate', viewonly=True)
+    season_aggregates = relationship('FranchiseSeasonAggregate', viewonly=True)
 
-    # Standings table columns
-    regular_rank = Column(Integer)
-    regular_played = Column(Integer)
-    regular_won = Column(Integer)
-    regular_lost = Column(Integer)
-    regular_drawn = Column(Integer)
-    regular_forfeits_for = Column(Integer)
-    regular_forfeits_against = Column(Integer)
-    regular_score_for = Column(Integer)
-    regular_score_against = Column(Integer)
-    regular_score_difference = Column(Integer)
-    regular_bonus_points = Column(Integer)
-    regular_points = Column(Integer)
 
-    # Finals aggregates
-    finals_rank = Column(Integer)
+Franchise.default_order_by = [Franchise.name.asc(), Franchise.id.asc()]
 
-    games = relationship('GameSide')
+
+class TeamMixin(Model):
+    __slots__ = ()
 
     @cached_property
     def regular_games(self):
-        return [gs for gs in self.games if gs.game.is_regular]
+        return [gs for gs in self.games if gs.is_regular]
 
     @cached_property
     def finals_games(self):
-        return [gs for gs in self.games if not gs.game.is_regular]
-
-    def __getattr__(self, item):
-        parts = item.split('_')
-
-        if len(parts) < 2:
-            raise AttributeError(item)
+        return [gs for gs in self.games if not gs.is_regular]
 
-        prefix = parts[0]
-        suffix = parts[-1]
-
-        if prefix not in ('regular', 'finals', 'total'):
-            raise AttributeError(item)
-
-        without_prefix = '_'.join(parts[1:])
-
-        if prefix in ('regular', 'finals'):
-            games = getattr(self, '{}_games'.format(prefix))
-        else:
-            games = self.games
-
-        num_games_decided = sum(1 for gs in games if gs.is_decided)
-
-        if without_prefix == 'num_games_decided':
-            return num_games_decided
-
-        elif without_prefix == 'win_percentage':
-            if num_games_decided == 0:
-                return 0
-            return 100.0 * sum(1 for gs in games if gs.is_won) / num_games_decided
-
-        elif suffix == 'avg':
-            # Automatic finals|regular_<stat>_avg calculation
-
-            if num_games_decided == 0:
-                return 0
-
-            metric = without_prefix.rsplit('_', 1)[0]
-            if hasattr(self, metric):
-                # Metric available on Team
-                total = getattr(self, metric)
-            elif hasattr(GameSide, metric):
-                # Metric available on GameSide, must sum up
-                total = sum(getattr(gs, metric) for gs in games if gs.is_decided)
-            elif metric == 'score_for':
-                # Custom metric
-                total = sum(gs.score for gs in games if gs.is_decided)
-            elif metric == 'score_against':
-                # Custom metric
-                total = sum(gs.opponent.score for gs in games if gs.is_decided)
-            elif metric == 'score_difference':
-                # Custom metric
-                total = sum(gs.score - gs.opponent.score for gs in games if gs.is_decided)
-            else:
-                raise AttributeError(item)
-
-            return total / num_games_decided
+    @cached_property
+    def aggregates(self):
+        return compile_stage_aggregates(self.stage_aggregates)
 
-        elif hasattr(GameSide, without_prefix):
-            # Must aggregate all games
-            return sum(getattr(gs, without_prefix) for gs in games)
+    @cached_property
+    def metrics(self):
+        return compile_team_metrics(self.games)
 
-        else:
-            raise AttributeError(item)
+    def __getattr__(self, item):
+        # Only registered metrics are looked up dynamically, see unicorn.team_metrics.
+        if item in team_metrics:
+            return self.metrics[item]
+        raise AttributeError(item)
 
     @cached_property
     def regular_record(self):
-        return compile_game_sides_record(self.regular_games)
+        return self.aggregates['regular'].record
 
     @cached_property
     def regular_record_str(self):
@@ -472,7 +272,7 @@ class Team(Base):
 
     @cached_property
     def finals_record(self):
-        return compile_game_sides_record(self.finals_games)
+        return self.aggregates['finals'].record
 
     @cached_property
     def finals_record_str(self):
@@ -480,45 +280,51 @@ class Team(Base):
 
     @cached_property
     def total_record(self):
-        regular = self.regular_record
-        finals = self.finals_record
-        return (
-            regular[0] + finals[0],
-            regular[1] + finals[1],
-            regular[2] + finals[2],
-        )
+        return self.aggregates['total'].record
 
     @cached_property
     def total_record_str(self):
         return '-'.join(str(r) for r in self.total_record)
 
+    # Despite their names, the true_regular_* metrics count games of all stages.
+
     @cached_property
     def true_regular_forfeits_for(self):
-        return sum(1 for g in self.games if g.outcome == GameOutcomes.forfeit_for)
+        return self.aggregates['total'].true_forfeits_for
 
     @cached_property
     def true_regular_forfeits_against(self):
-        return sum(1 for g in self.games if g.outcome == GameOutcomes.forfeit_against)
+        return self.aggregates['total'].true_forfeits_against
 
     @cached_property
     def true_regular_won(self):
-        return sum(1 for g in self.games if g.outcome == GameOutcomes.won)
+        return self.aggregates['total'].true_won
 
     @cached_property
     def true_regular_drawn(self):
-        return sum(1 for g in self.games if g.outcome == GameOutcomes.drawn)
+        return self.aggregates['total'].true_drawn
 
     @cached_property
     def true_regular_lost(self):
-        return sum(1 for g in self.games if g.outcome == GameOutcomes.lost)
+        return self.aggregates['total'].true_lost
+
+    @cached_property
+    def true_regular_scored_games(self):
+        # Whether a game is completed depends on app.as_of, so unlike the other true_* metrics
+        # these are not materialized at ingestion but counted when rendering.
+        return [
+            gs for gs in self.games
+            if gs.starts_at <= app.as_of and gs.score is not None and gs.opponent_score is not None and
+            gs.outcome not in (GameOutcomes.forfeit_for, GameOutcomes.forfeit_against)
+        ]
 
     @cached_property
     def true_regular_score_for(self):
-        return sum(g.score for g in self.games if g.game.completed and g.outcome not in (GameOutcomes.forfeit_for, GameOutcomes.forfeit_against))
+        return sum(gs.score for gs in self.true_regular_scored_games)
 
     @cached_property
     def true_regular_score_against(self):
-        return sum(g.opponent.score for g in self.games if g.game.completed and g.outcome not in (GameOutcomes.forfeit_for, GameOutcomes.forfeit_against))
+        return sum(gs.opponent_score for gs in self.true_regular_scored_games)
 
     @cached_property
     def true_regular_score_difference(self):
@@ -526,33 +332,61 @@ class Team(Base):
 
     @cached_property
     def true_regular_scored(self):
-        return sum(1 for g in self.games if g.game.completed and g.outcome not in (GameOutcomes.forfeit_for, GameOutcomes.forfeit_against))
+        return len(self.true_regular_scored_games)
 
 
-Team.default_order_by = [Team.name.asc(), ]
+class Team(TeamMixin, Base):
+    """
+    Team represents a collective of players playing under one name for for one specific season.
 
+    Team is identified by GoMammoth's <SeasonId>.<TeamId>
+    because GoMammoth reuse TeamIds for somewhat unrelated teams across seasons
+    and sometimes a franchise has used more than one GoMammoth's TeamId.
+    """
+    __tablename__ = 'teams'
+    __table_args__ = (
+        Index('ix_teams_franchise_id', 'franchise_id'),
+        Index('ix_teams_season_id', 'season_id'),
+    )
 
-class Game(Base):
-    __tablename__ = 'games'
+    id = Column(String(15), primary_key=True)
+    season_id = Column(Integer, ForeignKey('seasons.id'))
+    season = relationship('Season', back_populates='teams')
+    franchise_id = Column(Integer, ForeignKey('franchises.id'))
+    franchise = relationship('Franchise', back_populates='teams')
+    name = Column(String(50))
 
-    id = Column(Integer, primary_key=True)
+    # Standings table columns
+    regular_rank = Column(Integer)
+    regular_played = Column(Integer)
+    regular_won = Column(Integer)
+    regular_lost = Column(Integer)
+    regular_drawn = Column(Integer)
+    regular_forfeits_for = Column(Integer)
+    regular_forfeits_against = Column(Integer)
+    regular_score_for = Column(Integer)
+    regular_score_against = Column(Integer)
+    regular_score_difference = Column(Integer)
+    regular_bonus_points = Column(Integer)
+    regular_points = Column(Integer)
 
-    season_id = Column(Integer, ForeignKey('seasons.id'))
-    season = relationship('Season', back_populates='games')
+    # Finals aggregates
+    finals_rank = Column(Integer)
 
-    season_stage = Column(String(20), server_default=SeasonStages.regular)
-    starts_at = Column(DateTime)
+    games = relationship('GameSide', order_by='(GameSide.starts_at, GameSide.game_id)')
 
-    score_status = Column(Integer, default=0)
-    score_status_comments = Column(String(255))
+    stage_aggregates = relationship('TeamStageAggregate', viewonly=True)
 
-    notes = Column(Text)
 
-    sides = relationship('GameSide', back_populates='game')
+Team.default_order_by = [Team.name.asc(), Team.id.asc()]
+
+
+class GameMixin(Model):
+    __slots__ = ()
 
     @property
     def completed(self):
-        if self.starts_at > dt.datetime.utcnow():
+        if self.starts_at > app.as_of:
             return False
         return self.home_side.score is not None and self.away_side.score is not None
 
@@ -606,23 +440,35 @@ class Game(Base):
         return self.winner_side.score - self.loser_side.score
 
 
-Game.default_order_by = [Game.starts_at.asc(), ]
+class Game(GameMixin, Base):
+    __tablename__ = 'games'
+    __table_args__ = (
+        Index('ix_games_season_id_starts_at', 'season_id', 'starts_at'),
+        Index('ix_games_starts_at', 'starts_at'),
+    )
 
+    id = Column(Integer, primary_key=True)
 
-class GameSide(Base):
-    __tablename__ = 'game_sides'
+    season_id = Column(Integer, ForeignKey('seasons.id'))
+    season = relationship('Season', back_populates='games')
 
-    id = Column(Integer, primary_key=True)
+    season_stage = Column(String(20), server_default=SeasonStages.regular)
+    starts_at = Column(DateTime)
 
-    team_id = Column(String(15), ForeignKey('teams.id'), nullable=False)
-    team = relationship('Team', foreign_keys=team_id)
+    score_status = Column(Integer, default=0)
+    score_status_comments = Column(String(255))
 
-    score = Column(Integer)
-    points = Column(Integer)
-    outcome = Column(String(5))
+    notes = Column(Text)
+
+    # Home side first, it is stored first.
+    sides = relationship('GameSide', order_by='GameSide.id', back_populates='game')
 
-    game_id = Column(Integer, ForeignKey('games.id'))
-    game = relationship('Game', back_populates='sides')
+
+Game.default_order_by = [Game.starts_at.asc(), Game.id.asc()]
+
+
+class GameSideMixin(Model):
+    __slots__ = ()
 
     @property
     def is_decided(self):
@@ -635,6 +481,10 @@ class GameSide(Base):
             self.outcome not in (GameOutcomes.missing, GameOutcomes.forfeit_for, GameOutcomes.forfeit_against)
         )
 
+    @property
+    def is_regular(self):
+        return self.season_stage == SeasonStages.regular
+
     @property
     def is_won(self):
         return self.is_decided and self.outcome in (GameOutcomes.won, GameOutcomes.forfeit_for)
@@ -661,7 +511,7 @@ class GameSide(Base):
         return '<a href="{}">{} - {}{}</a>'.format(
             self.game.simple_url,
             self.score,
-            self.opponent.score,
+            self.opponent_score,
             '<sup>MS</sup>' if self.game.score_status > 1 else '',
         )
 
@@ -675,24 +525,49 @@ class GameSide(Base):
     @property
     def plus_minus(self):
         if self.score is not None:
-            return self.score - self.opponent.score
+            return self.score - self.opponent_score
         else:
             return None
 
 
-class Season(Base):
-    __tablename__ = 'seasons'
+class GameSide(GameSideMixin, Base):
+    """
+    Besides its own team, score and outcome, every game side carries copies of the opponent's
+    team, score and franchise and of its game's season, stage and start time,
+    so that statistics over game sides need neither the game nor the other side.
+    The copies are written at ingestion and are deliberately not foreign keys.
+    """
+    __tablename__ = 'game_sides'
+    __table_args__ = (
+        Index('ix_game_sides_team_id_starts_at', 'team_id', 'starts_at', 'game_id'),
+        Index('ix_game_sides_game_id', 'game_id'),
+        Index('ix_game_sides_franchise_id_opponent_franchise_id', 'franchise_id', 'opponent_franchise_id'),
+    )
 
     id = Column(Integer, primary_key=True)
-    number = Column(String(2), nullable=True)
-    name = Column(String(50))
-    first_week_date = Column(Date)
-    last_week_date = Column(Date)
 
-    gm_league_id = Column(Integer, nullable=True)
-    gm_division_id = Column(Integer, nullable=True)
+    team_id = Column(String(15), ForeignKey('teams.id'), nullable=False)
+    team = relationship('Team', foreign_keys=team_id)
 
-    teams = relationship('Team', back_populates='season')
+    score = Column(Integer)
+    points = Column(Integer)
+    outcome = Column(String(5))
+
+    game_id = Column(Integer, ForeignKey('games.id'))
+    game = relationship('Game', back_populates='sides')
+
+    # Denormalized from the opponent side, the teams and the game.
+    opponent_team_id = Column(String(15))
+    opponent_score = Column(Integer)
+    franchise_id = Column(Integer)
+    opponent_franchise_id = Column(Integer)
+    season_id = Column(Integer)
+    season_stage = Column(String(20))
+    starts_at = Column(DateTime)
+
+
+class SeasonMixin(Model):
+    __slots__ = ()
 
     @property
     def gm_url(self):
@@ -729,7 +604,7 @@ class Season(Base):
 
     @cached_property
     def regular_finished(self):
-        return self.last_week_date < dt.datetime.utcnow().date()
+        return self.last_week_date < app.as_of.date()
 
     @cached_property
     def regular_teams_ranked(self):
@@ -762,7 +637,123 @@ class Season(Base):
         return '<a href="{}">{}</a>'.format(self.simple_url, self.date_range_str)
 
 
-Season.default_order_by = [Season.first_week_date.asc(), ]
+class Season(SeasonMixin, Base):
+    __tablename__ = 'seasons'
+    __table_args__ = (
+        Index('ix_seasons_first_week_date', 'first_week_date'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    number = Column(String(2), nullable=True)
+    name = Column(String(50))
+    first_week_date = Column(Date)
+    last_week_date = Column(Date)
+
+    gm_league_id = Column(Integer, nullable=True)
+    gm_division_id = Column(Integer, nullable=True)
+
+    teams = relationship('Team', back_populates='season')
+
+
+Season.default_order_by = [Season.first_week_date.asc(), Season.id.asc()]
+
+
+Season.games = relationship('Game', order_by=(Game.starts_at, Game.id), back_populates='season')
+
 
+class AggregateMixin(Model):
+    __slots__ = ()
 
-Season.games = relationship('Game', order_by=Game.starts_at, back_populates='season')
+    @property
+    def record(self):
+        return self.won, self.drawn, self.lost
+
+    def __repr__(self):
+        return '<{} record={}>'.format(self.__class__.__name__, self.record)
+
+
+class AggregateSum(AggregateMixin):
+    """
+    Sum of aggregates, e.g. of the regular season and the finals of a team.
+    """
+    __slots__ = aggregate_metrics
+
+    def __init__(self, aggregates=()):
+        aggregates = list(aggregates)
+        for metric in aggregate_metrics:
+            setattr(self, metric, sum(getattr(a, metric) for a in aggregates))
+
+
+class AggregateColumns:
+    """
+    Columns of the materialized aggregate tables which are filled by unicorn.v2.aggregates at the end of ingestion.
+
+    Nothing depends on the time of the ingestion, so the aggregates stay valid for any app.as_of:
+
+        * num_games -- game sides including undecided ones.
+        * num_games_decided, won, drawn, lost -- decided game sides, forfeits count as won or lost.
+        * score_for, score_against -- scores of decided game sides.
+        * true_won, true_drawn, true_lost, true_forfeits_for, true_forfeits_against -- game sides by outcome.
+
+    Scores of completed games depend on app.as_of and are summed when rendering, see TeamMixin.true_regular_scored.
+    """
+
+    num_games = Column(Integer, nullable=False, default=0)
+    num_games_decided = Column(Integer, nullable=False, default=0)
+    won = Column(Integer, nullable=False, default=0)
+    drawn = Column(Integer, nullable=False, default=0)
+    lost = Column(Integer, nullable=False, default=0)
+    score_for = Column(Integer, nullable=False, default=0)
+    score_against = Column(Integer, nullable=False, default=0)
+    true_won = Column(Integer, nullable=False, default=0)
+    true_drawn = Column(Integer, nullable=False, default=0)
+    true_lost = Column(Integer, nullable=False, default=0)
+    true_forfeits_for = Column(Integer, nullable=False, default=0)
+    true_forfeits_against = Column(Integer, nullable=False, default=0)
+
+
+class TeamStageAggregate(AggregateMixin, AggregateColumns, Base):
+    """
+    Aggregate of the regular season or the finals games of a team.
+    """
+    __tablename__ = 'team_stage_aggregates'
+
+    team_id = Column(String(15), ForeignKey('teams.id'), primary_key=True)
+    season_stage = Column(String(20), primary_key=True)
+
+
+class FranchiseStageAggregate(AggregateMixin, AggregateColumns, Base):
+    """
+    Aggregate of the regular season or the finals games of all teams of a franchise.
+    """
+    __tablename__ = 'franchise_stage_aggregates'
+
+    franchise_id = Column(Integer, ForeignKey('franchises.id'), primary_key=True)
+    season_stage = Column(String(20), primary_key=True)
+
+
+class FranchiseSeasonAggregate(AggregateMixin, AggregateColumns, Base):
+    """
+    Aggregate of all games of a franchise in one season.
+    """
+    __tablename__ = 'franchise_season_aggregates'
+
+    franchise_id = Column(Integer, ForeignKey('franchises.id'), primary_key=True)
+    season_id = Column(Integer, ForeignKey('seasons.id'), primary_key=True)
+
+
+class IngestionManifestEntry(Base):
+    """
+    Records which version of a season page source was last stored in the database,
+    so that unchanged seasons are not re-ingested.
+
+    Identified by the path of the standings page relative to the input directory.
+    """
+    __tablename__ = 'ingestion_manifest'
+
+    id = Column(String(255), primary_key=True)
+    season_id = Column(Integer)
+    content_hash = Column(String(64))
+    franchise_seasons_hash = Column(String(64))
+    manual_scores_hash = Column(String(64))
+    ingested_at = Column(DateTime)
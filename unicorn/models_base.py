@@ -7,10 +7,40 @@ from unicorn.app import app
 metadata = MetaData()
 
 
-class _Base:
-    default_order_by = None
+class Model:
+    """
+    Behaviour shared by the ORM models and their snapshots in unicorn.snapshot.
+    """
+    __slots__ = ()
+
     id = None
 
+    @cached_property
+    def type_name(self):
+        return self.__class__.__tablename__[:-1]
+
+    @cached_property
+    def simple_url(self):
+        return '{}_{}.html'.format(self.type_name, self.id)
+
+    @cached_property
+    def simple_link(self):
+        return '<a href="{}">{}</a>'.format(self.simple_url, self.simple_label)
+
+    @cached_property
+    def simple_label(self):
+        if hasattr(self, 'name'):
+            return self.name
+        else:
+            return '{} {}'.format(self.type_name, self.id)
+
+    def __repr__(self):
+        return '<{} id={} {!r}>'.format(self.__class__.__name__, self.id, self.simple_label)
+
+
+class _Base(Model):
+    default_order_by = None
+
     @classmethod
     def get_all(cls, order_by=None):
         q = app.db_session.query(cls)
@@ -35,27 +65,5 @@ class _Base:
         app.db_session.commit()
         return inst
 
-    @cached_property
-    def type_name(self):
-        return self.__class__.__tablename__[:-1]
-
-    @cached_property
-    def simple_url(self):
-        return '{}_{}.html'.format(self.type_name, self.id)
-
-    @cached_property
-    def simple_link(self):
-        return '<a href="{}">{}</a>'.format(self.simple_url, self.simple_label)
-
-    @cached_property
-    def simple_label(self):
-        if hasattr(self, 'name'):
-            return self.name
-        else:
-            return '{} {}'.format(self.type_name, self.id)
-
-    def __repr__(self):
-        return '<{} id={} {!r}>'.format(self.__class__.__name__, self.id, self.simple_label)
-
 
 Base = declarative_base(metadata=metadata, cls=_Base)
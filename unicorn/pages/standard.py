@@ -1,24 +1,41 @@
+import argparse
+import contextlib
 import inspect
 import os.path
 
-from unicorn.app import app
+from unicorn.app import app, parse_as_of
 from unicorn.core.pages import (
-    generate_page, generate_page_inside_container, generate_pages, unicorn_build_dir, write_page
+    find_unknown_team_metrics, generate_page, generate_page_inside_container, generate_pages, unicorn_build_dir,
+    write_page
 )
-from unicorn.models import Franchise, Game, Season, Team
+from unicorn.models import Team
+from unicorn.preload import no_queries
+from unicorn.snapshot import take_snapshot
 
 
-def main():
+def main(assert_no_queries=False):
+    unknown_metrics = find_unknown_team_metrics(Team)
+    if unknown_metrics:
+        raise ValueError('Unknown team metrics in templates: {}'.format(
+            ', '.join('{} in {}'.format(attr, template) for template, attr in unknown_metrics)
+        ))
+
+    snapshot = take_snapshot()
+
+    # All data is in the snapshot, so rendering should not query the database.
+    with no_queries() if assert_no_queries else contextlib.nullcontext():
+        render_pages(snapshot)
+
+
+def render_pages(snapshot):
     object_types = (
-        ('franchise', Franchise),
-        ('season', Season),
-        ('team', Team),
-        ('game', Game),
+        ('franchise', snapshot.franchises),
+        ('season', snapshot.seasons),
+        ('team', snapshot.teams),
+        ('game', snapshot.games),
     )
 
-    for obj_name, obj_class in object_types:
-        all_objects = obj_class.get_all()
-
+    for obj_name, all_objects in object_types:
         generator = generate_pages(
             items=all_objects,
             template='{}.html'.format(obj_name),
@@ -106,9 +123,19 @@ def main():
 
 
 if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Generate the site')
+    arg_parser.add_argument(
+        '--assert-no-queries', action='store_true', help='fail if rendering queries the database after taking the snapshot',
+    )
+    arg_parser.add_argument(
+        '--as-of', type=parse_as_of, help='build the site as it looked at this UTC date or time, overrides UNICORN_AS_OF',
+    )
+    args = arg_parser.parse_args()
     try:
         with app():
-            main()
+            if args.as_of:
+                app.history_cutoff = args.as_of
+            main(assert_no_queries=args.assert_no_queries)
     except Exception:
         for i in range(-3, 0, 1):
             print('Locals [{}]:\n\t{}'.format(i, inspect.trace()[i][0].f_locals))
@@ -0,0 +1,132 @@
+"""
+Wire up a whole object graph in memory before rendering.
+
+Without that, every hop between franchises, teams, game sides, games and seasons
+is a lazy relationship load, so rendering issues thousands of small SELECTs.
+unicorn.snapshot loads every table with one query and link_object_graph() populates
+all relationships between the loaded objects, after which rendering should not need
+the database at all -- use no_queries() to check that:
+
+    snapshot = take_snapshot()
+    with no_queries():
+        render(snapshot.franchises)
+"""
+
+import collections
+import contextlib
+
+from sqlalchemy import event
+from sqlalchemy.orm.attributes import set_committed_value
+
+from unicorn.app import app, app_data
+from unicorn.core.utils import AttrDict
+
+
+class UnexpectedQueries(AssertionError):
+    pass
+
+
+def _group_by(items, key):
+    groups = collections.defaultdict(list)
+    for item in items:
+        groups[key(item)].append(item)
+    return groups
+
+
+def link_object_graph(
+    franchises, seasons, teams, games, game_sides,
+    team_stage_aggregates=(), franchise_stage_aggregates=(), franchise_season_aggregates=(),
+    set_value=set_committed_value,
+):
+    """
+    Populate all relationships between the given instances with set_value(instance, key, value)
+    and make app.franchises, app.seasons and app.teams return them.
+
+    Related instances are listed in the order_by of each relationship, so the result
+    does not depend on the order of the given instances.
+
+    Returns an AttrDict of lists of all instances of each model in the default order of the model.
+    """
+    franchises_by_id = {f.id: f for f in franchises}
+    seasons_by_id = {s.id: s for s in seasons}
+    teams_by_id = {t.id: t for t in teams}
+    games_by_id = {g.id: g for g in games}
+
+    teams_by_franchise = _group_by(teams, lambda t: t.franchise_id)
+    teams_by_season = _group_by(teams, lambda t: t.season_id)
+    games_by_season = _group_by(games, lambda g: g.season_id)
+    sides_by_team = _group_by(game_sides, lambda gs: gs.team_id)
+    sides_by_game = _group_by(game_sides, lambda gs: gs.game_id)
+    aggregates_by_team = _group_by(team_stage_aggregates, lambda a: a.team_id)
+    aggregates_by_franchise = _group_by(franchise_stage_aggregates, lambda a: a.franchise_id)
+    season_aggregates_by_franchise = _group_by(franchise_season_aggregates, lambda a: a.franchise_id)
+
+    for franchise in franchises:
+        set_value(franchise, 'teams', teams_by_franchise[franchise.id])
+        set_value(franchise, 'stage_aggregates', aggregates_by_franchise[franchise.id])
+        set_value(franchise, 'season_aggregates', season_aggregates_by_franchise[franchise.id])
+
+    for season in seasons:
+        set_value(season, 'teams', teams_by_season[season.id])
+        set_value(season, 'games', sorted(games_by_season[season.id], key=lambda g: (g.starts_at, g.id)))
+
+    for team in teams:
+        set_value(team, 'franchise', franchises_by_id.get(team.franchise_id))
+        set_value(team, 'season', seasons_by_id.get(team.season_id))
+        set_value(team, 'games', sorted(sides_by_team[team.id], key=lambda gs: (gs.starts_at, gs.game_id)))
+        set_value(team, 'stage_aggregates', aggregates_by_team[team.id])
+
+    for game in games:
+        set_value(game, 'season', seasons_by_id.get(game.season_id))
+        set_value(game, 'sides', sorted(sides_by_game[game.id], key=lambda gs: gs.id))
+
+    for game_side in game_sides:
+        set_value(game_side, 'team', teams_by_id.get(game_side.team_id))
+        set_value(game_side, 'game', games_by_id.get(game_side.game_id))
+
+    graph = AttrDict(
+        franchises=sorted(franchises, key=lambda f: (f.name or '', f.id)),
+        seasons=sorted(seasons, key=lambda s: (s.first_week_date, s.id)),
+        teams=sorted(teams, key=lambda t: (t.name or '', t.id)),
+        games=sorted(games, key=lambda g: (g.starts_at, g.id)),
+        game_sides=list(game_sides),
+        team_stage_aggregates=list(team_stage_aggregates),
+        franchise_stage_aggregates=list(franchise_stage_aggregates),
+        franchise_season_aggregates=list(franchise_season_aggregates),
+    )
+
+    app_data.franchises = {f.id: f for f in graph.franchises}
+    app_data.seasons = {s.id: s for s in graph.seasons}
+    app_data.teams = {t.id: t for t in graph.teams}
+
+    return graph
+
+
+@contextlib.contextmanager
+def count_queries(engine=None):
+    """
+    Context manager which yields a list to which the SQL of every statement
+    executed on engine (app.db_engine by default) inside the context is appended.
+    """
+    engine = engine or app.db_engine
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@contextlib.contextmanager
+def no_queries(engine=None):
+    """
+    Context manager which raises UnexpectedQueries if any SQL statement is executed inside it.
+    """
+    with count_queries(engine=engine) as statements:
+        yield
+    if statements:
+        raise UnexpectedQueries('{} unexpected queries, first one:\n{}'.format(len(statements), statements[0]))
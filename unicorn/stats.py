@@ -1,6 +1,29 @@
 from cached_property import cached_property
 
-from unicorn.values import GameOutcomes, SeasonStages
+from unicorn.app import app
+from unicorn.columnar import aggregate_metrics, stage_names
+from unicorn.values import GameOutcomes
+
+_empty_aggregate = {metric: (0, 0) for metric in aggregate_metrics}
+
+_no_games = {'total': [], 'regular': [], 'finals': []}
+
+prefixes = ('total', 'regular', 'finals')
+
+suffixes = ('sum', 'avg')
+
+
+def _build_registry():
+    registry = {}
+    for prefix in prefixes:
+        for metric in aggregate_metrics:
+            for suffix in suffixes:
+                registry['{}_{}_{}'.format(prefix, metric, suffix)] = (prefix, metric, suffix)
+    return registry
+
+
+# Attribute name -> (prefix, metric, suffix), e.g. total_won_sum or regular_score_difference_avg.
+head_to_head_metrics = _build_registry()
 
 
 class InvalidMetricName(Exception):
@@ -8,32 +31,50 @@ class InvalidMetricName(Exception):
 
 
 class FranchiseHead2HeadStats:
-    metrics = {
-        'played': lambda gs: 1,
-        'won': lambda gs: 1 if GameOutcomes.was_won(gs.outcome) else 0,
-        'drawn': lambda gs: 1 if GameOutcomes.was_drawn(gs.outcome) else 0,
-        'lost': lambda gs: 1 if GameOutcomes.was_lost(gs.outcome) else 0,
-        'score_for': lambda gs: gs.score,
-        'score_against': lambda gs: gs.opponent.score,
-        'score_difference': lambda gs: gs.score - gs.opponent.score if gs.score is not None and gs.opponent.score is not None else None,
-    }
-
-    def __init__(self, us, them):
+    """
+    Head-to-head statistics of franchise us against franchise them.
+
+    Sums and averages are looked up in a vectorized aggregate of app.game_side_columns
+    by franchise, opponent franchise and stage instead of summing over game sides.
+    """
+
+    prefixes = prefixes
+
+    def __init__(self, us, them, games_by_prefix=None):
         self.us = us
         self.them = them
+        if games_by_prefix is not None:
+            self.games_by_prefix = games_by_prefix
 
     @property
     def franchise(self):
         return self.them
 
     @cached_property
+    def games_by_prefix(self):
+        """
+        Dictionary of lists of our game sides against them in chronological order by prefix.
+        """
+        return app.head_to_head.get_games(self.us.id, self.them.id)
+
+    @property
     def games(self):
-        all = []
-        for t in self.us.teams:
-            for gs in t.games:
-                if gs.opponent.team.franchise_id == self.them.id:
-                    all.append(gs)
-        return all
+        return self.games_by_prefix['total']
+
+    @cached_property
+    def aggregates(self):
+        """
+        Dictionary of {metric: (sum, count)} dictionaries by prefix.
+        """
+        by_stage = app.game_side_columns.aggregate('franchise_id', 'opponent_franchise_id', 'stage')
+        aggregates = {}
+        for stage, stage_name in stage_names.items():
+            aggregates[stage_name] = by_stage.get((self.us.id, self.them.id, stage), _empty_aggregate)
+        aggregates['total'] = {
+            metric: tuple(r + f for r, f in zip(aggregates['regular'][metric], aggregates['finals'][metric]))
+            for metric in aggregate_metrics
+        }
+        return aggregates
 
     @property
     def total_games(self):
@@ -41,54 +82,44 @@ class FranchiseHead2HeadStats:
 
     @property
     def regular_games(self):
-        return [gs for gs in self.games if SeasonStages.is_regular(gs.game.season_stage)]
+        return self.games_by_prefix['regular']
 
     @property
     def finals_games(self):
-        return [gs for gs in self.games if SeasonStages.is_finals(gs.game.season_stage)]
+        return self.games_by_prefix['finals']
+
+    @cached_property
+    def metrics(self):
+        """
+        Dictionary of values of all head_to_head_metrics, compiled once from the aggregates.
+        """
+        metrics = {}
+        for name, (prefix, metric, suffix) in head_to_head_metrics.items():
+            metric_sum, num_games = self.aggregates[prefix][metric]
+            if suffix == 'sum':
+                metrics[name] = metric_sum
+            elif num_games > 0:
+                metrics[name] = 1.0 * metric_sum / num_games
+            else:
+                metrics[name] = 0
+        return metrics
 
     @property
     def total_win_percentage(self):
-        return 100.0 * self.total_won_sum / self.total_played_sum
+        return 100.0 * self.metrics['total_won_sum'] / self.metrics['total_played_sum']
 
     @property
     def regular_win_percentage(self):
-        return 100.0 * self.regular_won_sum / self.regular_played_sum
+        return 100.0 * self.metrics['regular_won_sum'] / self.metrics['regular_played_sum']
 
     @property
     def finals_win_percentage(self):
-        return 100.0 * self.finals_won_sum / self.finals_played_sum
+        return 100.0 * self.metrics['finals_won_sum'] / self.metrics['finals_played_sum']
 
     def __getattr__(self, item):
-        # prefixes = ('total', 'regular', 'finals')
-        # suffixes = ('sum', 'avg',)
-
-        if '_' not in item:
-            raise InvalidMetricName(item)
-
-        prefix, rest = item.split('_', 1)
-
-        if '_' not in rest:
-            raise InvalidMetricName(item)
-
-        metric_name, suffix = rest.rsplit('_', 1)
-
-        games = getattr(self, '{}_games'.format(prefix))
-
-        all_items = [self.metrics[metric_name](gs) for gs in games]
-        valid_items = [m for m in all_items if m is not None]
-        metric_sum = sum(valid_items)
-        num_games = len(valid_items)
-
-        if suffix == 'sum':
-            return metric_sum
-        elif suffix == 'avg':
-            if num_games > 0:
-                return 1.0 * metric_sum / num_games
-            else:
-                return 0
-        else:
+        if item not in head_to_head_metrics:
             raise InvalidMetricName(item)
+        return self.metrics[item]
 
     @property
     def games_reversed(self):
@@ -119,3 +150,45 @@ class FranchiseHead2HeadStats:
             return 'Lost {}'.format(streak_length)
         else:
             return 'Drawn {}'.format(streak_length)
+
+
+class Head2HeadMatrix:
+    """
+    Head-to-head statistics of every franchise against every other franchise.
+
+    All game sides of app.game_side_columns are bucketed by franchise, opponent franchise and stage
+    in one pass, so head-to-head statistics of all pairs of franchises cost O(games) in total
+    instead of each pair scanning the games of its franchise. The columns are in chronological order,
+    and so is every bucket, which first and last games and streaks rely on.
+    """
+
+    def __init__(self, franchises, columns):
+        self.franchises = list(franchises)
+        self._games = {}
+        for gs, franchise_id, opponent_franchise_id, stage in zip(
+            columns.game_sides,
+            columns.franchise_id.tolist(),
+            columns.opponent_franchise_id.tolist(),
+            columns.stage.tolist(),
+        ):
+            key = (franchise_id, opponent_franchise_id)
+            if key not in self._games:
+                self._games[key] = {'total': [], 'regular': [], 'finals': []}
+            games_by_prefix = self._games[key]
+            games_by_prefix['total'].append(gs)
+            games_by_prefix[stage_names[stage]].append(gs)
+
+    def get_games(self, franchise_id, opponent_franchise_id):
+        """
+        Returns a dictionary of lists of game sides of the franchise against the opponent franchise by prefix.
+        """
+        return self._games.get((franchise_id, opponent_franchise_id), _no_games)
+
+    def get_stats(self, us, them):
+        return FranchiseHead2HeadStats(us=us, them=them, games_by_prefix=self.get_games(us.id, them.id))
+
+    def get_row(self, us):
+        """
+        Returns head-to-head statistics of franchise us against every other franchise.
+        """
+        return [self.get_stats(us, them) for them in self.franchises if them is not us]
@@ -0,0 +1,98 @@
+"""
+Registry of the dynamic <stage>_<metric> attributes of teams, e.g. regular_score_for_avg or total_win_percentage.
+
+Stage is one of regular, finals and total. For each stage a team has:
+
+    * <stage>_num_games_decided
+    * <stage>_win_percentage -- of decided games.
+    * <stage>_<side metric> -- sum over all games of a game side attribute: score, opponent_score or points.
+    * <stage>_<metric>_avg -- average over decided games of a side metric or of score_for, score_against
+      or score_difference.
+
+All metrics of a team are compiled in one pass over its game sides by compile_team_metrics().
+Attributes which Team defines itself, such as the regular_* standings columns, take precedence.
+"""
+
+stages = ('regular', 'finals', 'total')
+
+side_metrics = ('score', 'opponent_score', 'points')
+
+decided_metrics = side_metrics + ('score_for', 'score_against', 'score_difference')
+
+
+def _build_registry():
+    registry = {}
+    for stage in stages:
+        registry['{}_num_games_decided'.format(stage)] = (stage, 'num_games_decided')
+        registry['{}_win_percentage'.format(stage)] = (stage, 'win_percentage')
+        for metric in side_metrics:
+            registry['{}_{}'.format(stage, metric)] = (stage, metric)
+        for metric in decided_metrics:
+            registry['{}_{}_avg'.format(stage, metric)] = (stage, '{}_avg'.format(metric))
+    return registry
+
+
+# Attribute name -> (stage, metric)
+team_metrics = _build_registry()
+
+
+class StageTotals:
+    __slots__ = ('num_games_decided', 'won', 'sums', 'decided_sums')
+
+    def __init__(self):
+        self.num_games_decided = 0
+        self.won = 0
+        self.sums = dict.fromkeys(side_metrics, 0)
+        self.decided_sums = dict.fromkeys(side_metrics, 0)
+
+    def add(self, gs):
+        decided = gs.is_decided
+        for metric in side_metrics:
+            value = getattr(gs, metric)
+            if value is None:
+                continue
+            self.sums[metric] += value
+            if decided:
+                self.decided_sums[metric] += value
+        if decided:
+            self.num_games_decided += 1
+            if gs.is_won:
+                self.won += 1
+
+    def update(self, other):
+        self.num_games_decided += other.num_games_decided
+        self.won += other.won
+        for metric in side_metrics:
+            self.sums[metric] += other.sums[metric]
+            self.decided_sums[metric] += other.decided_sums[metric]
+
+    def get_metrics(self):
+        decided_sums = dict(
+            self.decided_sums,
+            score_for=self.decided_sums['score'],
+            score_against=self.decided_sums['opponent_score'],
+            score_difference=self.decided_sums['score'] - self.decided_sums['opponent_score'],
+        )
+        n = self.num_games_decided
+        metrics = {
+            'num_games_decided': n,
+            'win_percentage': 100.0 * self.won / n if n else 0,
+        }
+        metrics.update(self.sums)
+        for metric in decided_metrics:
+            metrics['{}_avg'.format(metric)] = decided_sums[metric] / n if n else 0
+        return metrics
+
+
+def compile_team_metrics(game_sides):
+    """
+    Returns a dictionary of values of all registered metrics of a team with the given game sides.
+    """
+    totals = {stage: StageTotals() for stage in stages}
+    for gs in game_sides:
+        totals['regular' if gs.is_regular else 'finals'].add(gs)
+    totals['total'].update(totals['regular'])
+    totals['total'].update(totals['finals'])
+
+    metrics_by_stage = {stage: totals[stage].get_metrics() for stage in stages}
+    return {name: metrics_by_stage[stage][metric] for name, (stage, metric) in team_metrics.items()}
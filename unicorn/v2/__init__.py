@@ -1,9 +1,35 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+from unicorn.app import app
+from unicorn.v2 import season_cache
 from unicorn.v2.season_page import SeasonParse
-from unicorn.v2.storage import store_season_page
+from unicorn.v2.season_page_fast import FastSeasonParse
+from unicorn.v2.storage import bulk_store_season_page
+
+season_parsers = {
+    'standard': SeasonParse,
+    'fast': FastSeasonParse,
+}
+
+
+def parse_season(standings_file, fixtures_file=None, parser='standard', cache_dir=None):
+    """
+    Parse season pages without touching the database.
+    The returned SeasonParse is picklable so this can run in a worker process.
+
+    If cache_dir is set, the result is loaded from and saved to the season cache.
+    """
+    if parser not in season_parsers:
+        raise ValueError('Unknown season parser {!r}, expected one of {}'.format(parser, sorted(season_parsers)))
 
+    if cache_dir:
+        cache_key = season_cache.get_cache_key(standings_file, fixtures_file)
+        season_parse = season_cache.load(cache_dir, cache_key)
+        if season_parse is not None:
+            return season_parse
 
-def process_season(standings_file, fixtures_file=None):
-    season_parse = SeasonParse()
+    season_parse = season_parsers[parser]()
 
     with open(standings_file) as f:
         season_parse.parse_standings_page(f.read())
@@ -12,4 +38,40 @@ def process_season(standings_file, fixtures_file=None):
         with open(fixtures_file) as f:
             season_parse.parse_fixtures_page(f.read())
 
-    store_season_page(season_parse)
+    if cache_dir:
+        season_cache.save(cache_dir, cache_key, season_parse)
+
+    return season_parse
+
+
+def parse_seasons(season_files, workers=1, parser='standard', cache_dir=None):
+    """
+    Parse a list of (standings_file, fixtures_file) pairs, one page pair per worker
+    process when workers > 1.
+    Returns a list of SeasonParse in the same order as season_files.
+    """
+    if workers > 1 and len(season_files) > 1:
+        standings_files, fixtures_files = zip(*season_files)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(
+                parse_season,
+                standings_files,
+                fixtures_files,
+                itertools.repeat(parser),
+                itertools.repeat(cache_dir),
+            ))
+    else:
+        return [parse_season(*season_file, parser=parser, cache_dir=cache_dir) for season_file in season_files]
+
+
+def process_season(standings_file, fixtures_file=None, parser='standard'):
+    """
+    Parse season pages, or load them from the season cache, and store them in a single transaction.
+    Returns the number of rows written per table.
+    """
+    return bulk_store_season_page(parse_season(
+        standings_file,
+        fixtures_file,
+        parser=parser,
+        cache_dir=app.season_parse_cache_dir,
+    ))
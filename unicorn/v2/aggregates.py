@@ -0,0 +1,129 @@
+"""
+Materialized aggregates of game sides per team and stage, per franchise and stage and per franchise and season.
+
+Records, scores and game counts of teams and franchises used to be recomputed in Python
+by walking all game sides on every build. Instead, refresh_aggregates() recomputes them
+with INSERT ... SELECT ... GROUP BY at the end of every ingestion, and the models read them
+from TeamStageAggregate, FranchiseStageAggregate and FranchiseSeasonAggregate.
+
+Stage of the aggregates is either "regular" or "finals", the latter including all playoff games.
+All tables are rebuilt from scratch because the franchise of a team can change without any
+season page changing.
+
+Historical builds don't read the tables, unicorn.snapshot selects the aggregates of games
+until app.history_cutoff with select_aggregates() instead.
+"""
+
+from sqlalchemy import and_, case, func, literal, select
+
+from unicorn.app import app
+from unicorn.configuration import logging
+from unicorn.models import (
+    Franchise, FranchiseSeasonAggregate, FranchiseStageAggregate, GameSide, Team, TeamStageAggregate, aggregate_metrics
+)
+from unicorn.values import GameOutcomes, SeasonStages
+
+log = logging.getLogger(__name__)
+
+
+def _count_if(condition):
+    return func.sum(case((condition, 1), else_=0))
+
+
+def _sum_if(condition, value):
+    return func.coalesce(func.sum(case((condition, value), else_=None)), 0)
+
+
+def select_team_stage_aggregates(until=None):
+    """
+    Returns a select of team_stage_aggregates rows computed from game_sides,
+    only of games which start by until if it is set.
+    """
+    side = GameSide.__table__
+
+    stage = case((side.c.season_stage == SeasonStages.regular, literal('regular')), else_=literal('finals'))
+    decided = and_(side.c.score.isnot(None), side.c.outcome.in_(GameOutcomes.decided))
+
+    columns = {
+        'num_games': func.count(),
+        'num_games_decided': _count_if(decided),
+        'won': _count_if(and_(decided, side.c.outcome.in_((GameOutcomes.won, GameOutcomes.forfeit_for)))),
+        'drawn': _count_if(and_(decided, side.c.outcome == GameOutcomes.drawn)),
+        'lost': _count_if(and_(decided, side.c.outcome.in_((GameOutcomes.lost, GameOutcomes.forfeit_against)))),
+        'score_for': _sum_if(decided, side.c.score),
+        'score_against': _sum_if(decided, side.c.opponent_score),
+        'true_won': _count_if(side.c.outcome == GameOutcomes.won),
+        'true_drawn': _count_if(side.c.outcome == GameOutcomes.drawn),
+        'true_lost': _count_if(side.c.outcome == GameOutcomes.lost),
+        'true_forfeits_for': _count_if(side.c.outcome == GameOutcomes.forfeit_for),
+        'true_forfeits_against': _count_if(side.c.outcome == GameOutcomes.forfeit_against),
+    }
+
+    query = select(
+        side.c.team_id,
+        stage.label('season_stage'),
+        *(columns[metric].label(metric) for metric in aggregate_metrics)
+    )
+    if until is not None:
+        query = query.where(side.c.starts_at <= until)
+    return query.group_by(side.c.team_id, stage)
+
+
+def select_franchise_aggregates(team_stage_aggregates, *group_by):
+    """
+    Returns a select of sums of team_stage_aggregates, the table or a subquery, of all teams of a franchise
+    grouped by group_by columns.
+    """
+    franchises = Franchise.__table__
+    teams = Team.__table__
+
+    return select(
+        *group_by,
+        *(func.sum(team_stage_aggregates.c[metric]).label(metric) for metric in aggregate_metrics)
+    ).select_from(
+        # Joining franchises drops teams without a franchise.
+        team_stage_aggregates.join(
+            teams, teams.c.id == team_stage_aggregates.c.team_id,
+        ).join(
+            franchises, franchises.c.id == teams.c.franchise_id,
+        )
+    ).group_by(*group_by)
+
+
+def select_aggregates(until=None):
+    """
+    Returns a list of (table, select) of rows of all aggregate tables.
+
+    Without until, franchise aggregates are summed from the team_stage_aggregates table,
+    so they must be selected after it was written. With until, all aggregates are of games
+    which start by until and are computed from game_sides only.
+    """
+    teams = Team.__table__
+    if until is None:
+        team_stage_aggregates = TeamStageAggregate.__table__
+    else:
+        team_stage_aggregates = select_team_stage_aggregates(until=until).subquery()
+
+    return [
+        (TeamStageAggregate.__table__, select_team_stage_aggregates(until=until)),
+        (FranchiseStageAggregate.__table__, select_franchise_aggregates(
+            team_stage_aggregates, teams.c.franchise_id, team_stage_aggregates.c.season_stage,
+        )),
+        (FranchiseSeasonAggregate.__table__, select_franchise_aggregates(
+            team_stage_aggregates, teams.c.franchise_id, teams.c.season_id,
+        )),
+    ]
+
+
+def refresh_aggregates():
+    """
+    Delete and recompute all aggregate tables without committing.
+    Returns a dictionary of number of rows written per table name.
+    """
+    session = app.db_session
+    rows_written = {}
+    for table, query in select_aggregates():
+        session.execute(table.delete())
+        result = session.execute(table.insert().from_select([c.name for c in query.selected_columns], query))
+        rows_written[table.name] = result.rowcount
+    return rows_written
@@ -0,0 +1,295 @@
+"""
+Ingestion micro-benchmarks.
+
+Times each stage of ingestion separately for every page in input/season-pages
+and for input/current-season, using a throwaway SQLite database:
+
+    * parse_standings_page
+    * parse_fixtures_page (current season only)
+    * store_season_page and bulk_store_season_page
+    * assign_season_numbers
+
+Usage:
+
+    python -m unicorn.v2.benchmark --output new.json --compare old.json
+
+Each stage reports its best time out of --repeat runs, throughput in pages/s, games/s and rows/s
+and peak memory allocated while running it once more under tracemalloc.
+With --compare, stages whose throughput dropped or whose peak memory grew by more than
+--threshold compared to an earlier run are reported and the command exits with status 1.
+"""
+
+import argparse
+import collections
+import copy
+import datetime as dt
+import json
+import os.path
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from unicorn.app import app, clear_app_data
+from unicorn.configuration import logging
+from unicorn.models import metadata
+from unicorn.v2 import season_parsers
+from unicorn.v2.franchises import create_franchises
+from unicorn.v2.go import assign_season_numbers, get_season_files, season_parse_sort_key
+from unicorn.v2.manifest import get_source_id
+from unicorn.v2.storage import build_season_page_rows, bulk_store_season_page, delete_season_rows, store_season_page
+
+log = logging.getLogger(__name__)
+
+
+class StageResult:
+    """
+    Accumulated measurements of one stage, either for one file or for all files.
+    """
+
+    def __init__(self, seconds=0.0, pages=0, games=0, rows=0, peak_memory=0):
+        self.seconds = seconds
+        self.pages = pages
+        self.games = games
+        self.rows = rows
+        self.peak_memory = peak_memory
+
+    def add(self, other):
+        self.seconds += other.seconds
+        self.pages += other.pages
+        self.games += other.games
+        self.rows += other.rows
+        self.peak_memory = max(self.peak_memory, other.peak_memory)
+
+    def per_second(self, value):
+        return value / self.seconds if self.seconds > 0 else 0.0
+
+    def as_dict(self):
+        return collections.OrderedDict((
+            ('seconds', self.seconds),
+            ('pages', self.pages),
+            ('games', self.games),
+            ('rows', self.rows),
+            ('pages_per_second', self.per_second(self.pages)),
+            ('games_per_second', self.per_second(self.games)),
+            ('rows_per_second', self.per_second(self.rows)),
+            ('peak_memory', self.peak_memory),
+        ))
+
+
+# The throughput that is compared between runs for each stage.
+stage_throughput_metrics = {
+    'parse_standings_page': 'games_per_second',
+    'parse_fixtures_page': 'games_per_second',
+    'store_season_page': 'rows_per_second',
+    'bulk_store_season_page': 'rows_per_second',
+    'assign_season_numbers': 'rows_per_second',
+}
+
+
+def measure(func, setup=None, repeat=3):
+    """
+    Returns a tuple of the best time out of repeat calls of func
+    and of the peak memory allocated during one more call of func.
+    setup is called before each call of func and is not timed.
+    """
+    best = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best:
+            best = elapsed
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return best, peak_memory
+
+
+def count_games(game_days):
+    return sum(len(game_day.games) for game_day in game_days)
+
+
+def count_rows(season_parse):
+    return sum(len(table_rows) for table_rows in build_season_page_rows(season_parse).values())
+
+
+def reset_session():
+    # Forget all ORM instances so that re-storing a deleted season does not clash with them.
+    app.db_session.remove()
+    clear_app_data()
+    app.franchise_seasons
+
+
+def run_benchmarks(season_files, parser='standard', repeat=3):
+    """
+    Returns a dictionary of StageResult per file per stage.
+    Must be called inside an app context with a database that has the schema created.
+    """
+    parser_cls = season_parsers[parser]
+    results = collections.OrderedDict()
+    season_parses = []
+
+    for standings_file, fixtures_file in season_files:
+        file_results = results[get_source_id(standings_file)] = collections.OrderedDict()
+
+        with open(standings_file) as f:
+            standings_str = f.read()
+
+        season_parse = parser_cls()
+        season_parse.parse_standings_page(standings_str)
+        seconds, peak_memory = measure(lambda: parser_cls().parse_standings_page(standings_str), repeat=repeat)
+        file_results['parse_standings_page'] = StageResult(
+            seconds=seconds,
+            pages=1,
+            games=count_games(season_parse.game_days),
+            peak_memory=peak_memory,
+        )
+
+        if fixtures_file:
+            with open(fixtures_file) as f:
+                fixtures_str = f.read()
+
+            standings_state = vars(season_parse)
+            fixtures_parse = parser_cls()
+
+            def setup():
+                fixtures_parse.__dict__.update(copy.deepcopy(standings_state))
+
+            seconds, peak_memory = measure(lambda: fixtures_parse.parse_fixtures_page(fixtures_str), setup=setup, repeat=repeat)
+            num_games = count_games(fixtures_parse.game_days) - count_games(season_parse.game_days)
+            file_results['parse_fixtures_page'] = StageResult(
+                seconds=seconds,
+                pages=1,
+                games=num_games,
+                peak_memory=peak_memory,
+            )
+            season_parse = fixtures_parse
+
+        season_parses.append((file_results, season_parse))
+
+    create_franchises()
+
+    for file_results, season_parse in sorted(season_parses, key=lambda x: season_parse_sort_key(x[1])):
+        for stage, store in (
+            ('store_season_page', store_season_page),
+            ('bulk_store_season_page', bulk_store_season_page),
+        ):
+            def setup():
+                delete_season_rows(season_parse.season_id)
+                app.db_session.commit()
+                reset_session()
+
+            seconds, peak_memory = measure(lambda: store(season_parse), setup=setup, repeat=repeat)
+            file_results[stage] = StageResult(
+                seconds=seconds,
+                pages=1,
+                games=count_games(season_parse.game_days),
+                rows=count_rows(season_parse),
+                peak_memory=peak_memory,
+            )
+
+    seconds, peak_memory = measure(assign_season_numbers, setup=reset_session, repeat=repeat)
+    results['all'] = collections.OrderedDict((
+        ('assign_season_numbers', StageResult(
+            seconds=seconds,
+            rows=len(season_parses),
+            peak_memory=peak_memory,
+        )),
+    ))
+
+    return results
+
+
+def summarize(results):
+    totals = collections.OrderedDict()
+    for file_results in results.values():
+        for stage, result in file_results.items():
+            totals.setdefault(stage, StageResult()).add(result)
+    return totals
+
+
+def compare(new, old, threshold):
+    """
+    Returns a list of descriptions of regressions of the new run's stage totals compared to the old ones.
+    """
+    regressions = []
+    for stage, new_totals in new['stages'].items():
+        old_totals = old['stages'].get(stage)
+        if not old_totals:
+            continue
+        metric = stage_throughput_metrics[stage]
+        if new_totals[metric] < old_totals[metric] * (1 - threshold):
+            regressions.append('{}: {} dropped from {:.1f} to {:.1f}'.format(
+                stage, metric, old_totals[metric], new_totals[metric],
+            ))
+        if new_totals['peak_memory'] > old_totals['peak_memory'] * (1 + threshold):
+            regressions.append('{}: peak_memory grew from {} to {}'.format(
+                stage, old_totals['peak_memory'], new_totals['peak_memory'],
+            ))
+    return regressions
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description='Benchmark ingestion stages')
+    arg_parser.add_argument('--output', default='benchmark.json', help='file to write results to')
+    arg_parser.add_argument('--compare', help='results of an earlier run to compare against')
+    arg_parser.add_argument('--threshold', type=float, default=0.1, help='relative change reported as regression')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='number of timed runs per stage and file')
+    arg_parser.add_argument('--parser', default=app.season_parser, choices=sorted(season_parsers))
+    args = arg_parser.parse_args(argv)
+
+    season_files = [(s, f) for s, f in get_season_files() if os.path.isfile(s)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with app(db_name=os.path.join(tmp_dir, 'benchmark.db')):
+            metadata.create_all(app.db_engine)
+            results = run_benchmarks(season_files, parser=args.parser, repeat=args.repeat)
+            app.db_session.remove()
+
+    totals = summarize(results)
+    output = collections.OrderedDict((
+        ('created_at', dt.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')),
+        ('parser', args.parser),
+        ('repeat', args.repeat),
+        ('stages', collections.OrderedDict((stage, r.as_dict()) for stage, r in totals.items())),
+        ('files', collections.OrderedDict(
+            (name, collections.OrderedDict((stage, r.as_dict()) for stage, r in file_results.items()))
+            for name, file_results in results.items()
+        )),
+    ))
+
+    for stage, result in totals.items():
+        log.info('{:<24} {:>8.3f}s {:>8.1f} pages/s {:>10.1f} games/s {:>10.1f} rows/s {:>10.1f} KiB peak'.format(
+            stage,
+            result.seconds,
+            result.per_second(result.pages),
+            result.per_second(result.games),
+            result.per_second(result.rows),
+            result.peak_memory / 1024,
+        ))
+
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=4)
+    log.info('Results written to {}'.format(args.output))
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(output, json.load(f), threshold=args.threshold)
+        for regression in regressions:
+            log.warning('Regression in {}'.format(regression))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
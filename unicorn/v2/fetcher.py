@@ -0,0 +1,240 @@
+"""
+Download GoMammoth season pages into the input directory.
+
+The standings page of every season recorded in the ingestion manifest is downloaded to the file
+it was ingested from and the current season's fixtures page to current-season/fixtures.htm:
+
+    python -m unicorn.v2.fetcher
+    python -m unicorn.v2.fetcher --current-only
+
+Pages are requested concurrently through one pooled requests session. The ETag and Last-Modified
+headers of every response are kept in fetch-state.json in the input directory and sent back as
+If-None-Match and If-Modified-Since, so that a page which has not changed costs one conditional
+request and is not written. A page which comes back with the same content is not written either,
+so its modification time and ingestion manifest hash do not change.
+
+To try it without hitting GoMammoth, serve a copy of the input directory with unicorn.v2.gm_server
+and point UNICORN_GM_BASE_URL at it.
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+import os.path
+import sys
+import tempfile
+from urllib.parse import urlencode, urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from unicorn.app import app
+from unicorn.configuration import logging
+from unicorn.models import Season
+from unicorn.v2 import manifest
+from unicorn.v2.go import get_season_files
+
+log = logging.getLogger(__name__)
+
+
+class FetchOutcomes:
+    not_modified = 'not_modified'
+    unchanged = 'unchanged'
+    written = 'written'
+    failed = 'failed'
+
+
+class FetchTarget:
+    """
+    A page to download and the file to save it to.
+    """
+
+    def __init__(self, url, filename):
+        self.url = url
+        self.filename = filename
+
+    def __repr__(self):
+        return '<{} {!r}>'.format(self.__class__.__name__, self.url)
+
+
+class FetchResult:
+    def __init__(self, target, outcome, etag=None, last_modified=None, error=None):
+        self.target = target
+        self.outcome = outcome
+        self.etag = etag
+        self.last_modified = last_modified
+        self.error = error
+
+
+def get_page_url(base_url, page, season):
+    return urljoin(base_url, '{}.aspx?{}'.format(page, urlencode((
+        ('LeagueId', season.gm_league_id),
+        ('SeasonId', season.id),
+        ('DivisionId', season.gm_division_id),
+    ))))
+
+
+def get_fetch_targets(base_url, current_only=False):
+    """
+    Returns a list of FetchTargets for all seasons in the ingestion manifest, or just for the current season.
+    """
+    current_standings_file, current_fixtures_file = get_season_files()[-1]
+    current_source_id = manifest.get_source_id(current_standings_file)
+    seasons = {s.id: s for s in Season.get_all()}
+
+    targets = []
+    for entry in sorted(manifest.get_entries().values(), key=lambda e: e.id):
+        season = seasons.get(entry.season_id)
+        if season is None or season.gm_league_id is None:
+            log.warning('Cannot fetch {} because its season {} is not stored'.format(entry.id, entry.season_id))
+            continue
+        is_current = entry.id == current_source_id
+        if current_only and not is_current:
+            continue
+        targets.append(FetchTarget(
+            get_page_url(base_url, 'Standings', season),
+            os.path.join(app.input_dir, entry.id),
+        ))
+        if is_current:
+            targets.append(FetchTarget(get_page_url(base_url, 'Fixtures', season), current_fixtures_file))
+    return targets
+
+
+def get_fetch_state_file():
+    return os.path.join(app.input_dir, 'fetch-state.json')
+
+
+def load_fetch_state(filename):
+    """
+    Returns a dictionary of {'etag': ..., 'last_modified': ...} per URL.
+    """
+    if not os.path.isfile(filename):
+        return {}
+    with open(filename) as f:
+        return json.load(f)
+
+
+def write_file_atomically(filename, content):
+    directory = os.path.dirname(filename)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_filename = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_filename, filename)
+    except Exception:
+        os.remove(tmp_filename)
+        raise
+
+
+def save_fetch_state(filename, state):
+    write_file_atomically(filename, json.dumps(state, indent=4, sort_keys=True).encode())
+
+
+def create_session(pool_size):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def fetch(session, target, validators=None, timeout=30):
+    """
+    Download target unless the server says it has not been modified since it was last downloaded
+    and write it to target.filename only if its content has changed.
+    Returns a FetchResult.
+    """
+    validators = validators or {}
+    headers = {}
+    if os.path.isfile(target.filename):
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+    try:
+        response = session.get(target.url, headers=headers, timeout=timeout)
+        if response.status_code == requests.codes.not_modified:
+            return FetchResult(
+                target,
+                FetchOutcomes.not_modified,
+                etag=response.headers.get('ETag', validators.get('etag')),
+                last_modified=response.headers.get('Last-Modified', validators.get('last_modified')),
+            )
+        response.raise_for_status()
+
+        content = response.content
+        if os.path.isfile(target.filename):
+            with open(target.filename, 'rb') as f:
+                is_changed = f.read() != content
+        else:
+            is_changed = True
+        if is_changed:
+            write_file_atomically(target.filename, content)
+    except (requests.RequestException, OSError) as e:
+        return FetchResult(target, FetchOutcomes.failed, error=e)
+
+    return FetchResult(
+        target,
+        FetchOutcomes.written if is_changed else FetchOutcomes.unchanged,
+        etag=response.headers.get('ETag'),
+        last_modified=response.headers.get('Last-Modified'),
+    )
+
+
+def fetch_all(targets, state, workers=4, timeout=30):
+    """
+    Fetch all targets with at most workers requests in flight and update state with
+    the validators of the responses. Returns a list of FetchResults in the order of targets.
+    """
+    with create_session(workers) as session:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda target: fetch(session, target, validators=state.get(target.url), timeout=timeout),
+                targets,
+            ))
+
+    for result in results:
+        if result.outcome == FetchOutcomes.failed:
+            log.error('Failed to fetch {}: {}'.format(result.target.url, result.error))
+            continue
+        log.debug('{} {}'.format(result.outcome, result.target.filename))
+        if result.etag or result.last_modified:
+            state[result.target.url] = {'etag': result.etag, 'last_modified': result.last_modified}
+        else:
+            state.pop(result.target.url, None)
+
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Download GoMammoth season pages into the input directory')
+    arg_parser.add_argument('--current-only', action='store_true', help='only fetch the current season pages')
+    arg_parser.add_argument('--base-url', default=app.gm_base_url)
+    arg_parser.add_argument('--workers', type=int, default=4, help='maximum number of concurrent requests')
+    arg_parser.add_argument('--timeout', type=float, default=30, help='seconds to wait for each response')
+    args = arg_parser.parse_args()
+
+    targets = get_fetch_targets(args.base_url, current_only=args.current_only)
+
+    state_file = get_fetch_state_file()
+    state = load_fetch_state(state_file)
+    results = fetch_all(targets, state, workers=args.workers, timeout=args.timeout)
+    save_fetch_state(state_file, state)
+
+    counts = {outcome: 0 for outcome in (
+        FetchOutcomes.written, FetchOutcomes.unchanged, FetchOutcomes.not_modified, FetchOutcomes.failed,
+    )}
+    for result in results:
+        counts[result.outcome] += 1
+    log.info('Fetched {} pages: {}'.format(len(results), ', '.join('{}={}'.format(k, v) for k, v in counts.items())))
+
+    if counts[FetchOutcomes.failed]:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    with app():
+        main()
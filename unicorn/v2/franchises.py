@@ -1,7 +1,7 @@
 import csv
 import os.path
 
-from unicorn import unicorn_root_dir
+from unicorn.app import app
 from unicorn.configuration import logging
 from unicorn.models import Franchise
 
@@ -9,11 +9,15 @@ log = logging.getLogger(__name__)
 
 
 def create_franchises():
-    with open(os.path.join(unicorn_root_dir, 'unicorn/data/franchises.csv')) as f:
+    """
+    Create franchises or update existing ones from franchises.csv.
+    """
+    with open(os.path.join(app.data_dir, 'franchises.csv')) as f:
         for row in csv.DictReader(f):
-            Franchise.create(
+            app.db_session.merge(Franchise(
                 id=int(row['id']),
                 name=row['name'],
                 status=row['status'],
                 colors=row['colors'],
-            )
+            ))
+    app.db_session.commit()
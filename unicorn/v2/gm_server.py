@@ -0,0 +1,162 @@
+"""
+Local stand-in for the GoMammoth fixtures site.
+
+Serves Standings.aspx and Fixtures.aspx for the pages of an input directory, with ETag and
+Last-Modified headers and 304 Not Modified responses to conditional requests, so that
+unicorn.v2.fetcher can be run against it:
+
+    python -m unicorn.v2.gm_server --input-dir /tmp/unicorn-10x/input --port 8000
+    UNICORN_GM_BASE_URL=http://localhost:8000/ python -m unicorn.v2.fetcher
+
+Pages are looked up by the SeasonId of the fixtures link in their first <h3> and are re-read
+on every request, so editing a file in the served directory changes the page.
+"""
+
+import argparse
+import email.utils
+import hashlib
+import http.server
+import os
+import os.path
+import threading
+from urllib.parse import parse_qs, urlparse
+
+from bs4 import BeautifulSoup
+
+from unicorn.configuration import logging
+from unicorn.v2.season_page import extract_from_link
+from unicorn.v2.season_page_fast import extract_regions
+
+log = logging.getLogger(__name__)
+
+
+def get_page_season_id(filename):
+    with open(filename) as f:
+        soup = BeautifulSoup(extract_regions(f.read()), 'html.parser')
+    return int(extract_from_link(soup.find('h3').find('a'), 'SeasonId'))
+
+
+def index_input_dir(input_dir):
+    """
+    Returns a dictionary of filename per (page, season_id) for the pages in input_dir.
+    """
+    pages = {}
+    season_pages_dir = os.path.join(input_dir, 'season-pages')
+    if os.path.isdir(season_pages_dir):
+        for name in sorted(os.listdir(season_pages_dir)):
+            if name.endswith('.htm'):
+                filename = os.path.join(season_pages_dir, name)
+                pages[('Standings', get_page_season_id(filename))] = filename
+
+    current_standings = os.path.join(input_dir, 'current-season/standings.htm')
+    if os.path.isfile(current_standings):
+        season_id = get_page_season_id(current_standings)
+        pages[('Standings', season_id)] = current_standings
+        pages[('Fixtures', season_id)] = os.path.join(input_dir, 'current-season/fixtures.htm')
+
+    return pages
+
+
+class GmRequestHandler(http.server.BaseHTTPRequestHandler):
+    # Set on subclasses created by create_server
+    pages = None
+    request_counts = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        page = os.path.basename(url.path).rsplit('.', 1)[0]
+        self.request_counts[page] = self.request_counts.get(page, 0) + 1
+
+        try:
+            season_id = int(parse_qs(url.query)['SeasonId'][0])
+        except (KeyError, ValueError):
+            self.send_error(400, 'Missing SeasonId')
+            return
+
+        filename = self.pages.get((page, season_id))
+        if filename is None or not os.path.isfile(filename):
+            self.send_error(404)
+            return
+
+        with open(filename, 'rb') as f:
+            content = f.read()
+        etag = '"{}"'.format(hashlib.sha256(content).hexdigest()[:32])
+        last_modified = email.utils.formatdate(int(os.path.getmtime(filename)), usegmt=True)
+
+        if self.is_not_modified(etag, last_modified):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', last_modified)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def is_not_modified(self, etag, last_modified):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            # If-None-Match takes precedence over If-Modified-Since
+            return etag in (t.strip() for t in if_none_match.split(','))
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since is not None:
+            try:
+                return email.utils.parsedate_to_datetime(if_modified_since) >= email.utils.parsedate_to_datetime(last_modified)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def log_message(self, format, *args):
+        log.debug(format % args)
+
+
+def create_server(input_dir, host='localhost', port=0):
+    """
+    Returns a ThreadingHTTPServer serving the pages of input_dir, port 0 picks a free port.
+    Number of requests per page is kept in server.request_counts.
+    """
+    handler_cls = type('GmRequestHandler', (GmRequestHandler,), {
+        'pages': index_input_dir(input_dir),
+        'request_counts': {},
+    })
+    server = http.server.ThreadingHTTPServer((host, port), handler_cls)
+    server.request_counts = handler_cls.request_counts
+    return server
+
+
+def start_server(input_dir, host='localhost', port=0):
+    """
+    Start serving input_dir in a background thread, returns the server and its base URL.
+    Call server.shutdown() to stop it.
+    """
+    server = create_server(input_dir, host=host, port=port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, 'http://{}:{}/'.format(*server.server_address[:2])
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Serve season pages like the GoMammoth fixtures site')
+    arg_parser.add_argument('--input-dir', required=True)
+    arg_parser.add_argument('--host', default='localhost')
+    arg_parser.add_argument('--port', type=int, default=8000)
+    args = arg_parser.parse_args()
+
+    server = create_server(args.input_dir, host=args.host, port=args.port)
+    log.info('Serving {} pages from {} on http://{}:{}/'.format(
+        len(server.RequestHandlerClass.pages), args.input_dir, args.host, args.port,
+    ))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,44 +1,94 @@
+import collections
 import os.path
 
-from unicorn import unicorn_root_dir
 from unicorn.app import app
 from unicorn.configuration import logging
 from unicorn.models import Season
-from unicorn.v2 import process_season
+from unicorn.v2 import manifest, parse_seasons
+from unicorn.v2.aggregates import refresh_aggregates
 from unicorn.v2.franchises import create_franchises
-
-input_dir = os.path.join(unicorn_root_dir, 'input')
-source_dir = os.path.join(input_dir, 'season-pages')
-
+from unicorn.v2.storage import bulk_store_season_page, delete_season_rows
 
 log = logging.getLogger(__name__)
 
 
 def get_season_page_filenames():
-    for filename in os.listdir(source_dir):
+    source_dir = os.path.join(app.input_dir, 'season-pages')
+    for filename in sorted(os.listdir(source_dir)):
         if filename.endswith('.htm'):
             yield os.path.join(source_dir, filename)
 
 
+def get_season_files():
+    """
+    Returns a list of (standings_file, fixtures_file) pairs for all seasons, current season last.
+    """
+    season_files = [(filename, None) for filename in get_season_page_filenames()]
+    season_files.append((
+        os.path.join(app.input_dir, 'current-season/standings.htm'),
+        os.path.join(app.input_dir, 'current-season/fixtures.htm'),
+    ))
+    return season_files
+
+
+def season_parse_sort_key(season_parse):
+    return season_parse.game_days[0].date, season_parse.season_id
+
+
+def assign_season_numbers():
+    for i, season in enumerate(Season.get_all(order_by=[Season.first_week_date.asc()])):
+        season.number = '{:02}'.format(i + 1)
+    app.db_session.commit()
+
+
 def main():
     create_franchises()
 
-    for filename in get_season_page_filenames():
-        process_season(
-            standings_file=filename
-        )
+    entries = manifest.get_entries()
+    sources = manifest.get_season_sources(get_season_files())
+    changed, removed = manifest.find_changes(sources, entries)
+
+    log.info('{} of {} season sources changed, {} removed'.format(len(changed), len(sources), len(removed)))
 
-    # Current season
-    process_season(
-        standings_file=os.path.join(input_dir, 'current-season/standings.htm'),
-        fixtures_file=os.path.join(input_dir, 'current-season/fixtures.htm'),
+    season_parses = parse_seasons(
+        [s.files for s in changed],
+        workers=app.ingest_workers,
+        parser=app.season_parser,
+        cache_dir=app.season_parse_cache_dir,
     )
 
-    # Assign season numbers
-    for i, season in enumerate(Season.get_all(order_by=[Season.first_week_date.asc()])):
-        season.number = '{:02}'.format(i + 1)
+    # Store in chronological order regardless of the order in which pages were parsed
+    # so that generated row ids do not depend on the number of workers.
+    rows_written = collections.Counter()
+    for source, season_parse in sorted(zip(changed, season_parses), key=lambda x: season_parse_sort_key(x[1])):
+        rows_written.update(bulk_store_season_page(season_parse, replace=True))
+        manifest.record(source, season_parse.season_id)
         app.db_session.commit()
 
+    # Delete seasons which were stored from a changed or removed source
+    # and are no longer produced by any source, e.g. when the current season moves on.
+    changed_ids = set(s.id for s in changed)
+    claimed_season_ids = set(p.season_id for p in season_parses)
+    claimed_season_ids.update(e.season_id for e in entries.values() if e.id not in changed_ids and e not in removed)
+    obsolete_season_ids = set(entries[s.id].season_id for s in changed if s.id in entries)
+    obsolete_season_ids.update(e.season_id for e in removed)
+    for season_id in sorted(obsolete_season_ids - claimed_season_ids):
+        log.info('Deleting season {} which is no longer in the input'.format(season_id))
+        delete_season_rows(season_id)
+    for entry in removed:
+        manifest.forget(entry)
+    app.db_session.commit()
+
+    log.info('Rows written: {}'.format(', '.join('{}={}'.format(k, v) for k, v in sorted(rows_written.items()))))
+
+    assign_season_numbers()
+
+    rows_written = refresh_aggregates()
+    app.db_session.commit()
+    log.info('Aggregates refreshed: {}'.format(', '.join('{}={}'.format(k, v) for k, v in sorted(rows_written.items()))))
+
+    app.persist_db()
+
 
 if __name__ == '__main__':
     with app():
@@ -0,0 +1,112 @@
+"""
+Ingestion manifest.
+
+Every stored season records the content hash of its source pages and of the manually maintained
+CSV files which affect how the pages are stored, so that go.main only re-parses and re-stores
+seasons whose inputs have changed.
+"""
+
+import datetime as dt
+import os.path
+
+from unicorn.app import app
+from unicorn.configuration import logging
+from unicorn.core.utils import get_file_hash
+from unicorn.models import IngestionManifestEntry
+
+log = logging.getLogger(__name__)
+
+
+def get_franchise_seasons_file():
+    return os.path.join(app.data_dir, 'franchise_seasons.csv')
+
+
+def get_manual_scores_file():
+    return os.path.join(app.data_dir, 'manual_scores.csv')
+
+
+def get_source_id(standings_file):
+    return os.path.relpath(standings_file, app.input_dir)
+
+
+class SeasonSource:
+    """
+    A pair of standings and fixtures files of a season together with
+    the hashes that identify their current version.
+    """
+
+    def __init__(self, standings_file, fixtures_file=None, franchise_seasons_hash=None, manual_scores_hash=None):
+        self.standings_file = standings_file
+        self.fixtures_file = fixtures_file
+        self.id = get_source_id(standings_file)
+        self.content_hash = get_file_hash(standings_file, fixtures_file)
+        self.franchise_seasons_hash = franchise_seasons_hash or get_file_hash(get_franchise_seasons_file())
+        self.manual_scores_hash = manual_scores_hash or get_file_hash(get_manual_scores_file())
+
+    @property
+    def files(self):
+        return self.standings_file, self.fixtures_file
+
+    def is_stored_as(self, entry):
+        return (
+            entry is not None and
+            entry.content_hash == self.content_hash and
+            entry.franchise_seasons_hash == self.franchise_seasons_hash and
+            entry.manual_scores_hash == self.manual_scores_hash
+        )
+
+    def __repr__(self):
+        return '<{} {!r}>'.format(self.__class__.__name__, self.id)
+
+
+def get_season_sources(season_files):
+    franchise_seasons_hash = get_file_hash(get_franchise_seasons_file())
+    manual_scores_hash = get_file_hash(get_manual_scores_file())
+    return [
+        SeasonSource(
+            standings_file=standings_file,
+            fixtures_file=fixtures_file,
+            franchise_seasons_hash=franchise_seasons_hash,
+            manual_scores_hash=manual_scores_hash,
+        )
+        for standings_file, fixtures_file in season_files
+    ]
+
+
+def get_entries():
+    return {entry.id: entry for entry in IngestionManifestEntry.get_all()}
+
+
+def find_changes(sources, entries):
+    """
+    Compare season sources against manifest entries.
+
+    Returns a tuple of two lists:
+        * SeasonSource objects of seasons which need to be (re-)ingested
+        * IngestionManifestEntry objects of sources which no longer exist
+    """
+    changed = [s for s in sources if not s.is_stored_as(entries.get(s.id))]
+    source_ids = set(s.id for s in sources)
+    removed = [e for e in entries.values() if e.id not in source_ids]
+    return changed, removed
+
+
+def record(source, season_id):
+    """
+    Record that source has been stored as season_id. Does not commit.
+    """
+    app.db_session.merge(IngestionManifestEntry(
+        id=source.id,
+        season_id=season_id,
+        content_hash=source.content_hash,
+        franchise_seasons_hash=source.franchise_seasons_hash,
+        manual_scores_hash=source.manual_scores_hash,
+        ingested_at=dt.datetime.utcnow(),
+    ))
+
+
+def forget(entry):
+    """
+    Remove entry from the manifest. Does not commit.
+    """
+    app.db_session.delete(entry)
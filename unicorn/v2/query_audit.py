@@ -0,0 +1,191 @@
+"""
+Audit the query plans of all queries of a build.
+
+Runs a representative build against a copy of the database -- a full re-ingestion of all seasons,
+a walk over all lazily loaded relationships of the models and a snapshot for rendering --
+records every distinct statement executed and runs EXPLAIN QUERY PLAN on it:
+
+    alembic upgrade head
+    python -m unicorn.v2.query_audit
+
+Statements whose plan scans a table that their WHERE clause filters on, sorts through
+a temporary B-tree for ORDER BY or has SQLite build an automatic index are reported,
+and the command exits with status 1, so that missing indexes are noticed when queries change.
+"""
+
+import argparse
+import collections
+import os.path
+import re
+import sqlite3
+import sys
+import tempfile
+
+from sqlalchemy import event
+
+from unicorn.app import app, clear_app_data
+from unicorn.configuration import logging
+from unicorn.models import Franchise, IngestionManifestEntry
+from unicorn.snapshot import take_snapshot
+from unicorn.v2 import go
+
+log = logging.getLogger(__name__)
+
+
+_scan_re = re.compile(r'^SCAN (?:TABLE )?(?P<table>\w+)')
+_where_re = re.compile(r'\bWHERE\b', re.I)
+
+
+class RecordedStatement:
+    def __init__(self, statement, parameters, step):
+        self.statement = statement
+        self.parameters = parameters
+        self.steps = [step]
+        self.count = 0
+        self.plan = None
+        self.problems = []
+
+
+class StatementRecorder:
+    """
+    Records distinct statements executed on an engine together with the parameters
+    of their first execution and the build steps which executed them.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.step = None
+        self.statements = collections.OrderedDict()
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if executemany:
+            parameters = parameters[0] if parameters else ()
+        recorded = self.statements.get(statement)
+        if recorded is None:
+            recorded = self.statements[statement] = RecordedStatement(statement, parameters, self.step)
+        elif self.step not in recorded.steps:
+            recorded.steps.append(self.step)
+        recorded.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self.before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'before_cursor_execute', self.before_cursor_execute)
+
+
+def is_auditable(statement):
+    return statement.lstrip().split(None, 1)[0].upper() in ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+
+
+def find_problems(statement, plan):
+    """
+    Returns a list of descriptions of problems in plan, a list of the details of EXPLAIN QUERY PLAN rows.
+    """
+    where = _where_re.split(statement, 1)
+    where_clause = where[1] if len(where) > 1 else ''
+
+    problems = []
+    for detail in plan:
+        scan = _scan_re.match(detail)
+        if scan and '{}.'.format(scan.group('table')) in where_clause:
+            problems.append('full scan of {} filtered in WHERE'.format(scan.group('table')))
+        elif 'AUTOMATIC' in detail:
+            problems.append('automatic index: {}'.format(detail))
+        elif detail.startswith('USE TEMP B-TREE FOR ORDER BY'):
+            problems.append('ORDER BY sorts in a temporary B-tree')
+    return problems
+
+
+def explain(db_name, recorded_statements):
+    connection = sqlite3.connect(db_name)
+    try:
+        for recorded in recorded_statements:
+            rows = connection.execute('EXPLAIN QUERY PLAN {}'.format(recorded.statement), recorded.parameters)
+            recorded.plan = [row[3] for row in rows]
+            recorded.problems = find_problems(recorded.statement, recorded.plan)
+    finally:
+        connection.close()
+
+
+def walk_object_graph():
+    """
+    Touch every lazily loaded relationship between the models the way the pages do.
+    """
+    for franchise in Franchise.get_all():
+        franchise.stage_aggregates
+        franchise.season_aggregates
+        for team in franchise.teams:
+            team.stage_aggregates
+            team.season.games
+            for game_side in team.games:
+                game_side.game.season
+                game_side.opponent.team.franchise
+
+
+def run_build(recorder):
+    recorder.step = 'ingest'
+    # Forget what has been ingested so that every season is stored again.
+    app.db_session.query(IngestionManifestEntry).delete()
+    app.db_session.commit()
+    go.main()
+
+    recorder.step = 'relationships'
+    app.db_session.remove()
+    clear_app_data()
+    walk_object_graph()
+
+    recorder.step = 'snapshot'
+    app.db_session.remove()
+    clear_app_data()
+    take_snapshot()
+
+
+def copy_database(source, target):
+    source_connection = sqlite3.connect(source)
+    target_connection = sqlite3.connect(target)
+    try:
+        source_connection.backup(target_connection)
+    finally:
+        source_connection.close()
+        target_connection.close()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Run EXPLAIN QUERY PLAN over all queries of a build')
+    arg_parser.add_argument('--verbose', action='store_true', help='print plans of all statements')
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_name = os.path.join(tmp_dir, 'audit.db')
+        copy_database(app.db_name, db_name)
+
+        with app(db_name=db_name):
+            with StatementRecorder(app.db_engine) as recorder:
+                run_build(recorder)
+            app.db_session.remove()
+
+        recorded_statements = [r for r in recorder.statements.values() if is_auditable(r.statement)]
+        explain(db_name, recorded_statements)
+
+    num_problems = 0
+    for recorded in recorded_statements:
+        if recorded.problems or args.verbose:
+            print('-- {} executions in {}'.format(recorded.count, ', '.join(recorded.steps)))
+            print(recorded.statement.strip())
+            for detail in recorded.plan:
+                print('    {}'.format(detail))
+            for problem in recorded.problems:
+                print('  ! {}'.format(problem))
+            print()
+        num_problems += len(recorded.problems)
+
+    log.info('Audited {} distinct statements, found {} problems'.format(len(recorded_statements), num_problems))
+
+    if num_problems:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
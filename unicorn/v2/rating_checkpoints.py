@@ -0,0 +1,234 @@
+"""
+On-disk checkpoints of TeamRatings.
+
+Rating all games since the first season on every build is wasteful when only the games of
+the current season change. At the end of each finished season, i.e. at every season boundary
+of the game stream, the full state of the ratings is saved as a JSON document named after
+a key which is a hash of the rating parameters and of everything the ratings have consumed
+so far: the id, season, stage, date and completion of every game, the franchises and outcomes
+of its sides, and the franchises joining, leaving and remaining at every season change.
+
+A build resumes from the latest boundary which has a checkpoint and replays only the games
+after it. Any change to an earlier game, to the K-factor table or to the initial rating changes
+the keys of all later boundaries, so the checkpoints saved for them are no longer found
+and are deleted at the end of the build.
+
+    {
+        "format_version": 1,
+        "key": "1-3f2a...",
+        "index": 1234,
+        "ratings": [[1016.0, 120601, 16.0, null], ...],
+        "current": [0, 5, ...],
+        "best_rating": [...], "worst_rating": [...], "best_game": [...], "worst_game": [...],
+        "num_games": [12, 14, ...],
+        "change_log": [[[120601, 1016], ...], ...],
+        "weekly_leaders": [["2017-01-12", 4], ...]
+    }
+
+Per-franchise lists are in the order of TeamRatings.franchises. Ratings are stored once
+and referenced by position because current, best and worst ratings can be the same object,
+which a season change then adjusts in place.
+"""
+
+import hashlib
+import json
+import os
+import os.path
+import re
+import tempfile
+
+from unicorn.configuration import logging
+from unicorn.v2.team_ratings import RatingValue
+
+log = logging.getLogger(__name__)
+
+
+# Increment whenever the rating rules or the checkpoint format change so that stale checkpoints are not used.
+format_version = 1
+
+_rating_dicts = ('current', 'best_rating', 'worst_rating', 'best_game', 'worst_game')
+
+# Names of checkpoint files of any format version.
+_checkpoint_filename_re = re.compile(r'^\d+-[0-9a-f]{64}\.json$')
+
+
+def get_boundaries(ratings):
+    """
+    Returns a list of (index, key) of all season boundaries of ratings.games,
+    index being the position of the first game of the next season.
+    """
+    h = hashlib.sha256(repr((
+        format_version,
+        ratings.initial_rating,
+        sorted(ratings.game_k_values.items()),
+        [f.id for f in ratings.franchises],
+    )).encode())
+
+    boundaries = []
+    games = ratings.games
+    for i, g in enumerate(games):
+        if i > 0 and games[i - 1].season != g.season:
+            boundaries.append((i, '{}-{}'.format(format_version, h.hexdigest())))
+
+        if not g.completed:
+            h.update(repr((g.id, g.season_id, False)).encode())
+            continue
+
+        if i > 0 and games[i - 1].season != g.season:
+            transition = ratings.activity.get_transition(games[i - 1].season.first_week_date, g.season.first_week_date)
+            h.update(repr((
+                [f.id for f in transition.joining],
+                [f.id for f in transition.leaving],
+                [f.id for f in transition.remaining],
+            )).encode())
+
+        winner_side = g.winner_side
+        h.update(repr((
+            g.id, g.season_id, True, g.season_stage, g.date_str,
+            [(gs.team.franchise_id, gs.is_won, gs.is_drawn, gs is winner_side) for gs in g.sides],
+        )).encode())
+
+    return boundaries
+
+
+def ratings_to_dict(ratings, index, key):
+    rating_values = []
+    positions = {}
+
+    def get_position(rating):
+        if rating is None:
+            return None
+        if id(rating) not in positions:
+            positions[id(rating)] = len(rating_values)
+            rating_values.append([
+                rating.value, rating.game.id if rating.game is not None else None, rating.change, rating._sort_value,
+            ])
+        return positions[id(rating)]
+
+    data = {
+        'format_version': format_version,
+        'key': key,
+        'index': index,
+    }
+    for name in _rating_dicts:
+        values = getattr(ratings, name)
+        data[name] = [get_position(values[f.id]) for f in ratings.franchises]
+    data['ratings'] = rating_values
+    data['num_games'] = [ratings.num_games[f.id] for f in ratings.franchises]
+    data['change_log'] = [[[g.id, value] for g, value in ratings.change_log[f.id]] for f in ratings.franchises]
+    data['weekly_leaders'] = [[date_str, franchise_id] for date_str, franchise_id in ratings.weekly_leaders.items()]
+    return data
+
+
+def restore_ratings(ratings, data):
+    """
+    Set the state of freshly initialised ratings to the one saved in data.
+    """
+    games = {g.id: g for g in ratings.games}
+    rating_values = [
+        RatingValue(value=value, game=games[game_id] if game_id is not None else None, change=change, sort_value=sort_value)
+        for value, game_id, change, sort_value in data['ratings']
+    ]
+
+    for name in _rating_dicts:
+        values = getattr(ratings, name)
+        for f, position in zip(ratings.franchises, data[name]):
+            values[f.id] = rating_values[position] if position is not None else None
+    for f, num_games in zip(ratings.franchises, data['num_games']):
+        ratings.num_games[f.id] = num_games
+    for f, change_log in zip(ratings.franchises, data['change_log']):
+        ratings.change_log[f.id] = [(games[game_id], value) for game_id, value in change_log]
+    ratings.weekly_leaders.clear()
+    for date_str, franchise_id in data['weekly_leaders']:
+        ratings.weekly_leaders[date_str] = franchise_id
+
+
+def get_checkpoint_filename(checkpoint_dir, key):
+    return os.path.join(checkpoint_dir, '{}.json'.format(key))
+
+
+def load(checkpoint_dir, key):
+    """
+    Returns the checkpoint data saved for key or None if there is no valid checkpoint.
+    """
+    filename = get_checkpoint_filename(checkpoint_dir, key)
+    if not os.path.isfile(filename):
+        return None
+    try:
+        with open(filename) as f:
+            data = json.load(f)
+    except ValueError as e:
+        log.warning('Ignoring invalid rating checkpoint {}: {}'.format(filename, e))
+        return None
+    if data.get('format_version') != format_version or data.get('key') != key:
+        return None
+    return data
+
+
+def save(checkpoint_dir, key, data):
+    """
+    Write checkpoint data. The file is replaced atomically
+    so that concurrent writers and readers never see a partial file.
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    fd, tmp_filename = tempfile.mkstemp(dir=checkpoint_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(json.dumps(data))
+        os.replace(tmp_filename, get_checkpoint_filename(checkpoint_dir, key))
+    except Exception:
+        os.remove(tmp_filename)
+        raise
+
+
+def prune(checkpoint_dir, keys):
+    """
+    Delete all checkpoints in checkpoint_dir except those of keys.
+    Returns the number of checkpoints deleted.
+    """
+    keep = set(os.path.basename(get_checkpoint_filename(checkpoint_dir, key)) for key in keys)
+    num_deleted = 0
+    for filename in os.listdir(checkpoint_dir):
+        if _checkpoint_filename_re.match(filename) and filename not in keep:
+            try:
+                os.remove(os.path.join(checkpoint_dir, filename))
+            except FileNotFoundError:
+                # Deleted by a concurrent build
+                continue
+            num_deleted += 1
+    return num_deleted
+
+
+def calculate(ratings, checkpoint_dir):
+    """
+    Calculate freshly initialised ratings resuming from the latest valid checkpoint in checkpoint_dir
+    and save a checkpoint at every later season boundary. Checkpoints of other boundaries,
+    which earlier versions of the games or of the rating rules produced, are deleted afterwards.
+    """
+    boundaries = get_boundaries(ratings)
+
+    start = 0
+    for index, key in reversed(boundaries):
+        data = load(checkpoint_dir, key)
+        if data is not None:
+            restore_ratings(ratings, data)
+            start = index
+            break
+
+    log.info('Resuming team ratings at game {} of {}'.format(start, len(ratings.games)))
+
+    for index, key in boundaries:
+        if index <= start:
+            continue
+        for _ in ratings.advance(start, index):
+            pass
+        save(checkpoint_dir, key, ratings_to_dict(ratings, index, key))
+        start = index
+
+    for _ in ratings.advance(start):
+        pass
+
+    if os.path.isdir(checkpoint_dir):
+        num_deleted = prune(checkpoint_dir, [key for _, key in boundaries])
+        if num_deleted:
+            log.info('Deleted {} outdated rating checkpoints'.format(num_deleted))
@@ -0,0 +1,363 @@
+"""
+Parameter sweep of team ratings.
+
+Replays all completed games once for hundreds of TeamRatings configurations at the same time:
+the games are encoded into arrays once, and ratings are held in a NumPy array with one row
+per franchise and one column per configuration, so every game updates all configurations
+with a handful of array operations.
+
+A configuration is the K-factor of each season stage, the initial rating and the bonus added
+to K when one of the franchises has played fewer than a number of games. Configurations are
+scored by how well their ratings before each game predict its outcome, as computed by elo.expected:
+
+    * log_loss -- mean of -(s * log(p) + (1 - s) * log(1 - p))
+    * brier -- mean of (p - s) ** 2
+
+where p is the expected score of the first side of a game and s its actual score: 1 for a win,
+0.5 for a draw and 0 for a loss. Lower is better.
+
+Usage:
+
+    python -m unicorn.v2.rating_sweep --output rating_sweep.json --k-scale 0.5 1 1.5 --joiner-bonus 0 8 16
+
+Configurations are the product of all values of all options plus the current configuration
+of TeamRatings, whose final ratings must match those of TeamRatings up to the rounding of NumPy's
+vectorized power, which can differ from Python's in the last bit. The ranked report is written to --output.
+"""
+
+import argparse
+import collections
+import datetime as dt
+import itertools
+import json
+import sys
+
+import numpy as np
+
+from unicorn.app import app
+from unicorn.configuration import logging
+from unicorn.snapshot import take_snapshot
+from unicorn.v2 import elo
+from unicorn.v2.team_ratings import TeamRatings
+from unicorn.values import SeasonStages
+
+log = logging.getLogger(__name__)
+
+
+# Season stages with their own K-factor in TeamRatings.game_k_values, 'other' covering all the rest.
+stage_keys = tuple(TeamRatings.game_k_values)
+
+# Expected scores are clipped to avoid infinite log loss of configurations which are certain and wrong.
+_epsilon = 1e-15
+
+
+class SweepParameters:
+    """
+    Parameters of one team ratings configuration.
+    """
+    __slots__ = ('initial_rating', 'k_values', 'joiner_bonus', 'joiner_games')
+
+    def __init__(self, initial_rating, k_values, joiner_bonus, joiner_games):
+        self.initial_rating = initial_rating
+        self.k_values = k_values
+        self.joiner_bonus = joiner_bonus
+        self.joiner_games = joiner_games
+
+    @classmethod
+    def from_team_ratings(cls, team_ratings_cls=TeamRatings):
+        """
+        Parameters of the current rules of team_ratings_cls.
+        """
+        return cls(
+            initial_rating=team_ratings_cls.initial_rating,
+            k_values=dict(team_ratings_cls.game_k_values),
+            joiner_bonus=8,
+            joiner_games=10,
+        )
+
+    @property
+    def key(self):
+        # Without a bonus or without recent joiners, neither of the other matters.
+        if not self.joiner_bonus or not self.joiner_games:
+            joiner_key = (0, 0)
+        else:
+            joiner_key = (self.joiner_bonus, self.joiner_games)
+        return (self.initial_rating, tuple(self.k_values[key] for key in stage_keys)) + joiner_key
+
+    def as_dict(self):
+        return collections.OrderedDict((
+            ('initial_rating', self.initial_rating),
+            ('k_values', collections.OrderedDict((key, self.k_values[key]) for key in stage_keys)),
+            ('joiner_bonus', self.joiner_bonus),
+            ('joiner_games', self.joiner_games),
+        ))
+
+
+def get_grid(base, k_scales=(1.0,), finals_k_scales=(1.0,), joiner_bonuses=(8,), joiner_games=(10,), initial_ratings=None):
+    """
+    Returns a list of the base parameters followed by all distinct combinations of
+    K-factors of base multiplied by k_scale, K-factors of playoff stages further multiplied
+    by finals_k_scale, joiner bonuses, joiner game counts and initial ratings.
+    """
+    initial_ratings = initial_ratings or (base.initial_rating,)
+    grid = [base]
+    keys = {base.key}
+    for k_scale, finals_k_scale, joiner_bonus, num_joiner_games, initial_rating in itertools.product(
+        k_scales, finals_k_scales, joiner_bonuses, joiner_games, initial_ratings,
+    ):
+        k_values = {
+            key: k * k_scale * (1.0 if key == SeasonStages.regular else finals_k_scale)
+            for key, k in base.k_values.items()
+        }
+        parameters = SweepParameters(
+            initial_rating=initial_rating,
+            k_values=k_values,
+            joiner_bonus=joiner_bonus,
+            joiner_games=num_joiner_games,
+        )
+        if parameters.key not in keys:
+            keys.add(parameters.key)
+            grid.append(parameters)
+    return grid
+
+
+class GameStream:
+    """
+    Completed games of a TeamRatings, in the order it rates them, encoded as arrays:
+    positions of the franchises of both sides in team_ratings.franchises, the position
+    of the season stage in stage_keys, the score of the first side and the number of the season.
+
+    season_changes maps positions of games before which TeamRatings.on_season_change runs
+    to arrays of positions of the franchises joining, leaving and remaining.
+    """
+
+    def __init__(self, team_ratings):
+        self.num_franchises = len(team_ratings.franchises)
+        franchise_positions = {f.id: i for i, f in enumerate(team_ratings.franchises)}
+        stage_positions = {key: i for i, key in enumerate(stage_keys)}
+
+        first = []
+        second = []
+        stages = []
+        first_scores = []
+        season_numbers = []
+        self.season_changes = {}
+
+        games = team_ratings.games
+        season_number = -1
+        last_season = None
+        for i, g in enumerate(games):
+            if not g.completed:
+                continue
+
+            if i > 0 and games[i - 1].season != g.season:
+                transition = team_ratings.activity.get_transition(
+                    games[i - 1].season.first_week_date, g.season.first_week_date,
+                )
+                self.season_changes[len(first)] = tuple(
+                    np.array([franchise_positions[f.id] for f in franchises], dtype=np.int64)
+                    for franchises in (transition.joining, transition.leaving, transition.remaining)
+                )
+
+            if g.season is not last_season:
+                last_season = g.season
+                season_number += 1
+
+            first_side, second_side = g.sides
+            winner_side = g.winner_side
+            if winner_side is first_side and first_side.is_won:
+                first_score = 1.0
+            elif winner_side is second_side and second_side.is_won:
+                first_score = 0.0
+            else:
+                assert winner_side.is_drawn
+                first_score = 0.5
+
+            first.append(franchise_positions[first_side.team.franchise_id])
+            second.append(franchise_positions[second_side.team.franchise_id])
+            stages.append(stage_positions.get(g.season_stage, stage_positions['other']))
+            first_scores.append(first_score)
+            season_numbers.append(season_number)
+
+        self.first = np.array(first, dtype=np.int64)
+        self.second = np.array(second, dtype=np.int64)
+        self.stage = np.array(stages, dtype=np.int64)
+        self.first_score = np.array(first_scores, dtype=np.float64)
+        self.season_number = np.array(season_numbers, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.first)
+
+
+class SweepResult:
+    __slots__ = ('ratings', 'log_loss', 'brier', 'num_scored')
+
+    def __init__(self, ratings, log_loss, brier, num_scored):
+        self.ratings = ratings
+        self.log_loss = log_loss
+        self.brier = brier
+        self.num_scored = num_scored
+
+
+def sweep(stream, parameters, skip_seasons=0):
+    """
+    Rate all games of stream with every configuration of parameters at once, following the rules
+    of TeamRatings.advance and TeamRatings.on_season_change, and score the expected outcomes of all games
+    except those of the first skip_seasons seasons.
+
+    Returns a SweepResult whose ratings are the final ratings of each franchise (row) and configuration (column).
+    """
+    initial_rating = np.array([p.initial_rating for p in parameters], dtype=np.float64)
+    k_table = np.array([[p.k_values[key] for p in parameters] for key in stage_keys], dtype=np.float64)
+    joiner_bonus = np.array([p.joiner_bonus for p in parameters], dtype=np.float64)
+    joiner_games = np.array([p.joiner_games for p in parameters], dtype=np.int64)
+
+    ratings = np.tile(initial_rating, (stream.num_franchises, 1))
+    num_games = np.zeros(stream.num_franchises, dtype=np.int64)
+
+    log_loss = np.zeros(len(parameters))
+    brier = np.zeros(len(parameters))
+    num_scored = 0
+
+    for i in range(len(stream)):
+        if i in stream.season_changes:
+            joining, leaving, remaining = stream.season_changes[i]
+            if len(leaving) or len(joining):
+                delta_leaving = np.zeros(len(parameters))
+                for f in leaving:
+                    delta_leaving += ratings[f] - initial_rating
+                delta = delta_leaving / (len(remaining) + len(joining))
+                ratings[joining] += delta
+                ratings[remaining] += delta
+            ratings[leaving] = 0.0
+
+        a = stream.first[i]
+        b = stream.second[i]
+        a_old = ratings[a].copy()
+        b_old = ratings[b].copy()
+        a_exp = elo.expected(a_old, b_old)
+        b_exp = elo.expected(b_old, a_old)
+        a_score = stream.first_score[i]
+
+        if stream.season_number[i] >= skip_seasons:
+            p = np.clip(a_exp, _epsilon, 1 - _epsilon)
+            log_loss -= a_score * np.log(p) + (1 - a_score) * np.log(1 - p)
+            brier += (a_exp - a_score) ** 2
+            num_scored += 1
+
+        is_recent_joiner = (num_games[a] < joiner_games) | (num_games[b] < joiner_games)
+        k = k_table[stream.stage[i]] + np.where(is_recent_joiner, joiner_bonus, 0.0)
+
+        # Like TeamRatings.update_current, apply the change rather than the new rating.
+        ratings[a] = a_old + (elo.elo(old=a_old, exp=a_exp, score=a_score, k=k) - a_old)
+        ratings[b] = b_old + (elo.elo(old=b_old, exp=b_exp, score=1.0 - a_score, k=k) - b_old)
+        num_games[a] += 1
+        num_games[b] += 1
+
+    if num_scored:
+        log_loss /= num_scored
+        brier /= num_scored
+
+    return SweepResult(ratings=ratings, log_loss=log_loss, brier=brier, num_scored=num_scored)
+
+
+def get_report(parameters, result):
+    """
+    Returns a list of configurations with their scores, best first.
+    """
+    order = np.lexsort((result.brier, result.log_loss))
+    report = []
+    for rank, i in enumerate(order.tolist()):
+        entry = collections.OrderedDict((
+            ('rank', rank + 1),
+            ('log_loss', float(result.log_loss[i])),
+            ('brier', float(result.brier[i])),
+            ('is_current', i == 0),
+        ))
+        entry.update(parameters[i].as_dict())
+        report.append(entry)
+    return report
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description='Score team ratings configurations on all completed games')
+    arg_parser.add_argument('--output', default='rating_sweep.json', help='file to write the ranked report to')
+    arg_parser.add_argument(
+        '--k-scale', type=float, nargs='+', default=[0.5, 0.75, 1.0, 1.25, 1.5, 2.0],
+        help='multipliers of all K-factors of TeamRatings.game_k_values',
+    )
+    arg_parser.add_argument(
+        '--finals-k-scale', type=float, nargs='+', default=[0.75, 1.0, 1.25, 1.5],
+        help='further multipliers of K-factors of all stages other than the regular season',
+    )
+    arg_parser.add_argument(
+        '--joiner-bonus', type=int, nargs='+', default=[0, 4, 8, 12, 16],
+        help='bonuses added to K if a franchise is a recent joiner',
+    )
+    arg_parser.add_argument(
+        '--joiner-games', type=int, nargs='+', default=[5, 10, 20],
+        help='numbers of games before which a franchise is a recent joiner',
+    )
+    arg_parser.add_argument(
+        '--initial-rating', type=float, nargs='+', default=[TeamRatings.initial_rating],
+        help='initial ratings of franchises',
+    )
+    arg_parser.add_argument(
+        '--skip-seasons', type=int, default=0, help='number of first seasons whose games are rated but not scored',
+    )
+    arg_parser.add_argument('--top', type=int, default=10, help='number of best configurations to log')
+    args = arg_parser.parse_args(argv)
+
+    take_snapshot()
+    team_ratings = TeamRatings()
+
+    parameters = get_grid(
+        SweepParameters.from_team_ratings(),
+        k_scales=args.k_scale,
+        finals_k_scales=args.finals_k_scale,
+        joiner_bonuses=args.joiner_bonus,
+        joiner_games=args.joiner_games,
+        initial_ratings=args.initial_rating,
+    )
+    stream = GameStream(team_ratings)
+    log.info('Sweeping {} configurations over {} games'.format(len(parameters), len(stream)))
+    result = sweep(stream, parameters, skip_seasons=args.skip_seasons)
+
+    # The first configuration is the current one and must reproduce TeamRatings.
+    team_ratings.calculate()
+    expected_ratings = np.array([team_ratings.current[f.id].value for f in team_ratings.franchises])
+    if not np.allclose(result.ratings[:, 0], expected_ratings, rtol=1e-9, atol=1e-9):
+        log.error('Ratings of the current configuration differ from TeamRatings')
+        sys.exit(1)
+
+    report = get_report(parameters, result)
+    for entry in report[:args.top]:
+        log.info('{:>4} log_loss={:.5f} brier={:.5f} k={} joiner_bonus={} joiner_games={} initial_rating={}{}'.format(
+            entry['rank'],
+            entry['log_loss'],
+            entry['brier'],
+            '/'.join('{:g}'.format(k) for k in entry['k_values'].values()),
+            entry['joiner_bonus'],
+            entry['joiner_games'],
+            entry['initial_rating'],
+            ' (current)' if entry['is_current'] else '',
+        ))
+    current_entry = next(entry for entry in report if entry['is_current'])
+    log.info('Current configuration is ranked {} of {}'.format(current_entry['rank'], len(report)))
+
+    output = collections.OrderedDict((
+        ('created_at', dt.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')),
+        ('num_games', len(stream)),
+        ('num_scored_games', result.num_scored),
+        ('skip_seasons', args.skip_seasons),
+        ('stages', list(stage_keys)),
+        ('configurations', report),
+    ))
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=4)
+    log.info('Report written to {}'.format(args.output))
+
+
+if __name__ == '__main__':
+    with app():
+        main()
@@ -0,0 +1,133 @@
+"""
+Check that an incremental build produces the same data as a full rebuild.
+
+go.main only re-stores seasons whose input pages changed, so re-ingested seasons get new row ids
+and are stored after the seasons which were not touched. Nothing that is rendered may depend on that:
+
+    python -m unicorn.v2.rebuild_check
+
+Runs the incremental ingestion on one copy of the database and re-ingests all seasons into an emptied
+second copy, then compares all rows, except the generated ids of game sides, and the order in which
+a snapshot lists all objects and their related objects. Exits with status 1 if they differ.
+"""
+
+import os.path
+import sys
+import tempfile
+
+from unicorn.app import app, clear_app_data
+from unicorn.configuration import logging
+from unicorn.models import (
+    Franchise, FranchiseSeasonAggregate, FranchiseStageAggregate, Game, GameSide, IngestionManifestEntry, Season, Team,
+    TeamStageAggregate
+)
+from unicorn.snapshot import take_snapshot
+from unicorn.v2 import go
+from unicorn.v2.query_audit import copy_database
+from unicorn.v2.storage import delete_season_rows
+
+log = logging.getLogger(__name__)
+
+
+compared_models = (
+    Franchise, Season, Team, Game, GameSide, TeamStageAggregate, FranchiseStageAggregate, FranchiseSeasonAggregate,
+)
+
+# Columns whose values are generated by the database and differ between builds.
+generated_columns = {
+    GameSide.__tablename__: ('id', ),
+}
+
+
+def get_rows():
+    """
+    Returns a dictionary of sorted lists of rows of all tables written by a build by table name.
+    """
+    rows = {}
+    for model in compared_models:
+        table = model.__table__
+        columns = [c for c in table.columns if c.name not in generated_columns.get(table.name, ())]
+        rows[table.name] = sorted(
+            (tuple(row) for row in app.db_session.execute(table.select().with_only_columns(*columns))),
+            key=repr,
+        )
+    return rows
+
+
+def get_snapshot_order():
+    """
+    Returns a dictionary describing the order in which a snapshot lists objects
+    and their related objects by name.
+    """
+    snapshot = take_snapshot()
+    return {
+        'franchises': [f.id for f in snapshot.franchises],
+        'seasons': [s.id for s in snapshot.seasons],
+        'teams': [t.id for t in snapshot.teams],
+        'games': [g.id for g in snapshot.games],
+        'franchise teams': {f.id: [t.id for t in f.teams_sorted] for f in snapshot.franchises},
+        'franchise games': {f.id: [gs.game_id for gs in f.games] for f in snapshot.franchises},
+        'season teams': {s.id: [t.id for t in s.teams] for s in snapshot.seasons},
+        'season games': {s.id: [g.id for g in s.games] for s in snapshot.seasons},
+        'team games': {t.id: [gs.game_id for gs in t.games] for t in snapshot.teams},
+        'game sides': {g.id: [gs.team_id for gs in g.sides] for g in snapshot.games},
+        'game side columns': [(gs.game_id, gs.team_id) for gs in app.game_side_columns.game_sides],
+    }
+
+
+def get_build(db_name, full_rebuild=False):
+    """
+    Ingest the input into the database, every season if full_rebuild is True,
+    and return what get_rows() and get_snapshot_order() describe.
+    """
+    with app(db_name=db_name):
+        clear_app_data()
+        if full_rebuild:
+            for season_id, in app.db_session.query(Season.id).all():
+                delete_season_rows(season_id)
+            app.db_session.query(IngestionManifestEntry).delete()
+            app.db_session.commit()
+        go.main()
+
+        app.db_session.remove()
+        clear_app_data()
+        build = get_rows(), get_snapshot_order()
+
+        app.db_session.remove()
+        clear_app_data()
+    return build
+
+
+def compare_builds(incremental, full):
+    """
+    Returns a list of names of tables and orders which differ between the two builds.
+    """
+    differences = []
+    for incremental_values, full_values in zip(incremental, full):
+        for name, values in full_values.items():
+            if incremental_values[name] != values:
+                differences.append(name)
+    return differences
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        incremental_db_name = os.path.join(tmp_dir, 'incremental.db')
+        full_db_name = os.path.join(tmp_dir, 'full.db')
+        copy_database(app.db_name, incremental_db_name)
+        copy_database(app.db_name, full_db_name)
+
+        differences = compare_builds(get_build(incremental_db_name), get_build(full_db_name, full_rebuild=True))
+
+    for name in differences:
+        log.error('Incremental build differs from a full rebuild in {}'.format(name))
+
+    if differences:
+        sys.exit(1)
+    else:
+        log.info('Incremental build is identical to a full rebuild')
+
+
+if __name__ == '__main__':
+    with app():
+        main()
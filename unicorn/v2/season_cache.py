@@ -0,0 +1,129 @@
+"""
+On-disk cache of parsed season pages.
+
+Each SeasonParse is saved as a normalized JSON document named after a key which is a hash
+of the standings and fixtures pages it was parsed from and of manual_scores.csv.
+The documents can be read by other tools without parsing any HTML:
+
+    {
+        "format_version": 1,
+        "season_id": 100,
+        "season_name": "Winter 2017",
+        "division_id": 0,
+        "league_id": 505,
+        "teams": [{"id": "0100.4949", "name": ..., "gm_id": 4949, "position": 1, ...}, ...],
+        "game_days": [
+            {"date": "2017-01-12T00:00:00", "week_number": 0, "games": [
+                {"id": 120601, "starts_at": "2017-01-12T18:45:00", "home_team_id": "0100.4949", ...},
+            ]},
+        ]
+    }
+"""
+
+import datetime as dt
+import json
+import os
+import os.path
+import tempfile
+
+from unicorn.configuration import logging
+from unicorn.core.utils import get_file_hash
+from unicorn.v2.manifest import get_manual_scores_file
+from unicorn.v2.season_page import Game, GameDay, SeasonParse, Team
+
+log = logging.getLogger(__name__)
+
+
+# Increment whenever SeasonParse output changes so that stale cache entries are not used.
+format_version = 1
+
+
+def get_cache_key(standings_file, fixtures_file=None):
+    return '{}-{}'.format(format_version, get_file_hash(standings_file, fixtures_file, get_manual_scores_file()))
+
+
+def _datetime_to_str(value):
+    return value.isoformat() if value is not None else None
+
+
+def _datetime_from_str(value):
+    return dt.datetime.strptime(value, '%Y-%m-%dT%H:%M:%S') if value is not None else None
+
+
+def season_parse_to_dict(season_parse):
+    return {
+        'format_version': format_version,
+        'season_id': season_parse.season_id,
+        'season_name': season_parse.season_name,
+        'division_id': season_parse.division_id,
+        'league_id': season_parse.league_id,
+        'teams': [dict(team) for team in season_parse.teams.values()],
+        'game_days': [
+            dict(
+                game_day,
+                date=_datetime_to_str(game_day.date),
+                games=[dict(game, starts_at=_datetime_to_str(game.starts_at)) for game in game_day.games],
+            )
+            for game_day in season_parse.game_days
+        ],
+    }
+
+
+def season_parse_from_dict(data, season_parse_cls=SeasonParse):
+    season_parse = season_parse_cls()
+    season_parse.season_id = data['season_id']
+    season_parse.season_name = data['season_name']
+    season_parse.division_id = data['division_id']
+    season_parse.league_id = data['league_id']
+    season_parse.teams = {team['id']: Team(team) for team in data['teams']}
+    season_parse.game_days = [
+        GameDay(
+            game_day,
+            date=_datetime_from_str(game_day['date']),
+            games=[Game(game, starts_at=_datetime_from_str(game['starts_at'])) for game in game_day['games']],
+        )
+        for game_day in data['game_days']
+    ]
+    return season_parse
+
+
+def get_cache_filename(cache_dir, key):
+    return os.path.join(cache_dir, '{}.json'.format(key))
+
+
+def load_file(filename, season_parse_cls=SeasonParse):
+    with open(filename) as f:
+        data = json.load(f)
+    if data.get('format_version') != format_version:
+        return None
+    return season_parse_from_dict(data, season_parse_cls=season_parse_cls)
+
+
+def load(cache_dir, key, season_parse_cls=SeasonParse):
+    """
+    Returns the cached SeasonParse for key or None if it is not in the cache.
+    """
+    filename = get_cache_filename(cache_dir, key)
+    if not os.path.isfile(filename):
+        return None
+    try:
+        return load_file(filename, season_parse_cls=season_parse_cls)
+    except (ValueError, KeyError) as e:
+        log.warning('Ignoring invalid season cache file {}: {}'.format(filename, e))
+        return None
+
+
+def save(cache_dir, key, season_parse):
+    """
+    Write season_parse to the cache. The file is replaced atomically
+    so that concurrent writers and readers never see a partial file.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_filename = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(season_parse_to_dict(season_parse), f, indent=1)
+        os.replace(tmp_filename, get_cache_filename(cache_dir, key))
+    except Exception:
+        os.remove(tmp_filename)
+        raise
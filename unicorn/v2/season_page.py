@@ -149,115 +149,21 @@ class SeasonParse:
                     continue
                 game_id = int(ic.find('nobr')['data-fixture-id'])
 
-                game_score_status = ScoreStatuses.winner_and_score_ok
-                game_score_status_comments = None
-                game_home_team_id = None
-                game_away_team_id = None
-
-                if game_id in app.manual_scores:
-                    fs = app.manual_scores[game_id]
-                    game_home_team_id = fs['home_team_id']
-                    game_away_team_id = fs['away_team_id']
-                    game_score = (fs['home_team_score'], fs['away_team_score'])
-                    game_score_status = fs['score_status']
-                    game_score_status_comments = fs['score_status_comments']
-                    if fs['season_stage']:
-                        game_season_stage = fs['season_stage']
-                else:
-                    if ic.find('nobr').find('div'):
-                        game_score = (
-                            ic.find('nobr').find('div').find('nobr').text.strip().split(' - ')
-                        )
-                    else:
-                        log.warning((
-                            'Encountered a game with no score and no manual score provided: '
-                            'week_date={} game_time={} game_id={}'
-                        ).format(week_date, game_time, game_id))
-                        game_score = (None, None)
-                        game_score_status = ScoreStatuses.unknown
-                        game_score_status_comments = 'Unresolved'
-
                 game_venue = g.find('td', class_='FPlayingArea').text.strip()
 
                 htc = g.find('td', class_='FHomeTeam')
                 atc = g.find('td', class_='FAwayTeam')
 
-                game = Game(
-                    id=game_id,
-                    starts_at=game_time.replace(
-                        year=week_date.year, month=week_date.month, day=week_date.day
-                    ),
+                week_games.append(self.create_standings_game(
+                    game_id=game_id,
+                    week_date=week_date,
+                    game_time=game_time,
                     season_stage=game_season_stage,
+                    score_cell=ic,
                     venue=game_venue,
-                    home_team_id=self.unicorn_team_id(game_home_team_id or extract_from_link(htc.find('a'), 'TeamId')),
-                    home_team_score=int(game_score[0]) if game_score[0] is not None else None,
-                    away_team_id=self.unicorn_team_id(game_away_team_id or extract_from_link(atc.find('a'), 'TeamId')),
-                    away_team_score=int(game_score[1]) if game_score[1] is not None else None,
-                    score_status=game_score_status,
-                    score_status_comments=game_score_status_comments,
-                )
-
-                game.home_team_outcome, game.away_team_outcome = GameOutcomes.from_scores(
-                    game.home_team_score,
-                    game.away_team_score,
-                )
-                game.home_team_points = GameOutcomes.get_points_for(game.home_team_outcome, game.season_stage)
-                game.away_team_points = GameOutcomes.get_points_for(game.away_team_outcome, game.season_stage)
-
-                week_games.append(game)
-
-                custom_season_stages = {
-                    105: {
-                        SeasonStages.semifinal1: SeasonStages.final7th,
-                        SeasonStages.semifinal2: SeasonStages.final5th,
-                        SeasonStages.semifinal5th1: SeasonStages.final3rd,
-                    },
-                    108: {
-                        SeasonStages.semifinal2: SeasonStages.final5th,
-                        SeasonStages.semifinal5th1: SeasonStages.final3rd,
-                    },
-                }
-
-                if self.season_id in custom_season_stages:
-                    game.season_stage = custom_season_stages[self.season_id].get(
-                        game_season_stage,
-                        game_season_stage,
-                    )
-
-                if game.season_stage == SeasonStages.final1st:
-                    if game.home_team_outcome in (GameOutcomes.won, GameOutcomes.forfeit_for):
-                        self.teams[game.home_team_id].finals_rank = 1
-                        self.teams[game.away_team_id].finals_rank = 2
-                    elif game.home_team_outcome in (GameOutcomes.lost, GameOutcomes.forfeit_against):
-                        self.teams[game.home_team_id].finals_rank = 2
-                        self.teams[game.away_team_id].finals_rank = 1
-                elif game.season_stage == SeasonStages.final3rd:
-                    if game.home_team_outcome in (GameOutcomes.won, GameOutcomes.forfeit_for):
-                        self.teams[game.home_team_id].finals_rank = 3
-                        self.teams[game.away_team_id].finals_rank = 4
-                    elif game.home_team_outcome in (GameOutcomes.lost, GameOutcomes.forfeit_against):
-                        self.teams[game.home_team_id].finals_rank = 4
-                        self.teams[game.away_team_id].finals_rank = 3
-                elif game.season_stage == SeasonStages.final5th:
-                    if game.home_team_outcome in (GameOutcomes.won, GameOutcomes.forfeit_for):
-                        self.teams[game.home_team_id].finals_rank = 5
-                        self.teams[game.away_team_id].finals_rank = 6
-                    elif game.home_team_outcome in (GameOutcomes.lost, GameOutcomes.forfeit_against):
-                        self.teams[game.home_team_id].finals_rank = 6
-                        self.teams[game.away_team_id].finals_rank = 5
-                elif game.season_stage == SeasonStages.final7th:
-                    if game.home_team_outcome in (GameOutcomes.won, GameOutcomes.forfeit_for):
-                        self.teams[game.home_team_id].finals_rank = 7
-                        self.teams[game.away_team_id].finals_rank = 8
-                    elif game.home_team_outcome in (GameOutcomes.lost, GameOutcomes.forfeit_against):
-                        self.teams[game.home_team_id].finals_rank = 8
-                        self.teams[game.away_team_id].finals_rank = 7
-                elif game.season_stage == SeasonStages.semifinal5th1:
-                    # In a 7 team league losing 5th place semifinal means you finish last (7th)
-                    if game.home_team_outcome in (GameOutcomes.won, GameOutcomes.forfeit_for):
-                        self.teams[game.away_team_id].finals_rank = 7
-                    elif game.home_team_outcome in (GameOutcomes.lost, GameOutcomes.forfeit_against):
-                        self.teams[game.home_team_id].finals_rank = 7
+                    home_team_cell=htc,
+                    away_team_cell=atc,
+                ))
 
             self.game_days.append(GameDay(
                 date=week_date,
@@ -265,6 +171,118 @@ class SeasonParse:
                 games=week_games,
             ))
 
+    def create_standings_game(
+        self, *, game_id, week_date, game_time, season_stage, score_cell, venue, home_team_cell, away_team_cell
+    ):
+        """
+        Create a Game from the cells of a standings page fixture row, applying manual scores,
+        custom season stages and registering finals ranks of the teams involved.
+        """
+        game_score_status = ScoreStatuses.winner_and_score_ok
+        game_score_status_comments = None
+        game_home_team_id = None
+        game_away_team_id = None
+
+        if game_id in app.manual_scores:
+            fs = app.manual_scores[game_id]
+            game_home_team_id = fs['home_team_id']
+            game_away_team_id = fs['away_team_id']
+            game_score = (fs['home_team_score'], fs['away_team_score'])
+            game_score_status = fs['score_status']
+            game_score_status_comments = fs['score_status_comments']
+            if fs['season_stage']:
+                season_stage = fs['season_stage']
+        else:
+            if score_cell.find('nobr').find('div'):
+                game_score = (
+                    score_cell.find('nobr').find('div').find('nobr').text.strip().split(' - ')
+                )
+            else:
+                log.warning((
+                    'Encountered a game with no score and no manual score provided: '
+                    'week_date={} game_time={} game_id={}'
+                ).format(week_date, game_time, game_id))
+                game_score = (None, None)
+                game_score_status = ScoreStatuses.unknown
+                game_score_status_comments = 'Unresolved'
+
+        game = Game(
+            id=game_id,
+            starts_at=game_time.replace(
+                year=week_date.year, month=week_date.month, day=week_date.day
+            ),
+            season_stage=season_stage,
+            venue=venue,
+            home_team_id=self.unicorn_team_id(game_home_team_id or extract_from_link(home_team_cell.find('a'), 'TeamId')),
+            home_team_score=int(game_score[0]) if game_score[0] is not None else None,
+            away_team_id=self.unicorn_team_id(game_away_team_id or extract_from_link(away_team_cell.find('a'), 'TeamId')),
+            away_team_score=int(game_score[1]) if game_score[1] is not None else None,
+            score_status=game_score_status,
+            score_status_comments=game_score_status_comments,
+        )
+
+        game.home_team_outcome, game.away_team_outcome = GameOutcomes.from_scores(
+            game.home_team_score,
+            game.away_team_score,
+        )
+        game.home_team_points = GameOutcomes.get_points_for(game.home_team_outcome, game.season_stage)
+        game.away_team_points = GameOutcomes.get_points_for(game.away_team_outcome, game.season_stage)
+
+        custom_season_stages = {
+            105: {
+                SeasonStages.semifinal1: SeasonStages.final7th,
+                SeasonStages.semifinal2: SeasonStages.final5th,
+                SeasonStages.semifinal5th1: SeasonStages.final3rd,
+            },
+            108: {
+                SeasonStages.semifinal2: SeasonStages.final5th,
+                SeasonStages.semifinal5th1: SeasonStages.final3rd,
+            },
+        }
+
+        if self.season_id in custom_season_stages:
+            game.season_stage = custom_season_stages[self.season_id].get(
+                season_stage,
+                season_stage,
+            )
+
+        if game.season_stage == SeasonStages.final1st:
+            if game.home_team_outcome in (GameOutcomes.won, GameOutcomes.forfeit_for):
+                self.teams[game.home_team_id].finals_rank = 1
+                self.teams[game.away_team_id].finals_rank = 2
+            elif game.home_team_outcome in (GameOutcomes.lost, GameOutcomes.forfeit_against):
+                self.teams[game.home_team_id].finals_rank = 2
+                self.teams[game.away_team_id].finals_rank = 1
+        elif game.season_stage == SeasonStages.final3rd:
+            if game.home_team_outcome in (GameOutcomes.won, GameOutcomes.forfeit_for):
+                self.teams[game.home_team_id].finals_rank = 3
+                self.teams[game.away_team_id].finals_rank = 4
+            elif game.home_team_outcome in (GameOutcomes.lost, GameOutcomes.forfeit_against):
+                self.teams[game.home_team_id].finals_rank = 4
+                self.teams[game.away_team_id].finals_rank = 3
+        elif game.season_stage == SeasonStages.final5th:
+            if game.home_team_outcome in (GameOutcomes.won, GameOutcomes.forfeit_for):
+                self.teams[game.home_team_id].finals_rank = 5
+                self.teams[game.away_team_id].finals_rank = 6
+            elif game.home_team_outcome in (GameOutcomes.lost, GameOutcomes.forfeit_against):
+                self.teams[game.home_team_id].finals_rank = 6
+                self.teams[game.away_team_id].finals_rank = 5
+        elif game.season_stage == SeasonStages.final7th:
+            if game.home_team_outcome in (GameOutcomes.won, GameOutcomes.forfeit_for):
+                self.teams[game.home_team_id].finals_rank = 7
+                self.teams[game.away_team_id].finals_rank = 8
+            elif game.home_team_outcome in (GameOutcomes.lost, GameOutcomes.forfeit_against):
+                self.teams[game.home_team_id].finals_rank = 8
+                self.teams[game.away_team_id].finals_rank = 7
+        elif game.season_stage == SeasonStages.semifinal5th1:
+            # In a 7 team league losing 5th place semifinal means you finish last (7th)
+            if game.home_team_outcome in (GameOutcomes.won, GameOutcomes.forfeit_for):
+                self.teams[game.away_team_id].finals_rank = 7
+            elif game.home_team_outcome in (GameOutcomes.lost, GameOutcomes.forfeit_against):
+                self.teams[game.home_team_id].finals_rank = 7
+
+        return game
+
     def parse_fixtures_page(self, input_str):
         assert self.teams, 'Teams should be already loaded before parsing fixtures page'
 
@@ -299,29 +317,36 @@ class SeasonParse:
                 if not htc.find('a') or not atc.find('a'):
                     continue
 
-                game_home_team_id = None
-                game_away_team_id = None
-
-                game = Game(
-                    id=game_id,
+                week_games.append(self.create_fixtures_game(
+                    game_id=game_id,
                     starts_at=game_time,
-                    season_stage=SeasonStages.regular,
                     venue=game_venue,
-                    home_team_id=self.unicorn_team_id(game_home_team_id or extract_from_link(htc.find('a'), 'TeamId')),
-                    home_team_score=None,
-                    home_team_outcome=None,
-                    home_team_points=None,
-                    away_team_id=self.unicorn_team_id(game_away_team_id or extract_from_link(atc.find('a'), 'TeamId')),
-                    away_team_score=None,
-                    away_team_outcome=None,
-                    away_team_points=None,
-                    score_status=None,
-                    score_status_comments=None,
-                )
-
-                week_games.append(game)
+                    home_team_cell=htc,
+                    away_team_cell=atc,
+                ))
 
             self.game_days.append(GameDay(
                 date=week_date,
                 games=week_games,
             ))
+
+    def create_fixtures_game(self, *, game_id, starts_at, venue, home_team_cell, away_team_cell):
+        """
+        Create a Game for a fixture which has not been played yet.
+        """
+        return Game(
+            id=game_id,
+            starts_at=starts_at,
+            season_stage=SeasonStages.regular,
+            venue=venue,
+            home_team_id=self.unicorn_team_id(extract_from_link(home_team_cell.find('a'), 'TeamId')),
+            home_team_score=None,
+            home_team_outcome=None,
+            home_team_points=None,
+            away_team_id=self.unicorn_team_id(extract_from_link(away_team_cell.find('a'), 'TeamId')),
+            away_team_score=None,
+            away_team_outcome=None,
+            away_team_points=None,
+            score_status=None,
+            score_status_comments=None,
+        )
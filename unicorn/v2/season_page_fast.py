@@ -0,0 +1,308 @@
+"""
+Faster SeasonParse backend.
+
+Instead of building a BeautifulSoup tree of the whole ~80KB GoMammoth page, only the page title,
+the first <h3> (which holds the fixtures link) and the STTable and FTable tables are sliced out
+of the raw HTML and parsed. Cells of each row are looked up once and dates and times are parsed
+through a cache because a page only has a handful of distinct values.
+
+Run this module to check that it produces exactly the same output as SeasonParse
+on all pages in input/season-pages.
+"""
+
+import functools
+import glob
+import os.path
+import re
+import sys
+
+from bs4 import BeautifulSoup
+
+from unicorn.app import app
+from unicorn.configuration import logging
+from unicorn.v2.season_page import GameDay, SeasonParse, Team, extract_from_link, parse_gm_date, parse_gm_time
+from unicorn.values import SeasonStages
+
+log = logging.getLogger(__name__)
+
+
+_title_re = re.compile(r'<title\b.*?</title>', re.S | re.I)
+_h3_re = re.compile(r'<h3\b.*?</h3>', re.S | re.I)
+_table_re = re.compile(
+    r'<table\b[^>]*\bclass="(?:[^"]*\s)?(?P<class>STTable|FTable)(?:\s[^"]*)?"[^>]*>(?P<content>.*?)</table>',
+    re.S | re.I,
+)
+_nested_table_re = re.compile(r'<table\b', re.I)
+_tooltip_re = re.compile(r'<div\b[^>]*\bclass="StandingsToolTip"', re.I)
+_div_tag_re = re.compile(r'<(/?)div\b', re.I)
+
+
+@functools.lru_cache(maxsize=None)
+def parse_gm_date_cached(date_str):
+    return parse_gm_date(date_str)
+
+
+@functools.lru_cache(maxsize=None)
+def parse_gm_time_cached(time_str):
+    return parse_gm_time(time_str)
+
+
+def strip_tooltips(table_str):
+    """
+    Remove the StandingsToolTip <div>s (which make up most of a standings table)
+    together with all their nested <div>s.
+    """
+    parts = []
+    pos = 0
+    for match in _tooltip_re.finditer(table_str):
+        if match.start() < pos:
+            # Nested inside a tooltip that has already been removed
+            continue
+        parts.append(table_str[pos:match.start()])
+        depth = 0
+        for tag in _div_tag_re.finditer(table_str, match.start()):
+            depth += -1 if tag.group(1) else 1
+            if depth == 0:
+                pos = table_str.index('>', tag.end()) + 1
+                break
+        else:
+            # Unbalanced, keep the rest of the table untouched
+            pos = match.start()
+            break
+    parts.append(table_str[pos:])
+    return ''.join(parts)
+
+
+def extract_regions(input_str):
+    """
+    Returns a reduced HTML document with just the title, the first h3 and all STTable and FTable
+    tables of a GoMammoth page, in their original order, without the standings tooltips.
+
+    Falls back to the full document if any of the tables contains a nested table
+    or if no standings table is found, because then the tables cannot be sliced reliably.
+    """
+    tables = []
+    has_standings_table = False
+    for match in _table_re.finditer(input_str):
+        if _nested_table_re.search(match.group('content')):
+            return input_str
+        if match.group('class') == 'STTable':
+            has_standings_table = True
+            tables.append(strip_tooltips(match.group(0)))
+        else:
+            tables.append(match.group(0))
+
+    if not has_standings_table:
+        return input_str
+
+    title = _title_re.search(input_str)
+    h3 = _h3_re.search(input_str)
+
+    return '<head>{}</head>{}{}'.format(
+        title.group(0) if title else '',
+        h3.group(0) if h3 else '',
+        ''.join(tables),
+    )
+
+
+def get_cells_by_class(tr):
+    """
+    Returns a dictionary of the first <td> of the row for each CSS class,
+    equivalent to calling tr.find('td', class_=...) for every class.
+    """
+    cells = {}
+    for td in tr.find_all('td'):
+        for css_class in td.get('class', ()):
+            cells.setdefault(css_class, td)
+    return cells
+
+
+class FastSeasonParse(SeasonParse):
+    def parse_standings_page(self, input_str):
+        soup = BeautifulSoup(extract_regions(input_str), 'html.parser')
+
+        self.season_name = soup.find('head').find('title').text.strip().split(' - ')[4]
+
+        if self.season_id is None:
+            fixtures_link = soup.find('h3').find('a')
+            self.season_id = int(extract_from_link(fixtures_link, 'SeasonId'))
+            self.division_id = int(extract_from_link(fixtures_link, 'DivisionId'))
+            self.league_id = int(extract_from_link(fixtures_link, 'LeagueId'))
+
+        self.teams = {}
+        for i, st_tr in enumerate(soup.find('table', class_='STTable').find_all('tr', class_='STRow')):
+            tds = st_tr.find_all('td')
+            team_cell = next(td for td in tds if 'STTeamCell' in td.get('class', ()))
+            gm_team_id = int(extract_from_link(team_cell.find('a'), 'TeamId'))
+            team_id = self.unicorn_team_id(gm_team_id)
+            values = [td.text.strip() for td in tds[1:12]]
+            points_link = tds[12].find('a')
+            self.teams[team_id] = Team(
+                id=team_id,
+                name=values[0],
+                gm_id=gm_team_id,
+                position=i + 1,
+                played=int(values[1]),
+                won=int(values[2]),
+                lost=int(values[3]),
+                drawn=int(values[4]),
+                forfeit_for=int(values[5]),
+                forfeit_against=int(values[6]),
+                score_for=int(values[7]),
+                score_against=int(values[8]),
+                score_difference=int(values[9]),
+                bonus_points=int(values[10]),
+                points=int(points_link.text.strip() if points_link else 0),
+                finals_rank=None,
+            )
+
+        self.game_days = []
+        season_stage = SeasonStages.regular
+
+        for week_number, t in enumerate(soup.find_all('table', class_='FTable')):
+            week_date = parse_gm_date_cached(t.find('tr', class_='FHeader').find('td').text.strip())
+            week_games = []
+            for g in t.find_all('tr', class_='FRow'):
+                cells = get_cells_by_class(g)
+
+                sc = cells.get('FTitle')
+                if sc:
+                    decoded_ss = SeasonStages.decode_gm_season_stage(sc.text.strip())
+                    if decoded_ss is not None:
+                        season_stage = decoded_ss
+
+                tc = cells.get('FDate')
+                if not tc:
+                    continue
+                game_time_str = tc.text.strip()
+                if game_time_str == 'Bye':
+                    continue
+                game_time = parse_gm_time_cached(game_time_str)
+
+                ic = cells.get('FScore')
+                if not ic:
+                    continue
+                game_id = int(ic.find('nobr')['data-fixture-id'])
+
+                week_games.append(self.create_standings_game(
+                    game_id=game_id,
+                    week_date=week_date,
+                    game_time=game_time,
+                    season_stage=season_stage,
+                    score_cell=ic,
+                    venue=cells['FPlayingArea'].text.strip(),
+                    home_team_cell=cells.get('FHomeTeam'),
+                    away_team_cell=cells.get('FAwayTeam'),
+                ))
+
+            self.game_days.append(GameDay(
+                date=week_date,
+                week_number=week_number,
+                games=week_games,
+            ))
+
+    def parse_fixtures_page(self, input_str):
+        assert self.teams, 'Teams should be already loaded before parsing fixtures page'
+
+        soup = BeautifulSoup(extract_regions(input_str), 'html.parser')
+
+        for ft in soup.find_all('table', class_='FTable'):
+            week_date = parse_gm_date_cached(ft.find('tr', class_='FHeader').find('td').text.strip())
+            week_games = []
+
+            for fr in ft.find_all('tr', class_='FRow'):
+                cells = get_cells_by_class(fr)
+
+                game_time_cell = cells.get('FDate')
+                if not game_time_cell:
+                    continue
+                game_time = parse_gm_time_cached(game_time_cell.text.strip()).replace(
+                    year=week_date.year, month=week_date.month, day=week_date.day
+                )
+
+                game_id_cell = cells.get('FScore')
+                if not game_id_cell:
+                    continue
+                game_id = int(game_id_cell.find('nobr')['data-fixture-id'])
+
+                game_venue = cells['FPlayingArea'].text.strip()
+
+                htc = cells.get('FHomeTeam')
+                atc = cells.get('FAwayTeam')
+
+                if not htc or not atc:
+                    continue
+
+                if not htc.find('a') or not atc.find('a'):
+                    continue
+
+                week_games.append(self.create_fixtures_game(
+                    game_id=game_id,
+                    starts_at=game_time,
+                    venue=game_venue,
+                    home_team_cell=htc,
+                    away_team_cell=atc,
+                ))
+
+            self.game_days.append(GameDay(
+                date=week_date,
+                games=week_games,
+            ))
+
+
+def check_parity(standings_files, fixtures_files=()):
+    """
+    Parse all files with both SeasonParse and FastSeasonParse
+    and return a list of names of files for which the results differ.
+    """
+    mismatches = []
+
+    for standings_file in standings_files:
+        with open(standings_file) as f:
+            input_str = f.read()
+        standard = SeasonParse()
+        standard.parse_standings_page(input_str)
+        fast = FastSeasonParse()
+        fast.parse_standings_page(input_str)
+        if vars(standard) != vars(fast):
+            mismatches.append(standings_file)
+            continue
+
+        for fixtures_file in fixtures_files:
+            with open(fixtures_file) as f:
+                input_str = f.read()
+            standard.parse_fixtures_page(input_str)
+            fast.parse_fixtures_page(input_str)
+            if vars(standard) != vars(fast):
+                mismatches.append(fixtures_file)
+
+    return mismatches
+
+
+def main():
+    input_dir = app.input_dir
+    season_pages = sorted(glob.glob(os.path.join(input_dir, 'season-pages/*.htm')))
+    mismatches = check_parity(season_pages)
+    num_checked = len(season_pages)
+
+    current_standings = os.path.join(input_dir, 'current-season/standings.htm')
+    current_fixtures = os.path.join(input_dir, 'current-season/fixtures.htm')
+    if os.path.isfile(current_standings) and os.path.isfile(current_fixtures):
+        mismatches.extend(check_parity([current_standings], [current_fixtures]))
+        num_checked += 1
+
+    if not num_checked:
+        log.error('No season pages found in {}'.format(input_dir))
+        sys.exit(1)
+
+    for filename in mismatches:
+        log.error('FastSeasonParse output differs from SeasonParse for {}'.format(filename))
+
+    if mismatches:
+        sys.exit(1)
+    else:
+        log.info('FastSeasonParse output is identical to SeasonParse for {} seasons'.format(num_checked))
+
+
+if __name__ == '__main__':
+    main()
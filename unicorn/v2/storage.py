@@ -1,10 +1,41 @@
+import collections
+
 from unicorn.app import app
 from unicorn.configuration import logging
 from unicorn.models import Game, GameSide, Season, Team
+from unicorn.values import ScoreStatuses
 
 log = logging.getLogger(__name__)
 
 
+def build_game_side_rows(game, season_id, franchise_ids):
+    """
+    Returns row dictionaries of the home and the away side of a parsed game, in this order,
+    including the columns denormalized from the opponent side, the teams and the game.
+
+    franchise_ids maps team ids to franchise ids.
+    """
+    rows = []
+    for side, opponent in (('home', 'away'), ('away', 'home')):
+        team_id = game['{}_team_id'.format(side)]
+        opponent_team_id = game['{}_team_id'.format(opponent)]
+        rows.append(dict(
+            game_id=game.id,
+            team_id=team_id,
+            score=game['{}_team_score'.format(side)],
+            outcome=game['{}_team_outcome'.format(side)],
+            points=game['{}_team_points'.format(side)],
+            opponent_team_id=opponent_team_id,
+            opponent_score=game['{}_team_score'.format(opponent)],
+            franchise_id=franchise_ids.get(team_id),
+            opponent_franchise_id=franchise_ids.get(opponent_team_id),
+            season_id=season_id,
+            season_stage=game.season_stage,
+            starts_at=game.starts_at,
+        ))
+    return rows
+
+
 def store_season_page(page):
     season_obj = Season.create(
         id=page.season_id,
@@ -15,8 +46,10 @@ def store_season_page(page):
         gm_division_id=page.division_id,
     )
 
+    franchise_ids = {}
     for team in page.teams.values():
         franchise, team_name = app.get_franchise_and_team_name(season_obj.id, team.gm_id)
+        franchise_ids[team.id] = franchise.id if franchise else None
 
         Team.create(
             id=team.id,
@@ -47,18 +80,121 @@ def store_season_page(page):
                 starts_at=game.starts_at,
                 score_status=game.score_status,
                 score_status_comments=game.score_status_comments,
-                sides=[
-                    GameSide(
-                        team_id=game.home_team_id,
-                        score=game.home_team_score,
-                        outcome=game.home_team_outcome,
-                        points=game.home_team_points,
-                    ),
-                    GameSide(
-                        team_id=game.away_team_id,
-                        score=game.away_team_score,
-                        outcome=game.away_team_outcome,
-                        points=game.away_team_points,
-                    ),
-                ],
+                sides=[GameSide(**row) for row in build_game_side_rows(game, season_obj.id, franchise_ids)],
             )
+
+
+def build_season_page_rows(page):
+    """
+    Convert a parsed season page into lists of plain row dictionaries, one list per table,
+    in the order in which the tables must be written.
+    """
+    rows = collections.OrderedDict((
+        (Season.__table__, []),
+        (Team.__table__, []),
+        (Game.__table__, []),
+        (GameSide.__table__, []),
+    ))
+
+    rows[Season.__table__].append(dict(
+        id=page.season_id,
+        number=None,
+        name=page.season_name,
+        first_week_date=page.game_days[0].date,
+        last_week_date=page.game_days[-1].date,
+        gm_league_id=page.league_id,
+        gm_division_id=page.division_id,
+    ))
+
+    for team in page.teams.values():
+        franchise, team_name = app.get_franchise_and_team_name(page.season_id, team.gm_id)
+        rows[Team.__table__].append(dict(
+            id=team.id,
+            season_id=page.season_id,
+            franchise_id=franchise.id if franchise else None,
+            name=team_name,
+            regular_rank=team.position,
+            regular_played=team.played,
+            regular_won=team.won,
+            regular_lost=team.lost,
+            regular_drawn=team.drawn,
+            regular_forfeits_for=team.forfeit_for,
+            regular_forfeits_against=team.forfeit_against,
+            regular_score_for=team.score_for,
+            regular_score_against=team.score_against,
+            regular_score_difference=team.score_difference,
+            regular_bonus_points=team.bonus_points,
+            regular_points=team.points,
+            finals_rank=team.finals_rank,
+        ))
+
+    franchise_ids = {t['id']: t['franchise_id'] for t in rows[Team.__table__]}
+
+    for game_day in page.game_days:
+        for game in game_day.games:
+            rows[Game.__table__].append(dict(
+                id=game.id,
+                season_id=page.season_id,
+                season_stage=game.season_stage,
+                starts_at=game.starts_at,
+                # Same fallback as the column default which the ORM applies to None values
+                score_status=game.score_status if game.score_status is not None else ScoreStatuses.undecided,
+                score_status_comments=game.score_status_comments,
+                notes=None,
+            ))
+            # Home side must be written first, Game.home_side relies on the insertion order.
+            rows[GameSide.__table__].extend(build_game_side_rows(game, page.season_id, franchise_ids))
+
+    return rows
+
+
+def delete_season_rows(season_id):
+    """
+    Delete a season with all its teams, games and game sides without committing.
+    Returns the number of rows deleted.
+    """
+    session = app.db_session
+    season_game_ids = session.query(Game.id).filter(Game.season_id == season_id)
+
+    num_deleted = 0
+    for q in (
+        session.query(GameSide).filter(GameSide.game_id.in_(season_game_ids)),
+        session.query(Game).filter(Game.season_id == season_id),
+        session.query(Team).filter(Team.season_id == season_id),
+        session.query(Season).filter(Season.id == season_id),
+    ):
+        num_deleted += q.delete(synchronize_session=False)
+    return num_deleted
+
+
+def bulk_store_season_page(page, replace=False):
+    """
+    Store a parsed season page (season, teams, games and game sides) in a single transaction
+    with one executemany insert per table, instead of committing every row as
+    store_season_page does.
+
+    If replace is True, any previously stored rows of the season are deleted in the same transaction.
+
+    Returns an ordered dictionary of number of rows written per table name.
+    """
+    rows = build_season_page_rows(page)
+    session = app.db_session
+
+    try:
+        if replace:
+            delete_season_rows(page.season_id)
+        for table, table_rows in rows.items():
+            if table_rows:
+                session.execute(table.insert(), table_rows)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    rows_written = collections.OrderedDict((table.name, len(table_rows)) for table, table_rows in rows.items())
+    log.debug('Stored season {} ({}): {}'.format(
+        page.season_id,
+        page.season_name,
+        ', '.join('{}={}'.format(k, v) for k, v in rows_written.items()),
+    ))
+    return rows_written
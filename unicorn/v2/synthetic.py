@@ -0,0 +1,447 @@
+"""
+Synthetic GoMammoth-shaped data for scale testing.
+
+Generates season standings pages, a current season standings and fixtures page and the matching
+franchises.csv, franchise_seasons.csv and manual_scores.csv:
+
+    python -m unicorn.v2.synthetic --output-dir /tmp/unicorn-10x --scale 10
+
+The generated directories can be used in place of the real ones with:
+
+    UNICORN_INPUT_DIR=/tmp/unicorn-10x/input UNICORN_DATA_DIR=/tmp/unicorn-10x/data ./build.sh
+
+Franchises join and leave the league over time and every season has a regular season
+followed by semi finals and finals, so the data exercises the same code paths as the real data.
+"""
+
+import argparse
+import csv
+import datetime as dt
+import html
+import os
+import os.path
+import random
+
+from unicorn.configuration import logging
+from unicorn.values import GameOutcomes, ScoreStatuses
+
+log = logging.getLogger(__name__)
+
+
+# Size of the real data set, multiplied by --scale
+default_num_seasons = 15
+default_num_franchises = 27
+
+league_id = 505
+division_id = 0
+first_season_id = 1000
+first_gm_team_id = 10000
+first_game_id = 1000000
+
+game_times = ('18:45', '19:35', '20:25', '21:15')
+venues = ('Sports Hall', 'Court 2', 'Court 3')
+
+team_profile_url = 'TeamProfile.aspx?VenueId=0&amp;LeagueId={league_id}&amp;SeasonId={season_id}&amp;DivisionId={division_id}&amp;TeamId={gm_team_id}'
+
+
+class SyntheticTeam:
+    def __init__(self, franchise_id, gm_team_id, name):
+        self.franchise_id = franchise_id
+        self.gm_team_id = gm_team_id
+        self.name = name
+        self.played = 0
+        self.won = 0
+        self.lost = 0
+        self.drawn = 0
+        self.forfeits_for = 0
+        self.forfeits_against = 0
+        self.score_for = 0
+        self.score_against = 0
+        self.points = 0
+
+    @property
+    def score_difference(self):
+        return self.score_for - self.score_against
+
+    def register(self, outcome, score_for, score_against):
+        self.played += 1
+        self.score_for += score_for
+        self.score_against += score_against
+        self.points += GameOutcomes.regular_season_points[outcome]
+        if outcome == GameOutcomes.won:
+            self.won += 1
+        elif outcome == GameOutcomes.lost:
+            self.lost += 1
+        elif outcome == GameOutcomes.drawn:
+            self.drawn += 1
+        elif outcome == GameOutcomes.forfeit_for:
+            self.forfeits_for += 1
+        elif outcome == GameOutcomes.forfeit_against:
+            self.forfeits_against += 1
+
+    @property
+    def sort_key(self):
+        return -self.points, -self.score_difference, -self.score_for, self.gm_team_id
+
+
+class SyntheticGame:
+    def __init__(self, id, starts_at, venue, home, away, title=None):
+        self.id = id
+        self.starts_at = starts_at
+        self.venue = venue
+        self.home = home
+        self.away = away
+        self.title = title
+        self.home_score = None
+        self.away_score = None
+        self.manual_score = None
+
+
+class SyntheticSeason:
+    def __init__(self, id, name, teams, first_week_date):
+        self.id = id
+        self.name = name
+        self.teams = teams
+        self.first_week_date = first_week_date
+        # List of (date, [SyntheticGame]) tuples
+        self.weeks = []
+        self.bye_teams = {}
+
+
+class Generator:
+    def __init__(
+        self, num_seasons=default_num_seasons, num_franchises=default_num_franchises, teams_per_season=8,
+        rounds_per_season=1, manual_score_rate=0.01, forfeit_rate=0.01, seed=0, today=None,
+    ):
+        if teams_per_season > num_franchises:
+            raise ValueError('teams_per_season ({}) cannot exceed num_franchises ({})'.format(
+                teams_per_season, num_franchises,
+            ))
+        if teams_per_season < 4:
+            raise ValueError('teams_per_season must be at least 4 to play semi finals')
+
+        self.num_seasons = num_seasons
+        self.num_franchises = num_franchises
+        self.teams_per_season = teams_per_season
+        self.rounds_per_season = rounds_per_season
+        self.manual_score_rate = manual_score_rate
+        self.forfeit_rate = forfeit_rate
+        self.random = random.Random(seed)
+        self.today = today or dt.date.today()
+        self.next_game_id = first_game_id
+        self.seasons = []
+
+    @property
+    def regular_weeks_per_season(self):
+        # Round robin with a bye week for odd number of teams
+        n = self.teams_per_season + self.teams_per_season % 2
+        return (n - 1) * self.rounds_per_season
+
+    @property
+    def weeks_per_season(self):
+        # Regular season, semi finals, finals and one week break
+        return self.regular_weeks_per_season + 3
+
+    def get_first_week_date(self):
+        # The current (last) season is half way through its regular season today
+        weeks_before_today = (self.num_seasons - 1) * self.weeks_per_season + self.regular_weeks_per_season // 2
+        today = dt.datetime(self.today.year, self.today.month, self.today.day)
+        last_thursday = today - dt.timedelta(days=(today.weekday() - 3) % 7)
+        return last_thursday - dt.timedelta(weeks=weeks_before_today)
+
+    def get_season_franchise_ids(self, season_index):
+        # A window of franchises that slides from the first to the last franchise over all seasons,
+        # so franchises join, stay for a while and then leave the league.
+        offset = season_index * (self.num_franchises - self.teams_per_season) // max(1, self.num_seasons - 1)
+        return [offset + i + 1 for i in range(self.teams_per_season)]
+
+    def create_game(self, starts_at, venue, home, away, title=None):
+        game = SyntheticGame(self.next_game_id, starts_at, venue, home, away, title=title)
+        self.next_game_id += 1
+        return game
+
+    def play(self, game, allow_draw=True):
+        if self.random.random() < self.forfeit_rate:
+            game.home_score, game.away_score = self.random.choice(((20, 0), (0, 20)))
+        else:
+            game.home_score = self.random.randint(20, 60)
+            game.away_score = self.random.randint(20, 60)
+            if not allow_draw and game.home_score == game.away_score:
+                game.home_score += 1
+        if self.random.random() < self.manual_score_rate:
+            game.manual_score = (
+                self.random.choice((ScoreStatuses.winner_ok_score_probable, ScoreStatuses.winner_ok_score_fake)),
+                'Synthetic manual score',
+            )
+
+    def winner_and_loser(self, game):
+        if game.home_score > game.away_score:
+            return game.home, game.away
+        else:
+            return game.away, game.home
+
+    def generate_regular_season(self, season, start, num_played_weeks):
+        teams = list(season.teams)
+        if len(teams) % 2:
+            teams.append(None)
+        n = len(teams)
+        week_date = start
+
+        for week in range(self.regular_weeks_per_season):
+            # Circle method, rotate all but the first team
+            r = week % (n - 1)
+            rotated = [teams[0]] + teams[1:][-r:] + teams[1:][:-r] if r else list(teams)
+            pairs = [(rotated[i], rotated[n - 1 - i]) for i in range(n // 2)]
+            games = []
+            for i, (home, away) in enumerate(pairs):
+                if home is None or away is None:
+                    season.bye_teams[week_date] = home or away
+                    continue
+                if (week // (n - 1)) % 2:
+                    home, away = away, home
+                starts_at = week_date + self.get_game_time(i)
+                games.append(self.create_game(starts_at, venues[i // len(game_times) % len(venues)], home, away))
+
+            if week < num_played_weeks:
+                for game in games:
+                    self.play(game)
+                    home_outcome, away_outcome = GameOutcomes.from_scores(game.home_score, game.away_score)
+                    game.home.register(home_outcome, game.home_score, game.away_score)
+                    game.away.register(away_outcome, game.away_score, game.home_score)
+
+            season.weeks.append((week_date, games))
+            week_date += dt.timedelta(weeks=1)
+
+        return week_date
+
+    def get_game_time(self, index):
+        hours, minutes = game_times[index % len(game_times)].split(':')
+        return dt.timedelta(hours=int(hours), minutes=int(minutes))
+
+    def generate_finals(self, season, week_date):
+        ranked = sorted(season.teams, key=lambda t: t.sort_key)
+
+        semifinal1 = self.create_game(week_date + self.get_game_time(0), venues[0], ranked[0], ranked[3], 'Semi Final 1')
+        semifinal2 = self.create_game(week_date + self.get_game_time(1), venues[0], ranked[1], ranked[2], 'Semi Final 2')
+        for game in (semifinal1, semifinal2):
+            self.play(game, allow_draw=False)
+        season.weeks.append((week_date, [semifinal1, semifinal2]))
+
+        week_date += dt.timedelta(weeks=1)
+        winner1, loser1 = self.winner_and_loser(semifinal1)
+        winner2, loser2 = self.winner_and_loser(semifinal2)
+        finals = [
+            self.create_game(week_date + self.get_game_time(0), venues[0], loser1, loser2, '3rd Place Playoff'),
+            self.create_game(week_date + self.get_game_time(1), venues[0], winner1, winner2, 'Grand Final'),
+        ]
+        if len(ranked) >= 6:
+            finals.insert(0, self.create_game(
+                week_date + self.get_game_time(2), venues[1], ranked[4], ranked[5], '5th Place Playoff',
+            ))
+        for game in finals:
+            self.play(game, allow_draw=False)
+        season.weeks.append((week_date, finals))
+
+    def generate(self):
+        week_date = self.get_first_week_date()
+
+        for season_index in range(self.num_seasons):
+            season_id = first_season_id + season_index
+            teams = [
+                SyntheticTeam(
+                    franchise_id=franchise_id,
+                    gm_team_id=first_gm_team_id + franchise_id,
+                    name='Franchise {}'.format(franchise_id),
+                )
+                for franchise_id in self.get_season_franchise_ids(season_index)
+            ]
+            season = SyntheticSeason(
+                id=season_id,
+                name='Season {}'.format(season_index + 1),
+                teams=teams,
+                first_week_date=week_date,
+            )
+
+            is_current = season_index == self.num_seasons - 1
+            num_played_weeks = self.regular_weeks_per_season // 2 if is_current else self.regular_weeks_per_season
+            finals_date = self.generate_regular_season(season, week_date, num_played_weeks)
+            if not is_current:
+                self.generate_finals(season, finals_date)
+
+            self.seasons.append(season)
+            week_date += dt.timedelta(weeks=self.weeks_per_season)
+
+        return self.seasons
+
+    def render_team_link(self, season, team):
+        return '<a href="{}">{}</a>'.format(
+            team_profile_url.format(
+                league_id=league_id, season_id=season.id, division_id=division_id, gm_team_id=team.gm_team_id,
+            ),
+            html.escape(team.name),
+        )
+
+    def render_fixture_table(self, season, week_date, games, with_scores):
+        rows = ['<tr class="FHeader"><td colspan="5">{}</td></tr>'.format(week_date.strftime('%A %d %b %Y'))]
+        title = None
+        for i, game in enumerate(games):
+            if game.title and game.title != title:
+                rows.append('<tr class="FRow"><td colspan="2"><br /></td><td class="FTitle" colspan="3">{}</td></tr>'.format(game.title))
+                title = game.title
+            if with_scores and game.home_score is not None and game.manual_score is None:
+                score = '<div><nobr data-fixture-id="">{} - {}</nobr></div>'.format(game.home_score, game.away_score)
+            else:
+                score = ''
+            rows.append((
+                '<tr class="FRow{band}"><td class="FDate">{time}</td>'
+                '<td class="FPlayingArea"><nobr>{venue}<br /></nobr></td>'
+                '<td class="FHomeTeam">{home}<br /></td>'
+                '<td class="FScore"><nobr data-fixture-id="{id}">{score}</nobr></td>'
+                '<td class="FAwayTeam">{away}<br /></td></tr>'
+            ).format(
+                band=' FBand' if i % 2 == 0 else '',
+                time=game.starts_at.strftime('%H:%M'),
+                venue=game.venue,
+                home=self.render_team_link(season, game.home),
+                id=game.id,
+                score=score,
+                away=self.render_team_link(season, game.away),
+            ))
+        bye_team = season.bye_teams.get(week_date)
+        if bye_team is not None:
+            rows.append('<tr class="FRow"><td class="FDate">Bye</td><td colspan="4">{}</td></tr>'.format(
+                self.render_team_link(season, bye_team),
+            ))
+        return '<table class="FTable">{}</table>'.format(''.join(rows))
+
+    def render_standings_page(self, season, weeks):
+        fixtures_url = 'Fixtures.aspx?VenueId=0&LeagueId={}&SeasonId={}&DivisionId={}'.format(league_id, season.id, division_id)
+        title = 'Basketball - Mixed (Synthetic - Thurs - Rec) - {} - Current Standings'.format(season.name)
+
+        rows = [
+            '<tr class="STHeaderRow"><td><br /></td><td>Team</td><td>Pld</td><td>W</td><td>L</td><td>D</td>'
+            '<td>FF</td><td>FA</td><td>F</td><td>A</td><td>Dif</td><td>B</td><td>Pts</td></tr>'
+        ]
+        for position, team in enumerate(sorted(season.teams, key=lambda t: t.sort_key)):
+            rows.append((
+                '<tr class="STRow"><td><a class="ToolTipLeft">{position}</a>'
+                '<div class="StandingsToolTip"><div class="arrow arrowLeft"><div class="arrow_overlay"></div></div>'
+                '<ul><li>Synthetic</li></ul></div></td>'
+                '<td class="STTeamCell">{link}</td>'
+                '<td>{t.played}</td><td>{t.won}</td><td>{t.lost}</td><td>{t.drawn}</td>'
+                '<td>{t.forfeits_for}</td><td>{t.forfeits_against}</td>'
+                '<td>{t.score_for}</td><td>{t.score_against}</td><td>{t.score_difference}</td><td>0</td>'
+                '<td><b><a class="ToolTipRight">{t.points}</a></b></td></tr>'
+            ).format(position=position + 1, link=self.render_team_link(season, team), t=team))
+
+        return (
+            '<html><head><title>{title}</title></head><body>'
+            '<h3>{title} (<a href="{fixtures_url}">Fixtures</a>)</h3>'
+            '<table class="STTable">{standings}</table>'
+            '<h3>Results</h3>{fixtures}'
+            '</body></html>'
+        ).format(
+            title=html.escape(title),
+            fixtures_url=fixtures_url,
+            standings=''.join(rows),
+            fixtures=''.join(self.render_fixture_table(season, d, games, with_scores=True) for d, games in weeks),
+        )
+
+    def render_fixtures_page(self, season, weeks):
+        return '<html><head><title>Fixtures</title></head><body>{}</body></html>'.format(
+            ''.join(self.render_fixture_table(season, d, games, with_scores=False) for d, games in weeks),
+        )
+
+    def write(self, output_dir):
+        if not self.seasons:
+            self.generate()
+
+        season_pages_dir = os.path.join(output_dir, 'input', 'season-pages')
+        current_season_dir = os.path.join(output_dir, 'input', 'current-season')
+        data_dir = os.path.join(output_dir, 'data')
+        for d in (season_pages_dir, current_season_dir, data_dir):
+            os.makedirs(d, exist_ok=True)
+
+        for season in self.seasons[:-1]:
+            with open(os.path.join(season_pages_dir, '{}.htm'.format(season.id)), 'w') as f:
+                f.write(self.render_standings_page(season, season.weeks))
+
+        current_season = self.seasons[-1]
+        played_weeks = [(d, games) for d, games in current_season.weeks if games and games[0].home_score is not None]
+        upcoming_weeks = [(d, games) for d, games in current_season.weeks if games and games[0].home_score is None]
+        with open(os.path.join(current_season_dir, 'standings.htm'), 'w') as f:
+            f.write(self.render_standings_page(current_season, played_weeks))
+        with open(os.path.join(current_season_dir, 'fixtures.htm'), 'w') as f:
+            f.write(self.render_fixtures_page(current_season, upcoming_weeks))
+
+        self.write_csv_files(data_dir)
+
+    def write_csv_files(self, data_dir):
+        franchise_ids = sorted(set(t.franchise_id for s in self.seasons for t in s.teams))
+        current_franchise_ids = set(t.franchise_id for t in self.seasons[-1].teams)
+
+        with open(os.path.join(data_dir, 'franchises.csv'), 'w') as f:
+            writer = csv.writer(f)
+            writer.writerow(['id', 'name', 'status', 'colors'])
+            for franchise_id in franchise_ids:
+                writer.writerow([
+                    franchise_id,
+                    'Franchise {}'.format(franchise_id),
+                    'active' if franchise_id in current_franchise_ids else 'inactive',
+                    '#{0:06X},#{0:06X}'.format(self.random.randint(0, 0xFFFFFF)),
+                ])
+
+        with open(os.path.join(data_dir, 'franchise_seasons.csv'), 'w') as f:
+            writer = csv.writer(f)
+            writer.writerow(['season_id', 'gm_team_id', 'franchise_id', 'team_name'])
+            for season in self.seasons:
+                for team in season.teams:
+                    writer.writerow([season.id, team.gm_team_id, team.franchise_id, team.name])
+
+        with open(os.path.join(data_dir, 'manual_scores.csv'), 'w') as f:
+            writer = csv.writer(f)
+            writer.writerow([
+                'game_id', 'home_team_id', 'home_team_score', 'away_team_id', 'away_team_score',
+                'score_status', 'score_status_comments', 'season_stage',
+            ])
+            for season in self.seasons:
+                for _, games in season.weeks:
+                    for game in games:
+                        if game.manual_score is None or game.home_score is None:
+                            continue
+                        score_status, comments = game.manual_score
+                        writer.writerow([
+                            game.id, '', game.home_score, '', game.away_score, score_status, comments, '',
+                        ])
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Generate synthetic GoMammoth season pages and data files')
+    arg_parser.add_argument('--output-dir', required=True)
+    arg_parser.add_argument('--scale', type=float, default=1.0, help='multiplier of the real number of seasons and franchises')
+    arg_parser.add_argument('--seasons', type=int, help='number of seasons, the last one is the current season')
+    arg_parser.add_argument('--franchises', type=int, help='number of franchises')
+    arg_parser.add_argument('--teams-per-season', type=int, default=8)
+    arg_parser.add_argument('--rounds-per-season', type=int, default=1, help='number of regular season round robins')
+    arg_parser.add_argument('--manual-score-rate', type=float, default=0.01)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+
+    generator = Generator(
+        num_seasons=args.seasons or max(1, int(round(default_num_seasons * args.scale))),
+        num_franchises=args.franchises or max(args.teams_per_season, int(round(default_num_franchises * args.scale))),
+        teams_per_season=args.teams_per_season,
+        rounds_per_season=args.rounds_per_season,
+        manual_score_rate=args.manual_score_rate,
+        seed=args.seed,
+    )
+    generator.write(args.output_dir)
+
+    num_games = sum(len(games) for s in generator.seasons for _, games in s.weeks)
+    log.info('Generated {} seasons, {} franchises and {} games in {}'.format(
+        len(generator.seasons), generator.num_franchises, num_games, args.output_dir,
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,15 @@
 import collections
+import itertools
 
+from unicorn.activity import ActivityIndex
 from unicorn.app import app
 from unicorn.v2 import elo
 from unicorn.values import SeasonStages
 
 
 class RatingValue:
+    __slots__ = ('value', 'game', 'change', '_sort_value')
+
     def __init__(self, value, game=None, change=0, sort_value=None):
         self.value = value
         self.game = game
@@ -37,6 +41,8 @@ class RatingValue:
 
 
 class FranchiseRating:
+    __slots__ = ('franchise', 'current', 'best_rating', 'worst_rating', 'best_game', 'worst_game', 'weeks_on_top')
+
     def __init__(self, *, franchise, current, best_rating, worst_rating, best_game, worst_game, weeks_on_top):
         self.franchise = franchise
         self.current = current
@@ -83,6 +89,7 @@ class TeamRatings:
         self.worst_game = {f.id: None for f in self.franchises}
         self.change_log = {f.id: [] for f in self.franchises}
         self.weekly_leaders = collections.OrderedDict()
+        self.activity = ActivityIndex(self.franchises)
 
     @staticmethod
     def _get_all_franchises():
@@ -103,23 +110,12 @@ class TeamRatings:
     def on_season_change(self, last_season, next_season):
         # Reset current score for teams which have become inactive
         # Calculate rating for new joining teams
-        joining_first_time = []
-        leaving_last_time = []
-        for f in self.franchises:
-            if f.is_long_term_active_on(last_season.first_week_date) and not f.is_long_term_active_on(next_season.first_week_date):
-                leaving_last_time.append(f)
-
-            if not f.is_long_term_active_on(last_season.first_week_date) and f.is_long_term_active_on(next_season.first_week_date):
-                joining_first_time.append(f)
+        transition = self.activity.get_transition(last_season.first_week_date, next_season.first_week_date)
+        joining_first_time = transition.joining
+        leaving_last_time = transition.leaving
 
         if leaving_last_time or joining_first_time:
-            remaining = [
-                f for f in self.franchises
-                if
-                f not in leaving_last_time and
-                f not in joining_first_time and
-                f.is_long_term_active_on(next_season.first_week_date)
-            ]
+            remaining = transition.remaining
 
             delta_leaving = sum(self.current[f.id].value - self.initial_rating for f in leaving_last_time)
             delta = delta_leaving / (len(remaining) + len(joining_first_time))
@@ -132,8 +128,11 @@ class TeamRatings:
         for f in leaving_last_time:
             self.update_current(f.id, change=-self.current[f.id].value)
 
-    def advance(self):
-        for i, g in enumerate(self.games):
+    def advance(self, start=0, stop=None):
+        """
+        Rate the completed games of self.games[start:stop], yielding each game and the current ratings after it.
+        """
+        for i, g in itertools.islice(enumerate(self.games), start, stop):
             if not g.completed:
                 continue
 
@@ -234,7 +233,16 @@ class TeamRatings:
 
             yield g, self.current
 
-    def calculate(self):
+    def calculate(self, checkpoint_dir=None):
+        """
+        Rate all games. If checkpoint_dir is set, resume from the latest valid checkpoint
+        and save checkpoints of later season boundaries, see unicorn.v2.rating_checkpoints.
+        """
+        if checkpoint_dir:
+            from unicorn.v2 import rating_checkpoints
+            rating_checkpoints.calculate(self, checkpoint_dir)
+            return
+
         for _ in self.advance():
             pass
 
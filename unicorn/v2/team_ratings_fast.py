@@ -0,0 +1,274 @@
+"""
+Faster TeamRatings engine.
+
+FastTeamRatings computes exactly the same ratings as TeamRatings but its hot loop does less
+per completed game: the favourite of a game is found by comparing the two sides instead of
+sorting them, the weekly leader is tracked incrementally from the two franchises whose ratings
+changed instead of sorting all franchises, and weeks on top are counted once when iterating.
+
+It also allocates less. The current RatingValue of a franchise is updated in place unless a best
+or worst rating or game still refers to it, so new RatingValues are only created for those records,
+and the change log is kept in flat arrays and only turned into lists of (game, rating) on access.
+
+Run this module to check that it produces exactly the same ratings as TeamRatings
+for all games in the database.
+"""
+
+import array
+import collections
+import itertools
+import sys
+
+from unicorn.app import app
+from unicorn.configuration import logging
+from unicorn.snapshot import take_snapshot
+from unicorn.v2 import elo
+from unicorn.v2.team_ratings import FranchiseRating, TeamRatings
+
+log = logging.getLogger(__name__)
+
+
+class FastTeamRatings(TeamRatings):
+
+    def __init__(self, franchises=None, games=None):
+        # Change log entries not yet added to change_log: the rated games and, for each of their
+        # two sides, the position of the franchise in self.franchises and its integer rating.
+        self._log_games = []
+        self._log_franchise_indexes = array.array('l')
+        self._log_values = array.array('l')
+
+        super().__init__(franchises=franchises, games=games)
+
+        # Position of each franchise in self.franchises breaks ties between leaders
+        # the same way as the stable sort of TeamRatings.
+        self._franchise_index = {f.id: i for i, f in enumerate(self.franchises)}
+        self._leader_id = None
+        self._leader_sort_value = None
+
+    @property
+    def change_log(self):
+        if self._log_games:
+            franchise_ids = [f.id for f in self.franchises]
+            for i, g in enumerate(self._log_games):
+                for j in (2 * i, 2 * i + 1):
+                    self._change_log[franchise_ids[self._log_franchise_indexes[j]]].append((g, self._log_values[j]))
+            del self._log_games[:]
+            del self._log_franchise_indexes[:]
+            del self._log_values[:]
+        return self._change_log
+
+    @change_log.setter
+    def change_log(self, value):
+        self._change_log = value
+
+    def update_current(self, franchise_id, change, game=None):
+        rating = self.current[franchise_id]
+        if (
+            rating is self.best_rating[franchise_id] or rating is self.worst_rating[franchise_id] or
+            rating is self.best_game[franchise_id] or rating is self.worst_game[franchise_id]
+        ):
+            # The record must keep the rating as it is.
+            super().update_current(franchise_id, change, game)
+        else:
+            rating.value += change
+            rating.game = game
+            rating.change = change
+            rating._sort_value = None
+
+    def on_season_change(self, last_season, next_season):
+        super().on_season_change(last_season=last_season, next_season=next_season)
+
+        # Ratings of any number of franchises may have changed.
+        self._leader_id = None
+
+    def _find_leader(self):
+        leader_id = None
+        leader_sort_value = None
+        for f in self.franchises:
+            sort_value = self.current[f.id].sort_value
+            if leader_id is None or sort_value > leader_sort_value:
+                leader_id, leader_sort_value = f.id, sort_value
+        return leader_id
+
+    def _update_leader(self, franchise_ids):
+        """
+        Update the leader after the ratings of only franchise_ids have changed.
+        """
+        leader_id = self._leader_id
+
+        if leader_id in franchise_ids and self.current[leader_id].sort_value < self._leader_sort_value:
+            # Any other franchise may be the leader now.
+            leader_id = None
+
+        if leader_id is None:
+            leader_id = self._find_leader()
+        else:
+            for franchise_id in franchise_ids:
+                if franchise_id == leader_id:
+                    continue
+                sort_value = self.current[franchise_id].sort_value
+                leader_sort_value = self.current[leader_id].sort_value
+                if sort_value > leader_sort_value or (
+                    sort_value == leader_sort_value and
+                    self._franchise_index[franchise_id] < self._franchise_index[leader_id]
+                ):
+                    leader_id = franchise_id
+
+        self._leader_id = leader_id
+        self._leader_sort_value = self.current[leader_id].sort_value
+        return leader_id
+
+    def advance(self, start=0, stop=None):
+        current = self.current
+        other_k = self.game_k_values['other']
+        franchise_index = self._franchise_index
+        log_games = self._log_games
+        log_franchise_indexes = self._log_franchise_indexes
+        log_values = self._log_values
+
+        for i, g in itertools.islice(enumerate(self.games), start, stop):
+            if not g.completed:
+                continue
+
+            if i > 0:
+                if self.games[i - 1].season != g.season:
+                    self.on_season_change(last_season=self.games[i - 1].season, next_season=g.season)
+
+            k = self.game_k_values.get(g.season_stage, other_k)
+
+            # Same as sorting the sides by rating: the first side is the underdog unless the second is rated lower.
+            first_side, second_side = g.sides
+            first_franchise_id = first_side.team.franchise_id
+            second_franchise_id = second_side.team.franchise_id
+            if current[second_franchise_id].value < current[first_franchise_id].value:
+                underdog_side, favourite_side = second_side, first_side
+                underdog_franchise_id, favourite_franchise_id = second_franchise_id, first_franchise_id
+            else:
+                underdog_side, favourite_side = first_side, second_side
+                underdog_franchise_id, favourite_franchise_id = first_franchise_id, second_franchise_id
+
+            underdog_old_elo = current[underdog_franchise_id].value
+            favourite_old_elo = current[favourite_franchise_id].value
+
+            underdog_exp = elo.expected(underdog_old_elo, favourite_old_elo)
+            favourite_exp = elo.expected(favourite_old_elo, underdog_old_elo)
+
+            if self.num_games[underdog_franchise_id] < 10 or self.num_games[favourite_franchise_id] < 10:
+                # If exactly one of the teams is a recent joiner, make the game more influential.
+                k += 8
+
+            winner_side = g.winner_side
+            if winner_side is favourite_side and favourite_side.is_won:
+                favourite_score, underdog_score = 1.0, 0.0
+            elif winner_side is underdog_side and underdog_side.is_won:
+                favourite_score, underdog_score = 0.0, 1.0
+            else:
+                assert winner_side.is_drawn
+                favourite_score, underdog_score = 0.5, 0.5
+
+            favourite_new_elo = elo.elo(old=favourite_old_elo, exp=favourite_exp, score=favourite_score, k=k)
+            underdog_new_elo = elo.elo(old=underdog_old_elo, exp=underdog_exp, score=underdog_score, k=k)
+            self.update_current(favourite_franchise_id, favourite_new_elo - favourite_old_elo, g)
+            self.update_current(underdog_franchise_id, underdog_new_elo - underdog_old_elo, g)
+
+            # Register best/worst ever ratings
+            for franchise_id in (favourite_franchise_id, underdog_franchise_id):
+                rating = current[franchise_id]
+
+                if rating.value > self.best_rating[franchise_id].value:
+                    self.best_rating[franchise_id] = rating
+                elif rating.value < self.worst_rating[franchise_id].value:
+                    self.worst_rating[franchise_id] = rating
+
+                best_game = self.best_game[franchise_id]
+                worst_game = self.worst_game[franchise_id]
+                if best_game is None or rating.change > best_game.change:
+                    self.best_game[franchise_id] = rating
+                elif worst_game is None or rating.change < worst_game.change:
+                    self.worst_game[franchise_id] = rating
+
+                self.num_games[franchise_id] += 1
+
+                log_franchise_indexes.append(franchise_index[franchise_id])
+                log_values.append(int(rating.value))
+            log_games.append(g)
+
+            # Register weekly leader
+            self.weekly_leaders[g.date_str] = self._update_leader((favourite_franchise_id, underdog_franchise_id))
+
+            yield g, current
+
+    def __iter__(self):
+        franchises = {f.id: f for f in self.franchises}
+        weeks_on_top = collections.Counter(self.weekly_leaders.values())
+        all = []
+        for franchise_id, rating in self.current.items():
+            all.append(FranchiseRating(
+                franchise=franchises[franchise_id],
+                current=rating,
+                best_rating=self.best_rating[franchise_id],
+                worst_rating=self.worst_rating[franchise_id],
+                best_game=self.best_game[franchise_id],
+                worst_game=self.worst_game[franchise_id],
+                weeks_on_top=weeks_on_top[franchise_id],
+            ))
+
+        for i, pr in enumerate(sorted(all, key=lambda pr: pr.sort_key, reverse=True)):
+            yield i + 1, pr
+
+
+def _rating_state(rating):
+    if rating is None:
+        return None
+    return rating.value, rating.game, rating.change, rating.sort_value
+
+
+def check_parity(franchises, games):
+    """
+    Calculate ratings of the games with both TeamRatings and FastTeamRatings
+    and return a list of names of results which differ.
+    """
+    standard = TeamRatings(franchises=franchises, games=games)
+    standard.calculate()
+    fast = FastTeamRatings(franchises=franchises, games=games)
+    fast.calculate()
+
+    mismatches = []
+
+    if standard.change_log != fast.change_log:
+        mismatches.append('change_log')
+    if standard.weekly_leaders != fast.weekly_leaders:
+        mismatches.append('weekly_leaders')
+    if standard.num_games != fast.num_games:
+        mismatches.append('num_games')
+
+    for name in ('current', 'best_rating', 'worst_rating', 'best_game', 'worst_game'):
+        standard_ratings = getattr(standard, name)
+        fast_ratings = getattr(fast, name)
+        if any(_rating_state(standard_ratings[f.id]) != _rating_state(fast_ratings[f.id]) for f in standard.franchises):
+            mismatches.append(name)
+
+    standard_rows = [(rank, pr.franchise, pr.weeks_on_top) for rank, pr in standard]
+    fast_rows = [(rank, pr.franchise, pr.weeks_on_top) for rank, pr in fast]
+    if standard_rows != fast_rows:
+        mismatches.append('franchise ratings')
+
+    return mismatches
+
+
+def main():
+    take_snapshot()
+    mismatches = check_parity(list(app.franchises.values()), list(TeamRatings._get_all_games()))
+
+    for name in mismatches:
+        log.error('FastTeamRatings {} differs from TeamRatings'.format(name))
+
+    if mismatches:
+        sys.exit(1)
+    else:
+        log.info('FastTeamRatings output is identical to TeamRatings')
+
+
+if __name__ == '__main__':
+    with app():
+        main()